@@ -1,87 +1,126 @@
 """
 API endpoint for analyzing repository structure and patterns.
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 
 router = APIRouter()
 
 
+import asyncio
+from contextlib import ExitStack
+from datetime import datetime
+from pathlib import Path
+
 from pydantic import BaseModel
-from ..core.repo_loader import clone_repo, scan_files
-from ..core.detector import detect_framework
-from ..core.graph_builder import extract_imports, build_dependency_graph
-from ..core.heuristics import detect_patterns
+from ..core import columnar, metrics, mirror_store, repo_loader, tracing, workspace
+from ..core.repo_loader import blob_shas, clone_bare, clone_repo, partition_files, scan_files
+from ..core.git_objects import GitTree
+from ..core.detector import detect_framework, detect_frameworks
+from ..core.graph_builder import extract_imports_many, build_dependency_graph
+from ..core.heuristics import detect_pattern_matches
+from ..core.languages import build_resolve_context
+from ..core.responses import json_response
 from ..models.repo import RepoIndex
 
 class AnalysisRequest(BaseModel):
     repo_url: str
+    deep_scan: bool = False  # Also search file contents for pattern signatures
 
 class AnalysisResponse(BaseModel):
     repo_id: str
     index: RepoIndex
+    patterns: dict[str, bool] = {}
 
-@router.post("/analyze")
-async def analyze_repository(request: AnalysisRequest):
+@router.post("/analyze", response_model=AnalysisResponse)
+async def analyze_repository(request: AnalysisRequest, http_request: Request):
     """
     Analyze repository structure and generate insights.
+
+    Work runs in a per-(repository, commit) workspace (see ``workspace``);
+    concurrent requests for the same repository, commit and options share
+    one analysis. The result is encoded directly (see
+    ``responses.json_response``) rather than re-validated against
+    ``AnalysisResponse``. Clients accepting ``columnar.COLUMNAR_MEDIA_TYPE``
+    get ``index`` in that form. Stage timings go to ``metrics`` and the
+    ``Server-Timing`` header.
     """
-    # 1. Clone Repo
-    # For MVP, we'll clone to a temp directory based on repo name
-    # In production, use a proper temp manager and cleanup
-    import tempfile
-    import shutil
-    import stat
-    import os
-    from pathlib import Path
-    
-    def on_rm_error(func, path, exc_info):
-        """
-        Error handler for ``shutil.rmtree``.
-        If the error is due to an access error (read only file)
-        it attempts to add write permission and then retries.
-        If the error is for another reason it re-raises the error.
-        Usage : ``shutil.rmtree(path, onerror=on_rm_error)``
-        """
-        # Is the error an access error?
-        os.chmod(path, stat.S_IWRITE)
-        try:
-            func(path)
-        except Exception:
-            pass
-    
+    # 1. Pin the commit, then coalesce identical in-flight analyses
     repo_name = request.repo_url.split("/")[-1].replace(".git", "")
-    # Use a persistent temp dir for now to allow chatting later
-    temp_dir = Path(tempfile.gettempdir()) / "explain_codebase" / repo_name
-    
-    if temp_dir.exists():
-        # Try to remove, but don't fail hard if we can't (might just overwrite)
-        try:
-            shutil.rmtree(temp_dir, onerror=on_rm_error)
-        except Exception:
-            pass
-            
-    # Ensure parent exists
-    if not temp_dir.parent.exists():
-        temp_dir.parent.mkdir(parents=True, exist_ok=True)
-        
-    # If it still exists (rmtree failed completely), we might have issues cloning
-    # But git clone might fail if dir exists and is not empty.
-    # Let's hope git clone handles it or we catch it.
-    
-    if not temp_dir.exists():
-         clone_repo(request.repo_url, temp_dir)
+    tracing.set_attribute("repo.url", request.repo_url)
+    with metrics.stage("resolve_commit") as span:
+        commit = await asyncio.to_thread(workspace.resolve_commit, request.repo_url)
+        span.set("repo.commit", commit)
+    key = (workspace.workspace_key(request.repo_url, commit), request.deep_scan)
+    result = await workspace.single_flight(key, lambda: _analyze_commit(request, repo_name, commit))
+    if columnar.accepts_columnar(http_request.headers.get("accept")):
+        # A copy: the result dict is shared with coalesced callers
+        with metrics.stage("columnar"):
+            index = await asyncio.to_thread(columnar.encode_index, result["index"])
+        return await json_response(
+            http_request, {**result, "index": index}, media_type=columnar.COLUMNAR_MEDIA_TYPE
+        )
+    return await json_response(http_request, result)
+
+
+def _analyze_commit(request: AnalysisRequest, repo_name: str, commit: str) -> dict:
+    """Check out (or open the objects of) ``commit`` and analyze it."""
+    with ExitStack() as stack:
+        with metrics.stage("clone"):
+            root, tree = _open_commit(stack, request, commit)
+        return _analyze_clone(request, repo_name, root, tree)
+
+
+def _open_commit(stack: ExitStack, request: AnalysisRequest, commit: str) -> tuple[Path, GitTree | None]:
+    """
+    Make ``commit`` readable: a workspace directory and, in objects mode,
+    a ``GitTree``. Leases, locks and readers are released with ``stack``.
+    """
+    objects_mode = repo_loader.ANALYSIS_MODE == repo_loader.ANALYSIS_OBJECTS
+    sparse = repo_loader.CLONE_MODE == repo_loader.CLONE_PARTIAL
+    layout = 'bare' if objects_mode else ('sparse' if sparse else 'full')
+
+    if mirror_store.MIRRORS_ENABLED:
+        # The lease keeps the shared mirror from eviction while we read it
+        mirror, _ = stack.enter_context(mirror_store.lease_mirror(request.repo_url))
+        if objects_mode:
+            # Nothing to put on disk: the path only names the blobs
+            root = workspace.workspace_path(request.repo_url, commit, layout)
+            return root, stack.enter_context(GitTree(mirror, commit, root=root))
+        populate = lambda path: mirror_store.add_worktree(mirror, commit, path, sparse=sparse)
+    elif objects_mode:
+        # Cloned at ``commit`` even if the branch moved since it was resolved:
+        # the workspace is keyed by it
+        populate = lambda path: clone_bare(request.repo_url, path, commit=commit)
     else:
-        # If dir exists, maybe we just use it? 
-        # But if it's a new request we probably want to update it.
-        # For now, let's try to pull if exists or just proceed.
-        # Simplest for MVP: just use existing if we couldn't delete it.
-        pass
-    
+        populate = lambda path: clone_repo(
+            request.repo_url, path,
+            mode=repo_loader.CLONE_PARTIAL if sparse else repo_loader.CLONE_FULL,
+            commit=commit
+        )
+
+    root = stack.enter_context(workspace.open_workspace(request.repo_url, commit, populate, layout))
+    tree = stack.enter_context(GitTree(root)) if objects_mode else None
+    return root, tree
+
+
+def _analyze_clone(request: AnalysisRequest, repo_name: str, temp_dir: Path, tree: GitTree | None) -> dict:
+    """Run the analysis steps over a working tree or, with ``tree``, git objects."""
     # 2. Scan Files
-    source_files = scan_files(temp_dir)
+    with metrics.stage("scan_files") as span:
+        all_files = tree.files() if tree is not None else scan_files(temp_dir)
+        # Blob SHAs key the parse cache: blobs seen in any earlier analysis are not re-parsed
+        shas = tree.blob_shas() if tree is not None else blob_shas(temp_dir)
+        span.set("files.total", len(all_files))
+    metrics.inc("files_scanned_total", len(all_files))
+    # Oversized, binary, generated and vendored files are listed but not read
+    with metrics.stage("classify_files") as span:
+        source_files, skipped = partition_files(temp_dir, all_files, tree, shas)
+        span.set("files.skipped", len(skipped))
     
     # 3. Detect Framework
-    framework = detect_framework(temp_dir)
+    with metrics.stage("detect_framework"):
+        framework_matches = detect_frameworks(temp_dir, tree)
+    framework = detect_framework(temp_dir, tree, framework_matches)
     
     # 4. Build Dependency Graph
     # Convert scanner paths (relative) to absolute for graph builder if needed, 
@@ -94,7 +133,15 @@ async def analyze_repository(request: AnalysisRequest):
     # We should pass full paths to build_dependency_graph
     
     full_paths = [temp_dir / f for f in source_files]
-    dependency_graph = build_dependency_graph(full_paths)
+    with metrics.stage("build_dependency_graph") as span:
+        # One index for both, so the file listing filters imports like the graph
+        context = build_resolve_context(full_paths, temp_dir, tree)
+        dependency_graph = build_dependency_graph(
+            full_paths, repo_root=temp_dir, tree=tree, blob_shas=shas, context=context
+        )
+        span.set("graph.edges", sum(len(deps) for deps in dependency_graph.values()))
+    with metrics.stage("extract_imports"):
+        file_imports = extract_imports_many(full_paths, temp_dir, tree, shas, context)
     
     # Convert graph keys back to relative paths for cleaner output
     rel_graph = {}
@@ -105,33 +152,45 @@ async def analyze_repository(request: AnalysisRequest):
         rel_graph[rel_k] = rel_v
         
     # 5. Heuristics
-    # We need to implement detect_patterns in heuristics.py first
-    patterns = detect_patterns(temp_dir, source_files)
+    # Match pattern keywords against file paths
+    with metrics.stage("detect_patterns"):
+        pattern_matches = detect_pattern_matches(temp_dir, source_files, content_scan=request.deep_scan, tree=tree)
+    patterns = {
+        category: match.count > 0 or match.content_file is not None
+        for category, match in pattern_matches.items()
+    }
     
     # 6. Construct RepoIndex
-    # We need to construct FileNodes first. 
-    # This is getting complex for a single function, but MVP.
-    from ..models.file import FileNode
-    
-    files_map = {}
-    for f in source_files:
-        path_str = str(f.as_posix())
-        node = FileNode(
-            path=path_str,
-            language=f.suffix.lstrip('.'),
-            size=(temp_dir / f).stat().st_size,
-            imports=extract_imports(temp_dir / f)
-        )
-        files_map[path_str] = node
-        
-    index = RepoIndex(
-        repo_url=request.repo_url,  # Fixed: usage of correct field name from request
-        framework=framework,
-        files=list(files_map.values()), # Fixed: RepoIndex expects list, not dict
-        dependency_graph=rel_graph,
-        total_files=len(source_files), # Fixed: Missing total_files
-        patterns=patterns,
-        id=repo_name # Wait, RepoIndex doesn't have id field check?
-    )
+    # FileNodes and the index are plain dicts in the models' field order:
+    # every value is built here with the right type, so re-validating tens
+    # of thousands of nodes would only cost time.
+    with metrics.stage("build_index") as span:
+        files_map = {}
+        for f in all_files:
+            path_str = f.as_posix()
+            skip_reason = skipped.get(f)
+            files_map[path_str] = {
+                "path": path_str,
+                "language": f.suffix.lstrip('.'),
+                "imports": file_imports.get(temp_dir / f, []) if skip_reason is None else [],
+                "size": tree.size(f) if tree is not None else (temp_dir / f).stat().st_size,
+                "file_type": "source" if skip_reason is None else "skipped",
+                "skip_reason": skip_reason
+            }
+        span.set("repo.bytes", sum(node["size"] for node in files_map.values()))
+
+    index = {
+        "repo_url": request.repo_url,
+        "framework": framework,
+        "frameworks": {m.name: m.confidence for m in framework_matches},
+        "files": list(files_map.values()),
+        "dependency_graph": rel_graph,
+        "total_files": len(all_files),
+        "patterns": patterns,
+        "pattern_matches": {
+            category: match.model_dump() for category, match in pattern_matches.items()
+        },
+        "indexed_at": datetime.utcnow()
+    }
     
     return {"repo_id": repo_name, "index": index, "patterns": patterns}
@@ -3,15 +3,18 @@ from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.database import get_session
+from app.core.database import get_async_session
 from app.core.security import (
     ACCESS_TOKEN_EXPIRE_MINUTES,
+    CurrentUser,
     create_access_token,
-    get_password_hash,
-    verify_password,
-    get_current_user
+    get_password_hash_async,
+    verify_and_update_password,
+    get_current_user,
+    invalidate_user
 )
 from app.models.user import User, UserCreate, UserRead, UserRole
 
@@ -19,9 +22,9 @@ router = APIRouter()
 
 
 @router.post("/signup", response_model=UserRead)
-def create_user(user: UserCreate, session: Session = Depends(get_session)):
+async def create_user(user: UserCreate, session: AsyncSession = Depends(get_async_session)):
     statement = select(User).where(User.username == user.username)
-    existing_user = session.exec(statement).first()
+    existing_user = (await session.exec(statement)).first()
     if existing_user:
         raise HTTPException(
             status_code=400,
@@ -35,7 +38,7 @@ def create_user(user: UserCreate, session: Session = Depends(get_session)):
         role = UserRole.HR
         
     # Create User object directly to avoid validation errors with missing hashed_password
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
     
     # Exclude password and role from user dict
     user_data = user.model_dump(exclude={"password", "role"})
@@ -43,25 +46,41 @@ def create_user(user: UserCreate, session: Session = Depends(get_session)):
     db_user = User(**user_data, hashed_password=hashed_password, role=role)
     
     session.add(db_user)
-    session.commit()
-    session.refresh(db_user)
+    await session.commit()
+    await session.refresh(db_user)
     return db_user
 
 
 @router.post("/token")
 async def login_for_access_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     statement = select(User).where(User.username == form_data.username)
-    user = session.exec(statement).first()
+    user = (await session.exec(statement)).first()
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+    # Argon2 runs on a dedicated thread pool so logins don't stall the event loop
+    valid, new_hash = await verify_and_update_password(form_data.password, user.hashed_password)
+    if not valid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect username or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    # Transparently upgrade hashes made with outdated Argon2 parameters
+    if new_hash:
+        user.hashed_password = new_hash
+        session.add(user)
+        await session.commit()
+        invalidate_user(user.username)
     
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -78,5 +97,5 @@ async def login_for_access_token(
     }
 
 @router.get("/users/me", response_model=UserRead)
-async def read_users_me(current_user: Annotated[User, Depends(get_current_user)]):
+async def read_users_me(current_user: Annotated[CurrentUser, Depends(get_current_user)]):
     return current_user
@@ -1,15 +1,19 @@
 """
 API endpoint for ingesting GitHub repositories.
 """
+import asyncio
 import shutil
 import tempfile
+from contextlib import ExitStack
+from datetime import datetime
 from pathlib import Path
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from pydantic import BaseModel, Field, HttpUrl
 
-from ..core import repo_loader, detector, graph_builder
+from ..core import columnar, metrics, repo_loader, detector, graph_builder, languages, mirror_store, tracing
+from ..core.git_objects import GitTree
+from ..core.responses import json_response
 from ..models.repo import RepoIndex
-from ..models.file import FileNode
 
 router = APIRouter()
 
@@ -27,7 +31,7 @@ class IngestRequest(BaseModel):
 
 
 @router.post("/ingest", response_model=RepoIndex)
-async def ingest_repository(request: IngestRequest) -> RepoIndex:
+async def ingest_repository(request: IngestRequest, http_request: Request) -> Response:
     """
     Clone and analyze a GitHub repository.
     
@@ -36,26 +40,70 @@ async def ingest_repository(request: IngestRequest) -> RepoIndex:
     2. Scans for source files
     3. Detects the framework
     4. Builds a dependency graph
-    5. Returns a structured index of the repository
+    5. Returns a structured index of the repository (in the columnar form
+       of ``core.columnar`` if the client accepts it)
     
     Args:
         request: Contains the GitHub repository URL
+        http_request: Incoming request, for response compression
         
     Returns:
-        RepoIndex containing repository structure and metadata
+        RepoIndex containing repository structure and metadata, encoded
+        directly (see ``responses.json_response``)
         
     Raises:
         HTTPException: If cloning, scanning, or analysis fails
     """
+    # Cloning, scanning and graph building block: run them off the event loop
+    repo_index = await asyncio.to_thread(_ingest, request)
+    if columnar.accepts_columnar(http_request.headers.get("accept")):
+        with metrics.stage("columnar"):
+            encoded = await asyncio.to_thread(columnar.encode_index, repo_index)
+        return await json_response(http_request, encoded, media_type=columnar.COLUMNAR_MEDIA_TYPE)
+    return await json_response(http_request, repo_index)
+
+
+def _ingest(request: IngestRequest) -> dict:
+    """
+    Clone (or open the objects of) the repository and build its index.
+
+    Blocking; runs in a worker thread. Stage timings and spans still reach
+    the request, whose context ``asyncio.to_thread`` copies.
+
+    Returns:
+        The ``RepoIndex`` fields as a plain dict
+    """
     temp_dir = None
+    tree = None
+    # Mirror leases and worktrees, released in the finally block
+    resources = ExitStack()
     
     try:
         # Create temporary directory for cloning
         temp_dir = Path(tempfile.mkdtemp(prefix="repo_"))
         
-        # Clone repository
+        # Clone repository; in objects mode nothing is checked out and
+        # contents are streamed from git's object store. With mirrors, both
+        # modes work from the shared local mirror instead of the remote.
         try:
-            repo_loader.clone_repo(request.repo_url, temp_dir)
+            tracing.set_attribute("repo.url", request.repo_url)
+            with metrics.stage("clone"):
+                objects_mode = repo_loader.ANALYSIS_MODE == repo_loader.ANALYSIS_OBJECTS
+                if mirror_store.MIRRORS_ENABLED:
+                    mirror, commit = resources.enter_context(mirror_store.lease_mirror(request.repo_url))
+                    if objects_mode:
+                        tree = GitTree(mirror, commit, root=temp_dir)
+                    else:
+                        mirror_store.add_worktree(
+                            mirror, commit, temp_dir,
+                            sparse=repo_loader.CLONE_MODE == repo_loader.CLONE_PARTIAL
+                        )
+                        resources.callback(mirror_store.remove_worktree, mirror, temp_dir)
+                elif objects_mode:
+                    repo_loader.clone_bare(request.repo_url, temp_dir)
+                    tree = GitTree(temp_dir)
+                else:
+                    repo_loader.clone_repo(request.repo_url, temp_dir)
         except Exception as e:
             raise HTTPException(
                 status_code=400,
@@ -64,7 +112,16 @@ async def ingest_repository(request: IngestRequest) -> RepoIndex:
         
         # Scan files
         try:
-            file_paths = repo_loader.scan_files(temp_dir)
+            with metrics.stage("scan_files") as span:
+                all_paths = tree.files() if tree is not None else repo_loader.scan_files(temp_dir)
+                # Blob SHAs key the parse cache, so known blobs are not re-parsed
+                shas = tree.blob_shas() if tree is not None else repo_loader.blob_shas(temp_dir)
+                span.set("files.total", len(all_paths))
+            metrics.inc("files_scanned_total", len(all_paths))
+            # Oversized, binary, generated and vendored files are listed only
+            with metrics.stage("classify_files") as span:
+                file_paths, skipped = repo_loader.partition_files(temp_dir, all_paths, tree, shas)
+                span.set("files.skipped", len(skipped))
         except Exception as e:
             raise HTTPException(
                 status_code=500,
@@ -73,16 +130,27 @@ async def ingest_repository(request: IngestRequest) -> RepoIndex:
         
         # Detect framework
         try:
-            framework = detector.detect_framework(temp_dir)
+            with metrics.stage("detect_framework"):
+                matches = detector.detect_frameworks(temp_dir, tree)
+            framework = detector.detect_framework(temp_dir, tree, matches)
+            frameworks = {m.name: m.confidence for m in matches}
         except Exception as e:
             # Framework detection failure shouldn't block the process
             framework = "unknown"
+            frameworks = {}
         
         # Build dependency graph
+        context = None
         try:
             # Convert to absolute paths for processing
             absolute_paths = [temp_dir / path for path in file_paths]
-            abs_graph = graph_builder.build_dependency_graph(absolute_paths)
+            with metrics.stage("build_dependency_graph") as span:
+                # Shared with extract_imports_many, so both filter imports alike
+                context = languages.build_resolve_context(absolute_paths, temp_dir, tree)
+                abs_graph = graph_builder.build_dependency_graph(
+                    absolute_paths, repo_root=temp_dir, tree=tree, blob_shas=shas, context=context
+                )
+                span.set("graph.edges", sum(len(deps) for deps in abs_graph.values()))
             
             # Convert graph back to relative paths for response
             dependency_graph = {}
@@ -101,47 +169,64 @@ async def ingest_repository(request: IngestRequest) -> RepoIndex:
             # Graph building failure shouldn't block the process
             dependency_graph = {}
         
-        # Build FileNode objects
-        file_nodes = []
-        for file_path in file_paths:
-            absolute_path = temp_dir / file_path
+        # Extract imports for the file listing (parse cache hits after the graph)
+        try:
+            with metrics.stage("extract_imports"):
+                file_imports = graph_builder.extract_imports_many(
+                    [temp_dir / path for path in file_paths], temp_dir, tree, shas, context
+                )
+        except Exception:
+            file_imports = {}
+        
+        # Build FileNode entries as plain dicts: every field is produced
+        # here with the right type, so validating 50k models is wasted work
+        with metrics.stage("build_index") as span:
+            file_nodes = []
+            for file_path in all_paths:
+                absolute_path = temp_dir / file_path
+                skip_reason = skipped.get(file_path)
             
-            # Determine language from extension
-            language = _get_language(absolute_path)
+                # Determine language from extension
+                language = _get_language(absolute_path)
             
-            # Extract imports
-            try:
-                imports = graph_builder.extract_imports(absolute_path)
-            except Exception:
-                imports = []
+                # Extract imports
+                imports = file_imports.get(absolute_path, []) if skip_reason is None else []
             
-            # Get file size
-            try:
-                size = absolute_path.stat().st_size
-            except Exception:
-                size = 0
+                # Get file size
+                try:
+                    size = tree.size(file_path) if tree is not None else absolute_path.stat().st_size
+                except Exception:
+                    size = 0
             
-            file_node = FileNode(
-                path=str(file_path.as_posix()),
-                language=language,
-                imports=imports,
-                size=size,
-                file_type="source"
-            )
-            file_nodes.append(file_node)
+                file_nodes.append({
+                    "path": file_path.as_posix(),
+                    "language": language,
+                    "imports": imports,
+                    "size": size,
+                    "file_type": "source" if skip_reason is None else "skipped",
+                    "skip_reason": skip_reason
+                })
+            span.set("repo.bytes", sum(node["size"] for node in file_nodes))
         
-        # Create RepoIndex
-        repo_index = RepoIndex(
-            repo_url=request.repo_url,
-            framework=framework,
-            files=file_nodes,
-            dependency_graph=dependency_graph,
-            total_files=len(file_nodes)
-        )
+        # Create the RepoIndex payload (same fields as the model)
+        repo_index = {
+            "repo_url": request.repo_url,
+            "framework": framework,
+            "frameworks": frameworks,
+            "files": file_nodes,
+            "dependency_graph": dependency_graph,
+            "total_files": len(file_nodes),
+            "patterns": {},
+            "pattern_matches": {},
+            "indexed_at": datetime.utcnow()
+        }
         
         return repo_index
-        
+
     finally:
+        if tree is not None:
+            tree.close()
+        resources.close()
         # Clean up temporary directory
         if temp_dir and temp_dir.exists():
             try:
@@ -1,25 +1,30 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 
 from app.core.github_client import GithubClient
-from app.core.security import get_current_hr_user
+from app.core.security import CurrentUser, get_current_hr_user
 from app.models.profile import ProfileAnalysis
-from app.models.user import User
 
 router = APIRouter()
 
 @router.get("/profile/{username}", response_model=ProfileAnalysis)
 async def analyze_profile(
     username: str,
-    current_user: Annotated[User, Depends(get_current_hr_user)]
+    current_user: Annotated[CurrentUser, Depends(get_current_hr_user)],
+    language_breakdown: bool = Query(False, description="Fetch byte-weighted language stats per repo"),
+    top_n: int = Query(30, ge=1, le=200, description="Number of top repos to include in the breakdown")
 ):
     """
     Analyze a GitHub user profile.
     """
     client = GithubClient()
     try:
-        analysis = await client.analyze_profile(username)
+        analysis = await client.analyze_profile(
+            username,
+            language_breakdown=language_breakdown,
+            top_n=top_n
+        )
         return analysis
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
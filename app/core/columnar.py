@@ -0,0 +1,158 @@
+"""
+Columnar wire format for ``RepoIndex``.
+
+The JSON form of ``RepoIndex.files`` repeats every key per file and spells
+out languages, file types and import names each time. Clients that send
+``Accept: application/vnd.codesense.index.columnar+json`` get the index with
+``files`` and ``dependency_graph`` replaced by columns instead:
+
+- path table: path ``i`` is ``dirs[path_dirs[i]] + '/' + path_names[i]``
+  (just the name when the directory is ``''``); the first ``file_count``
+  paths are the files, followed by graph targets that are not listed files
+- ``languages`` / ``file_types`` / ``skip_reasons``: value tables, indexed by
+  the per-file ``language`` / ``file_type`` / ``skip_reason`` code arrays
+  (``skip_reasons[0]`` is null)
+- ``sizes``: per-file sizes
+- ``import_names``: interned import table; file ``i``'s imports are
+  ``import_ids[import_offsets[i]:import_offsets[i + 1]]``
+- ``graph_sources``: path ids of the graph's keys; key ``k``'s dependencies
+  are ``graph_targets[graph_offsets[k]:graph_offsets[k + 1]]`` (path ids)
+
+Every other ``RepoIndex`` field is passed through unchanged. ``decode_index``
+restores the regular form; ``app/static/app.js`` has the same decoder.
+"""
+from itertools import accumulate
+
+
+COLUMNAR_MEDIA_TYPE = "application/vnd.codesense.index.columnar+json"
+COLUMNAR_VERSION = 1
+
+
+def accepts_columnar(accept: str | None) -> bool:
+    """Whether an ``Accept`` header lists the columnar media type (with q > 0)."""
+    if not accept:
+        return False
+    for item in accept.split(','):
+        media_type, _, params = item.strip().partition(';')
+        if media_type.strip().lower() != COLUMNAR_MEDIA_TYPE:
+            continue
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                return float(params[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+def encode_index(index: dict) -> dict:
+    """
+    Convert a ``RepoIndex`` payload (plain dict, as built by the handlers)
+    to the columnar form.
+    """
+    # Interning tables map value -> id in first-seen order; ``setdefault``
+    # with the table's length is the whole interning step
+    files = index["files"]
+    paths = {f["path"]: i for i, f in enumerate(files)}
+    if len(paths) != len(files):
+        # Path ids below file_count must be file indexes
+        raise ValueError("RepoIndex.files has duplicate paths")
+    languages: dict = {}
+    file_types: dict = {}
+    skip_reasons: dict = {None: 0}
+    import_names: dict = {}
+
+    language = [languages.setdefault(f["language"], len(languages)) for f in files]
+    file_type = [file_types.setdefault(f["file_type"], len(file_types)) for f in files]
+    skip_reason = [skip_reasons.setdefault(f.get("skip_reason"), len(skip_reasons)) for f in files]
+    sizes = [f["size"] for f in files]
+    # Flat comprehensions: a per-file loop costs more than the interning
+    import_offsets = [0, *accumulate(len(f["imports"]) for f in files)]
+    import_ids = [
+        import_names.setdefault(name, len(import_names))
+        for f in files for name in f["imports"]
+    ]
+
+    graph = index["dependency_graph"]
+    graph_sources = [paths.setdefault(source, len(paths)) for source in graph]
+    graph_offsets = [0, *accumulate(len(targets) for targets in graph.values())]
+    graph_targets = [
+        paths.setdefault(target, len(paths))
+        for targets in graph.values() for target in targets
+    ]
+
+    # Paths share few directories: store each once
+    dirs: dict[str, int] = {}
+    path_dirs, path_names = [], []
+    for path in paths:
+        directory, _, name = path.rpartition('/')
+        path_dirs.append(dirs.setdefault(directory, len(dirs)))
+        path_names.append(name)
+
+    encoded = {
+        key: value for key, value in index.items()
+        if key not in ("files", "dependency_graph")
+    }
+    encoded.update({
+        "format": "columnar",
+        "format_version": COLUMNAR_VERSION,
+        "file_count": len(files),
+        "dirs": list(dirs),
+        "path_dirs": path_dirs,
+        "path_names": path_names,
+        "languages": list(languages),
+        "language": language,
+        "file_types": list(file_types),
+        "file_type": file_type,
+        "skip_reasons": list(skip_reasons),
+        "skip_reason": skip_reason,
+        "sizes": sizes,
+        "import_names": list(import_names),
+        "import_offsets": import_offsets,
+        "import_ids": import_ids,
+        "graph_sources": graph_sources,
+        "graph_offsets": graph_offsets,
+        "graph_targets": graph_targets,
+    })
+    return encoded
+
+
+def decode_index(encoded: dict) -> dict:
+    """Inverse of ``encode_index``."""
+    dirs = encoded["dirs"]
+    paths = [
+        f"{dirs[d]}/{name}" if dirs[d] else name
+        for d, name in zip(encoded["path_dirs"], encoded["path_names"])
+    ]
+    languages, file_types = encoded["languages"], encoded["file_types"]
+    skip_reasons, import_names = encoded["skip_reasons"], encoded["import_names"]
+    import_offsets, import_ids = encoded["import_offsets"], encoded["import_ids"]
+
+    files = [
+        {
+            "path": paths[i],
+            "language": languages[encoded["language"][i]],
+            "imports": [import_names[j] for j in import_ids[import_offsets[i]:import_offsets[i + 1]]],
+            "size": encoded["sizes"][i],
+            "file_type": file_types[encoded["file_type"][i]],
+            "skip_reason": skip_reasons[encoded["skip_reason"][i]],
+        }
+        for i in range(encoded["file_count"])
+    ]
+    offsets, targets = encoded["graph_offsets"], encoded["graph_targets"]
+    graph = {
+        paths[source]: [paths[t] for t in targets[offsets[k]:offsets[k + 1]]]
+        for k, source in enumerate(encoded["graph_sources"])
+    }
+
+    columns = {
+        "format", "format_version", "file_count", "dirs", "path_dirs", "path_names",
+        "languages", "language", "file_types", "file_type", "skip_reasons", "skip_reason", "sizes",
+        "import_names", "import_offsets", "import_ids",
+        "graph_sources", "graph_offsets", "graph_targets",
+    }
+    decoded = {key: value for key, value in encoded.items() if key not in columns}
+    decoded["files"] = files
+    decoded["dependency_graph"] = graph
+    return decoded
@@ -1,16 +1,130 @@
+import os
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 sqlite_file_name = "database.db"
-sqlite_url = f"sqlite:///{sqlite_file_name}"
+sqlite_url = os.getenv("DATABASE_URL", f"sqlite:///{sqlite_file_name}")
+
+# SQLite tuning. WAL lets readers proceed while a writer commits, NORMAL
+# synchronous is safe under WAL, and the busy timeout makes concurrent writers
+# wait for the lock instead of failing immediately with "database is locked".
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+# Connection pool sizing (shared by the sync and async engines)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+
+# Per-request DB query counter. Holds a mutable one-element list so that
+# increments made from threadpool-run sync dependencies are visible to the
+# request that started the count.
+_query_counter: ContextVar[Optional[list]] = ContextVar("db_query_counter", default=None)
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    counter = _query_counter.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+
+
+def _instrument(sync_engine: Engine) -> None:
+    event.listen(sync_engine, "before_cursor_execute", _count_query)
+    if sync_engine.dialect.name == "sqlite":
+        event.listen(sync_engine, "connect", _apply_sqlite_pragmas)
+
+
+def _pool_kwargs(url: str, overrides: dict) -> dict:
+    """
+    ``DB_POOL_SIZE``/``DB_MAX_OVERFLOW`` if the engine's pool takes them.
+
+    Only ``QueuePool`` (and its async variant) is sized; in-memory SQLite
+    gets a ``SingletonThreadPool`` or ``StaticPool``, which reject them.
+    """
+    poolclass = overrides.get("poolclass")
+    if poolclass is None:
+        parsed = make_url(url)
+        poolclass = parsed.get_dialect().get_pool_class(parsed)
+    if not issubclass(poolclass, QueuePool):
+        return {}
+    return {"pool_size": DB_POOL_SIZE, "max_overflow": DB_MAX_OVERFLOW}
+
 
-connect_args = {"check_same_thread": False}
-engine = create_engine(sqlite_url, connect_args=connect_args)
+def make_engine(url: str = sqlite_url, **engine_kwargs) -> Engine:
+    """
+    Create the sync engine with SQLite pragmas and a sized connection pool.
+
+    Args:
+        url: Database URL
+        engine_kwargs: Passed to ``create_engine``, overriding the defaults
+            (e.g. ``poolclass`` or ``pool_size``)
+    """
+    kwargs = {**_pool_kwargs(url, engine_kwargs), "pool_pre_ping": True}
+    if url.startswith("sqlite"):
+        kwargs["connect_args"] = {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+    new_engine = create_engine(url, **{**kwargs, **engine_kwargs})
+    _instrument(new_engine)
+    return new_engine
+
+
+def make_async_engine(url: str = sqlite_url, **engine_kwargs) -> AsyncEngine:
+    """
+    Create the aiosqlite-backed async engine used by the auth routes.
+
+    ``engine_kwargs`` are passed to ``create_async_engine``, overriding the
+    defaults.
+    """
+    if url.startswith("sqlite:"):
+        url = url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    kwargs = _pool_kwargs(url, engine_kwargs)
+    if url.startswith("sqlite"):
+        kwargs["connect_args"] = {"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+    new_engine = create_async_engine(url, **{**kwargs, **engine_kwargs})
+    _instrument(new_engine.sync_engine)
+    return new_engine
+
+
+engine = make_engine()
+async_engine = make_async_engine()
+async_session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+def start_query_count() -> list:
+    """Start counting queries for the current context and return the counter."""
+    counter = [0]
+    _query_counter.set(counter)
+    return counter
 
 
 def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
 
 
+async def dispose_engines():
+    await async_engine.dispose()
+    engine.dispose()
+
+
 def get_session():
     with Session(engine) as session:
         yield session
+
+
+async def get_async_session():
+    async with async_session_factory() as session:
+        yield session
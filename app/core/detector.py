@@ -1,203 +1,450 @@
 """
 Framework and technology detection logic.
+
+Detection works in two steps. ``scan_manifests`` lists the repository root once
+and parses each known manifest (package.json, requirements.txt, pyproject.toml,
+go.mod, Cargo.toml, pom.xml, Gemfile) exactly once into a ``RepoManifests``.
+``detect_frameworks`` then evaluates the data-driven ``FRAMEWORK_RULES`` table
+against that structure in a single pass. Supporting a new framework means
+adding a rule, not a new ``_is_*`` function.
 """
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from pathlib import Path
 import json
+import os
+import re
+import tomllib
+from stat import S_ISREG
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from .git_objects import GitTree
+
+
+# Files whose content some rules inspect (read once, capped in size)
+ENTRY_POINT_FILES = ('main.py', 'app.py', 'api.py')
+ENTRY_POINT_MAX_BYTES = 256 * 1024
+
+# Rules scoring below this are not reported
+MIN_CONFIDENCE = 0.5
+
+_REQUIREMENT_NAME = re.compile(r'^\s*([A-Za-z0-9][A-Za-z0-9._\-]*)')
+_GO_REQUIRE = re.compile(r'^\s*(?:require\s+)?([^\s()]+)\s+v[^\s]+', re.MULTILINE)
+_GO_MODULE = re.compile(r'^\s*module\s+(\S+)', re.MULTILINE)
+_MAVEN_ARTIFACT = re.compile(r'<artifactId>\s*([^<\s]+)\s*</artifactId>')
+_GEM = re.compile(r'''^\s*gem\s+['"]([^'"]+)['"]''', re.MULTILINE)
+
+
+@dataclass
+class RepoManifests:
+    """Parsed view of a repository's root-level manifests."""
+    root_files: set[str] = field(default_factory=set)
+    root_dirs: set[str] = field(default_factory=set)
+    npm: set[str] = field(default_factory=set)
+    pypi: set[str] = field(default_factory=set)
+    go: set[str] = field(default_factory=set)
+    go_module: str | None = None
+    cargo: set[str] = field(default_factory=set)
+    maven: set[str] = field(default_factory=set)
+    gems: set[str] = field(default_factory=set)
+    subdir_files: set[str] = field(default_factory=set)
+    sources: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class FrameworkMatch:
+    """A framework detected in a repository."""
+    name: str
+    confidence: float
+    evidence: list[str] = field(default_factory=list)
+
+
+# Each rule lists (signal kind, value, weight) triples. Signal kinds:
+#   file    - file or directory at the repo root
+#   subfile - file one directory below the root, e.g. "settings.py"
+#   npm / pypi / go / cargo / maven / gem - declared dependency
+#   source  - substring of one of ENTRY_POINT_FILES
+# Weights combine as independent evidence: 1 - prod(1 - w).
+# Order matters: detect_framework() returns the first matching rule, so
+# specific frameworks come before the generic ecosystem fallbacks.
+FRAMEWORK_RULES: list[tuple[str, list[tuple[str, str, float]]]] = [
+    ("nextjs", [
+        ("file", "next.config.js", 0.9),
+        ("file", "next.config.mjs", 0.9),
+        ("file", "next.config.ts", 0.9),
+        ("npm", "next", 0.9),
+    ]),
+    ("nestjs", [
+        ("npm", "@nestjs/core", 0.9),
+        ("file", "nest-cli.json", 0.8),
+    ]),
+    ("express", [
+        ("npm", "express", 0.8),
+    ]),
+    ("fastapi", [
+        ("pypi", "fastapi", 0.8),
+        ("source", "from fastapi import", 0.8),
+        ("source", "import fastapi", 0.8),
+    ]),
+    ("django", [
+        ("file", "manage.py", 0.9),
+        ("pypi", "django", 0.8),
+        ("pypi", "djangorestframework", 0.8),
+        ("subfile", "settings.py", 0.3),
+    ]),
+    ("flask", [
+        ("pypi", "flask", 0.8),
+        ("source", "from flask import", 0.8),
+    ]),
+    ("spring", [
+        ("maven", "spring-boot-starter-parent", 0.9),
+        ("maven", "spring-boot-starter-web", 0.9),
+        ("file", "build.gradle", 0.2),
+    ]),
+    ("rails", [
+        ("gem", "rails", 0.9),
+        ("file", "config.ru", 0.3),
+    ]),
+    ("gin", [
+        ("go", "github.com/gin-gonic/gin", 0.9),
+    ]),
+    ("echo", [
+        ("go", "github.com/labstack/echo/v4", 0.9),
+    ]),
+    ("actix", [
+        ("cargo", "actix-web", 0.9),
+    ]),
+    ("axum", [
+        ("cargo", "axum", 0.9),
+    ]),
+    ("react", [
+        ("npm", "react", 0.7),
+    ]),
+    ("vue", [
+        ("npm", "vue", 0.8),
+        ("file", "vue.config.js", 0.8),
+    ]),
+    ("nodejs", [
+        ("file", "package.json", 0.9),
+        ("file", "node_modules", 0.6),
+    ]),
+    ("python", [
+        ("file", "requirements.txt", 0.8),
+        ("file", "setup.py", 0.8),
+        ("file", "pyproject.toml", 0.8),
+        ("file", "Pipfile", 0.8),
+        ("file", "poetry.lock", 0.8),
+    ]),
+    ("go", [
+        ("file", "go.mod", 0.9),
+    ]),
+    ("rust", [
+        ("file", "Cargo.toml", 0.9),
+    ]),
+    ("java", [
+        ("file", "pom.xml", 0.9),
+        ("file", "build.gradle", 0.8),
+        ("file", "build.gradle.kts", 0.8),
+    ]),
+    ("ruby", [
+        ("file", "Gemfile", 0.9),
+    ]),
+]
+
+# File names probed one directory below the root ("subfile" signals)
+SUBDIR_FILES = tuple(sorted({
+    value for _, signals in FRAMEWORK_RULES for kind, value, _ in signals if kind == 'subfile'
+}))
 
+# Parsed manifests keyed by (repo path, fingerprint of every probed path)
+_MANIFEST_CACHE: "OrderedDict[tuple, RepoManifests]" = OrderedDict()
+MANIFEST_CACHE_SIZE = 64
 
-def detect_framework(repo_path: Path) -> str:
+
+def detect_framework(
+    repo_path: Path,
+    tree: "GitTree | None" = None,
+    matches: list[FrameworkMatch] | None = None
+) -> str:
     """
     Detect the primary framework used in a repository.
     
     Args:
         repo_path: Path to repository
+        tree: Read manifests from this ``GitTree`` instead of disk
+        matches: Result of ``detect_frameworks`` for the repository, if the
+            caller already has it
         
     Returns:
         Framework name or "unknown"
         
     Detection is based on presence of framework-specific configuration files
-    and package dependencies.
+    and package dependencies. The first matching rule in ``FRAMEWORK_RULES``
+    wins.
     """
-    if not repo_path.exists() or not repo_path.is_dir():
+    if matches is None:
+        matches = detect_frameworks(repo_path, tree)
+    if not matches:
         return "unknown"
-    
-    # Check for Next.js (highest priority for Node.js projects)
-    if _is_nextjs(repo_path):
-        return "nextjs"
-    
-    # Check for Node.js/Express
-    if _is_nodejs_express(repo_path):
-        return "express"
-    
-    # Check for FastAPI
-    if _is_fastapi(repo_path):
-        return "fastapi"
-    
-    # Check for Django
-    if _is_django(repo_path):
-        return "django"
-    
-    # Check for generic Node.js
-    if _is_nodejs(repo_path):
-        return "nodejs"
-    
-    # Check for generic Python
-    if _is_python(repo_path):
-        return "python"
-    
-    return "unknown"
+    return matches[0].name
 
 
-def _is_nextjs(repo_path: Path) -> bool:
-    """Check if repository is a Next.js project."""
-    # Check for next.config.js or next.config.mjs
-    if (repo_path / "next.config.js").exists():
-        return True
-    if (repo_path / "next.config.mjs").exists():
-        return True
-    
-    # Check package.json for Next.js dependency
-    package_json = repo_path / "package.json"
-    if package_json.exists():
-        try:
-            with open(package_json, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                dependencies = data.get('dependencies', {})
-                dev_dependencies = data.get('devDependencies', {})
-                
-                if 'next' in dependencies or 'next' in dev_dependencies:
-                    return True
-        except (json.JSONDecodeError, OSError):
-            pass
-    
-    return False
+def detect_frameworks(repo_path: Path, tree: "GitTree | None" = None) -> list[FrameworkMatch]:
+    """
+    Detect every framework with confidence >= ``MIN_CONFIDENCE``.
 
+    Args:
+        repo_path: Path to repository
+        tree: Read manifests from this ``GitTree`` instead of disk
 
-def _is_nodejs_express(repo_path: Path) -> bool:
-    """Check if repository is a Node.js Express project."""
-    package_json = repo_path / "package.json"
-    if not package_json.exists():
-        return False
-    
-    try:
-        with open(package_json, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            dependencies = data.get('dependencies', {})
-            
-            # Check for Express in dependencies
-            if 'express' in dependencies:
-                return True
-    except (json.JSONDecodeError, OSError):
-        pass
-    
-    return False
+    Returns:
+        Matches in ``FRAMEWORK_RULES`` order (i.e. most specific first)
+    """
+    if tree is None and (not repo_path.exists() or not repo_path.is_dir()):
+        return []
 
+    manifests = scan_manifests(repo_path, tree)
+    matches = []
 
-def _is_nodejs(repo_path: Path) -> bool:
-    """Check if repository is a Node.js project."""
-    # Check for package.json
-    if (repo_path / "package.json").exists():
-        return True
-    
-    # Check for node_modules (might exist even without package.json)
-    if (repo_path / "node_modules").exists():
-        return True
-    
-    return False
+    for name, signals in FRAMEWORK_RULES:
+        miss = 1.0
+        evidence = []
+        for kind, value, weight in signals:
+            if _has_signal(manifests, kind, value):
+                miss *= 1.0 - weight
+                evidence.append(f"{kind}:{value}")
+        confidence = round(1.0 - miss, 3)
+        if confidence >= MIN_CONFIDENCE:
+            matches.append(FrameworkMatch(name=name, confidence=confidence, evidence=evidence))
 
+    return matches
 
-def _is_fastapi(repo_path: Path) -> bool:
-    """Check if repository is a FastAPI project."""
-    # Check for common FastAPI entry point files
-    fastapi_files = ['main.py', 'app.py', 'api.py']
-    
-    for filename in fastapi_files:
-        file_path = repo_path / filename
-        if file_path.exists():
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    # Check for FastAPI imports
-                    if 'from fastapi import' in content or 'import fastapi' in content:
-                        return True
-            except OSError:
-                pass
-    
-    # Check requirements.txt
-    requirements = repo_path / "requirements.txt"
-    if requirements.exists():
-        try:
-            with open(requirements, 'r', encoding='utf-8') as f:
-                content = f.read().lower()
-                if 'fastapi' in content:
-                    return True
-        except OSError:
-            pass
-    
-    # Check pyproject.toml
-    pyproject = repo_path / "pyproject.toml"
-    if pyproject.exists():
-        try:
-            with open(pyproject, 'r', encoding='utf-8') as f:
-                content = f.read().lower()
-                if 'fastapi' in content:
-                    return True
-        except OSError:
-            pass
-    
-    return False
 
+def scan_manifests(repo_path: Path, tree: "GitTree | None" = None) -> RepoManifests:
+    """
+    Parse the repository's root manifests, reading each file at most once.
 
-def _is_django(repo_path: Path) -> bool:
-    """Check if repository is a Django project."""
-    # Check for manage.py (Django's management script)
-    if (repo_path / "manage.py").exists():
-        return True
-    
-    # Check for Django-specific directories
-    for item in repo_path.iterdir():
-        if item.is_dir():
-            # Check for settings.py in subdirectories
-            settings_file = item / "settings.py"
-            if settings_file.exists():
-                try:
-                    with open(settings_file, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        if 'DJANGO_SETTINGS_MODULE' in content or 'django.conf' in content:
-                            return True
-                except OSError:
-                    pass
-    
-    # Check requirements.txt for Django
-    requirements = repo_path / "requirements.txt"
-    if requirements.exists():
+    Results are cached and reused while every path detection looks at (the
+    root listing and the ``SUBDIR_FILES`` probes, with sizes and mtimes) is
+    unchanged, or, for a ``GitTree``, per commit.
+    """
+    if tree is not None:
+        return _scan_tree_manifests(tree)
+
+    try:
+        entries = list(os.scandir(repo_path))
+    except OSError:
+        return RepoManifests()
+
+    fingerprint = []
+    manifests = RepoManifests()
+    for entry in entries:
         try:
-            with open(requirements, 'r', encoding='utf-8') as f:
-                content = f.read().lower()
-                if 'django' in content and 'djangorestframework' not in content:
-                    return True
-                # Django REST framework also indicates Django
-                if 'djangorestframework' in content:
-                    return True
+            if entry.is_dir():
+                manifests.root_dirs.add(entry.name)
+                fingerprint.append((entry.name, 0, 0))
+            else:
+                st = entry.stat()
+                manifests.root_files.add(entry.name)
+                fingerprint.append((entry.name, st.st_size, st.st_mtime_ns))
         except OSError:
-            pass
-    
-    return False
+            continue
 
+    # One level down: only existence checks, no reads. Every probe is part of
+    # the fingerprint, so adding or removing such a file invalidates the entry.
+    for dirname in manifests.root_dirs:
+        for filename in SUBDIR_FILES:
+            probe = f"{dirname}/{filename}"
+            try:
+                st = (repo_path / probe).stat()
+            except OSError:
+                continue
+            if not S_ISREG(st.st_mode):
+                continue
+            manifests.subdir_files.add(filename)
+            fingerprint.append((probe, st.st_size, st.st_mtime_ns))
 
-def _is_python(repo_path: Path) -> bool:
-    """Check if repository is a Python project."""
-    # Check for Python-specific files
-    python_markers = [
-        'requirements.txt',
-        'setup.py',
-        'pyproject.toml',
-        'Pipfile',
-        'poetry.lock',
-    ]
-    
-    for marker in python_markers:
-        if (repo_path / marker).exists():
-            return True
-    
+    key = (str(repo_path.resolve()), tuple(sorted(fingerprint)))
+    cached = _MANIFEST_CACHE.get(key)
+    if cached is not None:
+        _MANIFEST_CACHE.move_to_end(key)
+        return cached
+
+    _parse_manifests(manifests, lambda name, limit=-1: _read(repo_path / name, limit))
+    _remember(key, manifests)
+    return manifests
+
+
+def _scan_tree_manifests(tree: "GitTree") -> RepoManifests:
+    """``scan_manifests`` over a commit's git objects."""
+    key = (str(tree.git_dir), tree.commit)
+    cached = _MANIFEST_CACHE.get(key)
+    if cached is not None:
+        _MANIFEST_CACHE.move_to_end(key)
+        return cached
+
+    manifests = RepoManifests(root_files=set(tree.root_files), root_dirs=set(tree.root_dirs))
+
+    def read(name: str, limit: int = -1) -> str:
+        return tree.read_text(name, limit) if tree.exists(name) else ''
+
+    _parse_manifests(manifests, read)
+    manifests.subdir_files = {
+        filename for filename in SUBDIR_FILES
+        if any(tree.exists(f"{dirname}/{filename}") for dirname in manifests.root_dirs)
+    }
+
+    _remember(key, manifests)
+    return manifests
+
+
+def _parse_manifests(manifests: RepoManifests, read: Callable[..., str]) -> None:
+    """Parse the known root manifests listed in ``manifests.root_files``."""
+    files = manifests.root_files
+    if 'package.json' in files:
+        manifests.npm = _parse_package_json(read('package.json'))
+    if 'requirements.txt' in files:
+        manifests.pypi |= _parse_requirements(read('requirements.txt'))
+    if 'pyproject.toml' in files:
+        manifests.pypi |= _parse_pyproject(read('pyproject.toml'))
+    if 'go.mod' in files:
+        manifests.go_module, manifests.go = _parse_go_mod(read('go.mod'))
+    if 'Cargo.toml' in files:
+        manifests.cargo = _parse_cargo(read('Cargo.toml'))
+    if 'pom.xml' in files:
+        manifests.maven = set(_MAVEN_ARTIFACT.findall(read('pom.xml')))
+    if 'Gemfile' in files:
+        manifests.gems = set(_GEM.findall(read('Gemfile')))
+
+    for filename in ENTRY_POINT_FILES:
+        if filename in files:
+            manifests.sources[filename] = read(filename, ENTRY_POINT_MAX_BYTES)
+
+
+def _remember(key: tuple, manifests: RepoManifests) -> None:
+    _MANIFEST_CACHE[key] = manifests
+    while len(_MANIFEST_CACHE) > MANIFEST_CACHE_SIZE:
+        _MANIFEST_CACHE.popitem(last=False)
+
+
+def _has_signal(manifests: RepoManifests, kind: str, value: str) -> bool:
+    """Check a single rule signal against parsed manifests."""
+    if kind == 'file':
+        return value in manifests.root_files or value in manifests.root_dirs
+    if kind == 'subfile':
+        return value in manifests.subdir_files
+    if kind == 'npm':
+        return value in manifests.npm
+    if kind == 'pypi':
+        return value in manifests.pypi
+    if kind == 'go':
+        return value in manifests.go
+    if kind == 'cargo':
+        return value in manifests.cargo
+    if kind == 'maven':
+        return value in manifests.maven
+    if kind == 'gem':
+        return value in manifests.gems
+    if kind == 'source':
+        return any(value in content for content in manifests.sources.values())
     return False
+
+
+def _read(file_path: Path, limit: int = -1) -> str:
+    try:
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            return f.read(limit)
+    except OSError:
+        return ''
+
+
+def _normalize_package(name: str) -> str:
+    return name.strip().lower().replace('_', '-')
+
+
+def _parse_package_json(content: str) -> set[str]:
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError:
+        return set()
+    if not isinstance(data, dict):
+        return set()
+    names = set()
+    for section in ('dependencies', 'devDependencies', 'peerDependencies'):
+        deps = data.get(section)
+        if isinstance(deps, dict):
+            names.update(deps)
+    return names
+
+
+def _parse_requirements(content: str) -> set[str]:
+    names = set()
+    for line in content.splitlines():
+        line = line.split('#', 1)[0].strip()
+        if not line or line.startswith('-'):
+            continue
+        match = _REQUIREMENT_NAME.match(line)
+        if match:
+            names.add(_normalize_package(match.group(1)))
+    return names
+
+
+def _table(data: object, key: str) -> dict:
+    """``data[key]`` if both are TOML tables, else an empty one."""
+    value = data.get(key) if isinstance(data, dict) else None
+    return value if isinstance(value, dict) else {}
+
+
+def _array(data: dict, key: str) -> list:
+    value = data.get(key)
+    return value if isinstance(value, list) else []
+
+
+def _parse_pyproject(content: str) -> set[str]:
+    try:
+        data = tomllib.loads(content)
+    except tomllib.TOMLDecodeError:
+        return set()
+
+    # Hand-written manifests can hold anything: skip fields of the wrong type
+    names = set()
+    project = _table(data, 'project')
+    requirements = _array(project, 'dependencies')
+    for extra in _table(project, 'optional-dependencies').values():
+        if isinstance(extra, list):
+            requirements = requirements + extra
+    for requirement in requirements:
+        match = _REQUIREMENT_NAME.match(requirement) if isinstance(requirement, str) else None
+        if match:
+            names.add(_normalize_package(match.group(1)))
+
+    poetry = _table(_table(data, 'tool'), 'poetry')
+    for section in ('dependencies', 'dev-dependencies'):
+        names.update(_normalize_package(n) for n in _table(poetry, section))
+    for group in _table(poetry, 'group').values():
+        names.update(_normalize_package(n) for n in _table(group, 'dependencies'))
+
+    names.discard('python')
+    return names
+
+
+def _parse_go_mod(content: str) -> tuple[str | None, set[str]]:
+    module = _GO_MODULE.search(content)
+    requires = {
+        path for path in _GO_REQUIRE.findall(content)
+        if path not in ('module', 'go', 'toolchain')
+    }
+    return (module.group(1) if module else None), requires
+
+
+def _parse_cargo(content: str) -> set[str]:
+    try:
+        data = tomllib.loads(content)
+    except tomllib.TOMLDecodeError:
+        return set()
+    names = set()
+    for section in ('dependencies', 'dev-dependencies', 'build-dependencies'):
+        names.update(_table(data, section))
+    names.update(_table(_table(data, 'workspace'), 'dependencies'))
+    return names
@@ -0,0 +1,71 @@
+"""
+File system helpers shared by the on-disk stores (mirrors, workspaces).
+
+``file_lock`` is an ``flock`` file lock, so it also holds across worker
+processes; where ``fcntl`` is unavailable it only holds within the process.
+"""
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+# Fallback locks when fcntl is unavailable
+_process_locks: dict[str, threading.Lock] = {}
+_process_locks_guard = threading.Lock()
+
+
+@contextmanager
+def file_lock(path: Path, exclusive: bool = True, blocking: bool = True) -> Iterator[bool]:
+    """
+    Hold an flock on ``path`` for the duration of the block.
+
+    Yields:
+        False if ``blocking`` is off and the lock is held elsewhere
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if fcntl is None:
+        with _process_locks_guard:
+            lock = _process_locks.setdefault(str(path), threading.Lock())
+        if not exclusive:
+            yield True
+            return
+        acquired = lock.acquire(blocking)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                lock.release()
+        return
+
+    with open(path, 'a+') as f:
+        flags = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+        if not blocking:
+            flags |= fcntl.LOCK_NB
+        try:
+            fcntl.flock(f.fileno(), flags)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def disk_usage(path: Path) -> int:
+    """Total size in bytes of the files under ``path``; walks the whole tree."""
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.lstat(os.path.join(dirpath, name)).st_size
+            except OSError:
+                continue
+    return total
@@ -0,0 +1,217 @@
+"""
+Checkout-free repository access through git's object database.
+
+A ``GitTree`` lists a commit's files from the tree objects of a bare clone
+and streams blob contents through one long-lived ``git cat-file --batch``
+process, so analysis never writes a working tree to disk. Paths handed to
+its methods may be relative to the repository or absolute under
+``GitTree.root`` (the bare clone directory unless given), which lets the path-based
+analysis code address blobs the same way it addresses checked-out files.
+"""
+import os
+import subprocess
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from . import tracing
+from .repo_loader import IGNORE_DIRS, MANIFEST_FILES, SOURCE_EXTENSIONS
+
+
+# Read size for the part of a blob beyond a read() limit
+_DRAIN_CHUNK = 64 * 1024
+
+
+@dataclass
+class TreeEntry:
+    """A blob in the analyzed commit."""
+    sha: str
+    size: int = -1
+
+
+def _git(git_dir: Path, *args: str, stdin: str | None = None) -> str:
+    result = subprocess.run(
+        ['git', '--git-dir', str(git_dir), *args],
+        input=stdin,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return result.stdout
+
+
+def _is_ignored(rel_posix: str) -> bool:
+    return any(part in IGNORE_DIRS for part in rel_posix.split('/')[:-1])
+
+
+def _is_wanted(rel_posix: str) -> bool:
+    """Blobs analysis may read: source files and known manifests."""
+    if _is_ignored(rel_posix):
+        return False
+    name = rel_posix.rsplit('/', 1)[-1]
+    return name in MANIFEST_FILES or os.path.splitext(name)[1] in SOURCE_EXTENSIONS
+
+
+class GitTree:
+    """
+    Read-only view of one commit in a bare repository.
+
+    Opening a tree lists it with ``git ls-tree -r`` (tree objects only),
+    fetches any wanted blobs a blobless clone left on the server in a single
+    request, and sizes them with ``git cat-file --batch-check``. Blobs that
+    are never analyzed (images, datasets, ignored directories) are neither
+    fetched nor sized.
+
+    Use as a context manager, or call ``close()``, to stop the reader process.
+    """
+
+    def __init__(self, git_dir: Path, rev: str = 'HEAD', root: Optional[Path] = None):
+        self.git_dir = git_dir
+        # Absolute paths under ``root`` address blobs; defaults to the git dir
+        self.root = root if root is not None else git_dir
+        self.rev = rev
+        self.entries: dict[str, TreeEntry] = {}
+        self.root_files: set[str] = set()
+        self.root_dirs: set[str] = set()
+        self._reader: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+        self.commit = _git(git_dir, 'rev-parse', rev).strip()
+        for entry in _git(git_dir, 'ls-tree', '-r', '-z', '--full-tree', self.commit).split('\0'):
+            if not entry:
+                continue
+            meta, path = entry.split('\t', 1)
+            mode, kind, sha = meta.split()
+            top, _, rest = path.partition('/')
+            if rest:
+                # Like a sparse checkout, which leaves ignored directories out
+                if top not in IGNORE_DIRS:
+                    self.root_dirs.add(top)
+            else:
+                self.root_files.add(top)
+            # Skip submodules (commit entries) and symlinks
+            if kind == 'blob' and mode != '120000' and _is_wanted(path):
+                self.entries[path] = TreeEntry(sha)
+
+        self._prefetch()
+        self._load_sizes()
+
+    def _prefetch(self) -> None:
+        """Download the wanted blobs a partial clone is missing, in one fetch."""
+        missing = {
+            line[1:] for line in _git(
+                self.git_dir, 'rev-list', '--objects', '--missing=print', self.commit
+            ).splitlines()
+            if line.startswith('?')
+        }
+        wanted = sorted({entry.sha for entry in self.entries.values()} & missing)
+        if not wanted:
+            return
+        with tracing.span("git.fetch_blobs", blobs=len(wanted)) as span:
+            try:
+                _git(
+                    self.git_dir, 'fetch', '--no-tags', '--no-write-fetch-head',
+                    '--recurse-submodules=no', '--filter=blob:none', '--stdin', 'origin',
+                    stdin='\n'.join(wanted) + '\n'
+                )
+            except subprocess.CalledProcessError:
+                # Remote refuses blob wants: git fetches each blob lazily on first read
+                span.set("git.lazy", True)
+
+    def _load_sizes(self) -> None:
+        if not self.entries:
+            return
+        shas = '\n'.join(entry.sha for entry in self.entries.values()) + '\n'
+        sizes = {}
+        for line in _git(self.git_dir, 'cat-file', '--batch-check', stdin=shas).splitlines():
+            fields = line.split()
+            if len(fields) == 3:
+                sizes[fields[0]] = int(fields[2])
+        for entry in self.entries.values():
+            entry.size = sizes.get(entry.sha, -1)
+
+    def key(self, path: Path | str) -> str:
+        """Repository-relative POSIX path for ``path``."""
+        path = Path(path)
+        if path.is_absolute():
+            try:
+                path = path.relative_to(self.root)
+            except ValueError:
+                pass
+        return path.as_posix()
+
+    def files(self) -> list[Path]:
+        """Source files outside ``IGNORE_DIRS``, like ``repo_loader.scan_files``."""
+        return [
+            Path(path) for path in self.entries
+            if os.path.splitext(path)[1] in SOURCE_EXTENSIONS and not _is_ignored(path)
+        ]
+
+    def blob_shas(self) -> dict[str, str]:
+        """Relative POSIX path -> blob SHA for every wanted blob."""
+        return {path: entry.sha for path, entry in self.entries.items()}
+
+    def exists(self, path: Path | str) -> bool:
+        return self.key(path) in self.entries
+
+    def size(self, path: Path | str) -> int:
+        entry = self.entries.get(self.key(path))
+        return entry.size if entry is not None else -1
+
+    def read(self, path: Path | str, limit: int = -1) -> bytes:
+        """
+        Return a blob's content, or its first ``limit`` bytes.
+
+        With a ``limit``, only that much is kept: the rest of the blob is
+        drained from the stream in small chunks, never held in memory.
+
+        Raises:
+            FileNotFoundError: If the path is not a wanted blob in the tree
+        """
+        entry = self.entries.get(self.key(path))
+        if entry is None:
+            raise FileNotFoundError(f"{path} is not in tree {self.commit}")
+
+        with self._lock:
+            if self._reader is None:
+                self._reader = subprocess.Popen(
+                    ['git', '--git-dir', str(self.git_dir), 'cat-file', '--batch'],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL
+                )
+            self._reader.stdin.write(entry.sha.encode() + b'\n')
+            self._reader.stdin.flush()
+            header = self._reader.stdout.readline().split()
+            if len(header) != 3:
+                raise FileNotFoundError(f"Blob {entry.sha} for {path} is missing")
+            size = int(header[2])
+            keep = size if limit < 0 else min(limit, size)
+            data = self._reader.stdout.read(keep)
+            # The whole object and its trailing newline have to be consumed
+            # to keep the stream in step
+            remaining = size - keep + 1
+            while remaining > 0:
+                chunk = self._reader.stdout.read(min(remaining, _DRAIN_CHUNK))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+
+        return data
+
+    def read_text(self, path: Path | str, limit: int = -1) -> str:
+        return self.read(path, limit).decode('utf-8', errors='ignore')
+
+    def close(self) -> None:
+        with self._lock:
+            if self._reader is not None:
+                self._reader.stdin.close()
+                self._reader.wait()
+                self._reader = None
+
+    def __enter__(self) -> "GitTree":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -1,14 +1,53 @@
+import asyncio
+import os
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
+
 import httpx
-from typing import Dict, List, Any
+from app.core import tracing
 from app.models.profile import ProfileAnalysis, RepositorySummary
 from app.llm.profile_summary import generate_profile_summary
 
+# Per-repo language bytes keyed by "owner/repo", tagged with the repo's pushed_at.
+# A repo's language breakdown only changes when something is pushed, so an entry
+# stays valid for as long as pushed_at is unchanged.
+_LANGUAGE_CACHE: "OrderedDict[str, Tuple[Optional[str], Dict[str, int]]]" = OrderedDict()
+LANGUAGE_CACHE_SIZE = 2048
+
+# Point at a GitHub Enterprise or stand-in API (see benchmarks/fake_github.py)
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+
+
+def _cache_get(full_name: str, pushed_at: Optional[str]) -> Optional[Dict[str, int]]:
+    entry = _LANGUAGE_CACHE.get(full_name)
+    if entry is None or entry[0] != pushed_at:
+        return None
+    _LANGUAGE_CACHE.move_to_end(full_name)
+    return entry[1]
+
+
+def _cache_put(full_name: str, pushed_at: Optional[str], languages: Dict[str, int]) -> None:
+    _LANGUAGE_CACHE[full_name] = (pushed_at, languages)
+    _LANGUAGE_CACHE.move_to_end(full_name)
+    while len(_LANGUAGE_CACHE) > LANGUAGE_CACHE_SIZE:
+        _LANGUAGE_CACHE.popitem(last=False)
+
+
 class GithubClient:
-    BASE_URL = "https://api.github.com"
+    BASE_URL = GITHUB_API_URL
+    # Maximum number of /languages requests in flight at once
+    LANGUAGE_CONCURRENCY = 10
+
+    async def _get(self, client: httpx.AsyncClient, path: str, **kwargs) -> httpx.Response:
+        """GET an API path, traced as a ``github.request`` span."""
+        with tracing.span("github.request", **{"http.method": "GET", "http.target": path}) as span:
+            response = await client.get(f"{self.BASE_URL}{path}", **kwargs)
+            span.set("http.status_code", response.status_code)
+            return response
 
     async def get_profile(self, username: str) -> Dict[str, Any]:
         async with httpx.AsyncClient() as client:
-            response = await client.get(f"{self.BASE_URL}/users/{username}")
+            response = await self._get(client, f"/users/{username}")
             if response.status_code == 404:
                 return None
             response.raise_for_status()
@@ -20,8 +59,8 @@ class GithubClient:
         async with httpx.AsyncClient() as client:
             while True:
                 # Fetch up to 100 repos per page (max allowed)
-                response = await client.get(
-                    f"{self.BASE_URL}/users/{username}/repos",
+                response = await self._get(
+                    client, f"/users/{username}/repos",
                     params={"per_page": 100, "page": page, "sort": "pushed"}
                 )
                 response.raise_for_status()
@@ -35,7 +74,80 @@ class GithubClient:
                     break
         return repos
 
-    async def analyze_profile(self, username: str) -> ProfileAnalysis:
+    async def get_repo_languages(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        repo: Dict[str, Any]
+    ) -> Dict[str, int]:
+        """
+        Fetch the language byte counts of a single repository.
+
+        Results are cached per repository and reused while ``pushed_at`` is
+        unchanged. Failures are treated as "no data" so that one bad repo
+        does not fail the whole profile.
+        """
+        full_name = repo.get("full_name") or f"{repo['owner']['login']}/{repo['name']}"
+        pushed_at = repo.get("pushed_at")
+
+        cached = _cache_get(full_name, pushed_at)
+        if cached is not None:
+            return cached
+
+        async with semaphore:
+            try:
+                response = await self._get(client, f"/repos/{full_name}/languages")
+                response.raise_for_status()
+                languages = response.json()
+            except (httpx.HTTPError, ValueError):
+                return {}
+
+        _cache_put(full_name, pushed_at, languages)
+        return languages
+
+    async def get_language_breakdown(
+        self,
+        repos: List[Dict[str, Any]],
+        top_n: int = 30
+    ) -> Dict[str, float]:
+        """
+        Aggregate byte-weighted language percentages over the top N repos.
+
+        Repos are ranked by stars, and their ``/languages`` endpoints are
+        fetched concurrently, bounded by ``LANGUAGE_CONCURRENCY``.
+        """
+        selected = sorted(repos, key=lambda r: r.get("stargazers_count", 0), reverse=True)[:top_n]
+        if not selected:
+            return {}
+
+        semaphore = asyncio.Semaphore(self.LANGUAGE_CONCURRENCY)
+        limits = httpx.Limits(max_connections=self.LANGUAGE_CONCURRENCY)
+        async with httpx.AsyncClient(limits=limits) as client:
+            results = await asyncio.gather(
+                *(self.get_repo_languages(client, semaphore, repo) for repo in selected)
+            )
+
+        totals: Dict[str, int] = {}
+        for languages in results:
+            for lang, count in languages.items():
+                totals[lang] = totals.get(lang, 0) + count
+
+        total_bytes = sum(totals.values())
+        if not total_bytes:
+            return {}
+
+        breakdown = {
+            lang: round(count * 100.0 / total_bytes, 2)
+            for lang, count in totals.items()
+        }
+        return dict(sorted(breakdown.items(), key=lambda x: x[1], reverse=True))
+
+    async def analyze_profile(
+        self,
+        username: str,
+        language_breakdown: bool = False,
+        top_n: int = 30
+    ) -> ProfileAnalysis:
         user_data = await self.get_profile(username)
         if not user_data:
             raise ValueError(f"User {username} not found")
@@ -67,6 +179,11 @@ class GithubClient:
         top_repos_list.sort(key=lambda x: x.stars, reverse=True)
         top_repos_list = top_repos_list[:6] # Top 6
 
+        # Optional byte-weighted breakdown from /repos/{owner}/{repo}/languages
+        language_bytes = None
+        if language_breakdown:
+            language_bytes = await self.get_language_breakdown(repos_data, top_n=top_n)
+
         # Generate Deep Summary
         profile_summary = await generate_profile_summary(
             username=user_data["login"],
@@ -86,6 +203,7 @@ class GithubClient:
             followers=user_data["followers"],
             following=user_data["following"],
             languages=languages,
+            language_breakdown=language_bytes,
             top_repos=top_repos_list,
             summary=profile_summary
         )
@@ -1,77 +1,184 @@
 """
 Dependency graph construction logic.
 """
-import re
 from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 
+from . import metrics, parse_cache
+from .repo_loader import MAX_FILE_SIZE_BYTES
+from .languages import ResolveContext, build_resolve_context, get_extractor
 
-# TODO: These patterns are naive and may produce false positives
-# Consider using AST parsing (ast module for Python, esprima/babel for JS/TS) for more accuracy
+if TYPE_CHECKING:
+    from .git_objects import GitTree
 
-# Python import patterns
-PYTHON_IMPORT_PATTERNS = [
-    r'^import\s+([\w\.]+)',  # import module
-    r'^from\s+([\w\.]+)\s+import',  # from module import ...
-]
 
-# JavaScript/TypeScript import patterns
-JS_IMPORT_PATTERNS = [
-    r'import\s+.*?\s+from\s+[\'"]([^\'"]+)[\'"]',  # import ... from 'module'
-    r'require\([\'"]([^\'"]+)[\'"]\)',  # require('module')
-]
-
-
-def extract_imports(file_path: Path) -> list[str]:
+def extract_imports(
+    file_path: Path,
+    context: Optional[ResolveContext] = None,
+    tree: "Optional[GitTree]" = None,
+    blob_sha: Optional[str] = None
+) -> list[str]:
     """
     Extract import statements from a source file.
     
     Args:
         file_path: Path to source file
+        context: Repository index; lets languages such as Go and Java tell
+            local imports from external ones precisely
+        tree: Read the file's blob from this ``GitTree`` instead of disk
+        blob_sha: Git blob SHA of the content; a parse cache hit skips
+            reading the file
         
     Returns:
         List of imported module/file names (relative imports only)
         
     Note:
-        This implementation uses regex and is naive. It may miss complex
-        import statements or produce false positives. External packages
-        are filtered out heuristically.
+        Extraction is regex-based per language (see ``languages``). Files
+        whose extension has no registered extractor are not read at all.
+        External packages are filtered out heuristically.
     """
-    if not file_path.exists() or not file_path.is_file():
+    extractor = get_extractor(file_path.suffix)
+    if extractor is None:
         return []
+
+    shas = {file_path: blob_sha} if blob_sha else {}
+    raw = _raw_imports([file_path], tree, shas).get(file_path, [])
     
-    suffix = file_path.suffix.lower()
-    
+    # Filter out external packages (heuristic: relative imports only)
+    return [imp for imp in raw if extractor.is_local(imp, context)]
+
+
+def extract_imports_many(
+    files: list[Path],
+    repo_root: Optional[Path] = None,
+    tree: "Optional[GitTree]" = None,
+    blob_shas: Optional[dict[str, str]] = None,
+    context: Optional[ResolveContext] = None
+) -> dict[Path, list[str]]:
+    """
+    ``extract_imports`` for many files, with one parse cache round trip.
+
+    Args:
+        files: Source file paths
+        repo_root: Root the paths live under (keys of ``blob_shas`` are
+            relative to it)
+        tree: Read blobs from this ``GitTree`` instead of disk
+        blob_shas: Relative POSIX path -> git blob SHA; defaults to the
+            tree's SHAs
+
+    Returns:
+        File -> local imports
+    """
+    raw = _raw_imports(files, tree, _shas_by_path(files, repo_root, tree, blob_shas))
+    result = {}
+    for file_path in files:
+        extractor = get_extractor(file_path.suffix)
+        imports = raw.get(file_path, []) if extractor is not None else []
+        result[file_path] = [imp for imp in imports if extractor.is_local(imp, context)]
+    return result
+
+
+def _shas_by_path(
+    files: list[Path],
+    repo_root: Optional[Path],
+    tree: "Optional[GitTree]",
+    blob_shas: Optional[dict[str, str]]
+) -> dict[Path, str]:
+    """Map each file to its blob SHA where one is known."""
+    if blob_shas is None:
+        if tree is None:
+            return {}
+        blob_shas = tree.blob_shas()
+    shas = {}
+    for file_path in files:
+        rel = file_path
+        if repo_root is not None:
+            try:
+                rel = file_path.relative_to(repo_root)
+            except ValueError:
+                pass
+        sha = blob_shas.get(rel.as_posix())
+        if sha:
+            shas[file_path] = sha
+    return shas
+
+
+def _read_source(file_path: Path, tree: "Optional[GitTree]") -> Optional[str]:
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
+        if tree is not None:
+            content = tree.read_text(file_path, MAX_FILE_SIZE_BYTES)
+        else:
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                # Bound peak memory even if the caller didn't filter by size
+                content = f.read(MAX_FILE_SIZE_BYTES)
     except OSError:
-        return []
-    
-    imports = []
-    
-    # Python files
-    if suffix == '.py':
-        imports = _extract_python_imports(content)
-    
-    # JavaScript/TypeScript files
-    elif suffix in {'.js', '.jsx', '.ts', '.tsx'}:
-        imports = _extract_js_imports(content)
-    
-    # Filter out external packages (heuristic: relative imports only)
-    filtered_imports = []
-    for imp in imports:
-        if _is_local_import(imp, suffix):
-            filtered_imports.append(imp)
-    
-    return filtered_imports
+        return None
+    metrics.inc("source_bytes_read_total", len(content))
+    return content
 
 
-def build_dependency_graph(files: list[Path]) -> dict[str, list[str]]:
+def _raw_imports(
+    files: list[Path],
+    tree: "Optional[GitTree]",
+    shas: dict[Path, str]
+) -> dict[Path, list[str]]:
+    """
+    Unfiltered extractor output per file.
+
+    Files with a known blob SHA are looked up in the parse cache first
+    (one query per language); only misses are read and parsed, and their
+    results are written back in one batch.
+    """
+    by_kind: dict[str, list[Path]] = {}
+    for file_path in files:
+        extractor = get_extractor(file_path.suffix)
+        if extractor is not None:
+            by_kind.setdefault(extractor.cache_kind, []).append(file_path)
+
+    result: dict[Path, list[str]] = {}
+    for kind, paths in by_kind.items():
+        cached = parse_cache.get_many(kind, [shas[p] for p in paths if p in shas])
+        fresh = {}
+        for file_path in paths:
+            sha = shas.get(file_path)
+            if sha in cached:
+                value = cached[sha]
+                result[file_path] = value.split('\n') if value else []
+                continue
+            content = _read_source(file_path, tree)
+            if content is None:
+                continue
+            imports = get_extractor(file_path.suffix).extract(content)
+            metrics.inc("files_parsed_total")
+            metrics.inc("imports_extracted_total", len(imports))
+            result[file_path] = imports
+            if sha:
+                # Specifiers never contain newlines
+                fresh[sha] = '\n'.join(imports)
+        parse_cache.put_many(kind, fresh)
+    return result
+
+
+def build_dependency_graph(
+    files: list[Path],
+    repo_root: Optional[Path] = None,
+    tree: "Optional[GitTree]" = None,
+    blob_shas: Optional[dict[str, str]] = None,
+    context: Optional[ResolveContext] = None
+) -> dict[str, list[str]]:
     """
     Build a dependency graph from a list of files.
     
     Args:
-        files: List of source file paths (should be relative paths)
+        files: List of source file paths
+        repo_root: Repository root the paths live under; enables path-based
+            resolution (relative imports, go.mod module paths, packages)
+        tree: Read contents from this ``GitTree`` (rooted at ``repo_root``)
+            instead of disk
+        blob_shas: Relative POSIX path -> git blob SHA, for the parse
+            cache; defaults to the tree's SHAs
+        context: ``build_resolve_context`` of the same files, for callers
+            that also list imports with ``extract_imports_many``
         
     Returns:
         Dictionary mapping file paths (as strings) to their dependencies (as strings)
@@ -82,159 +189,27 @@ def build_dependency_graph(files: list[Path]) -> dict[str, list[str]]:
     """
     graph = {}
     
-    # Create a mapping of module names to file paths for resolution
-    file_map = _build_file_map(files)
+    # Index the file list once for all resolvers
+    if context is None:
+        context = build_resolve_context(files, repo_root, tree)
+    imports_by_file = extract_imports_many(files, repo_root, tree, blob_shas, context)
     
     for file_path in files:
         file_str = str(file_path.as_posix())  # Use forward slashes for consistency
-        imports = extract_imports(file_path)
-        
+        extractor = get_extractor(file_path.suffix)
+        if extractor is None:
+            graph[file_str] = []
+            continue
+
         # Resolve imports to actual file paths
         dependencies = []
-        for imp in imports:
-            resolved = _resolve_import(imp, file_path, file_map)
-            if resolved:
-                dependencies.append(resolved)
+        for imp in imports_by_file[file_path]:
+            resolved = extractor.resolve(imp, file_path, context)
+            if resolved is not None and resolved != file_path:
+                resolved_str = str(resolved.as_posix())
+                if resolved_str not in dependencies:
+                    dependencies.append(resolved_str)
         
         graph[file_str] = dependencies
     
     return graph
-
-
-def _extract_python_imports(content: str) -> list[str]:
-    """Extract Python import statements from file content."""
-    imports = []
-    
-    for line in content.split('\n'):
-        line = line.strip()
-        
-        # Skip comments
-        if line.startswith('#'):
-            continue
-        
-        for pattern in PYTHON_IMPORT_PATTERNS:
-            match = re.match(pattern, line)
-            if match:
-                module = match.group(1)
-                imports.append(module)
-                break
-    
-    return imports
-
-
-def _extract_js_imports(content: str) -> list[str]:
-    """Extract JavaScript/TypeScript import statements from file content."""
-    imports = []
-    
-    for pattern in JS_IMPORT_PATTERNS:
-        matches = re.findall(pattern, content)
-        imports.extend(matches)
-    
-    return imports
-
-
-def _is_local_import(import_path: str, file_suffix: str) -> bool:
-    """
-    Heuristically determine if an import is local/relative.
-    
-    Args:
-        import_path: The imported module/file path
-        file_suffix: The suffix of the source file (.py, .js, etc.)
-        
-    Returns:
-        True if the import appears to be local/relative
-    """
-    # Python: relative imports start with '.'
-    if file_suffix == '.py':
-        if import_path.startswith('.'):
-            return True
-        # Filter out common stdlib and third-party packages
-        # This is a simple heuristic - may need refinement
-        external_prefixes = [
-            'os', 'sys', 'json', 're', 'pathlib', 'typing',
-            'fastapi', 'django', 'flask', 'requests', 'numpy',
-            'pandas', 'pydantic', 'sqlalchemy', 'asyncio'
-        ]
-        if any(import_path.startswith(prefix) for prefix in external_prefixes):
-            return False
-        # If it contains a dot, might be a local module (e.g., app.models)
-        if '.' in import_path:
-            return True
-        # Single-word imports might be local modules
-        return True
-    
-    # JS/TS: relative imports start with './' or '../'
-    if file_suffix in {'.js', '.jsx', '.ts', '.tsx'}:
-        if import_path.startswith('./'):
-            return True
-        if import_path.startswith('../'):
-            return True
-        if import_path.startswith('@/'):
-            return True  # Common alias for src directory
-        # Filter out node_modules packages (don't start with '.')
-        return False
-    
-    return False
-
-
-def _build_file_map(files: list[Path]) -> dict[str, Path]:
-    """
-    Build a mapping from module names to file paths.
-    
-    Args:
-        files: List of file paths
-        
-    Returns:
-        Dictionary mapping module names to file paths
-    """
-    file_map = {}
-    
-    for file_path in files:
-        # Map by filename without extension
-        stem = file_path.stem
-        if stem not in file_map:
-            file_map[stem] = file_path
-        
-        # Map by full path without extension (for nested modules)
-        path_parts = file_path.parts[:-1] + (stem,)
-        module_path = '.'.join(path_parts)
-        file_map[module_path] = file_path
-    
-    return file_map
-
-
-def _resolve_import(import_path: str, source_file: Path, file_map: dict[str, Path]) -> str | None:
-    """
-    Resolve an import path to an actual file path.
-    
-    Args:
-        import_path: The imported module/file path
-        source_file: The file containing the import
-        file_map: Mapping of module names to file paths
-        
-    Returns:
-        Resolved file path as string, or None if not found
-    """
-    # TODO: This is a simplified resolution - may need more sophisticated logic
-    
-    # Try direct lookup in file map
-    if import_path in file_map:
-        return str(file_map[import_path].as_posix())
-    
-    # Try removing leading dots (for relative Python imports)
-    cleaned = import_path.lstrip('.')
-    if cleaned in file_map:
-        return str(file_map[cleaned].as_posix())
-    
-    # Try just the last component
-    last_component = import_path.split('.')[-1]
-    if last_component in file_map:
-        return str(file_map[last_component].as_posix())
-    
-    # For JS/TS, try resolving relative paths
-    if import_path.startswith('./') or import_path.startswith('../'):
-        # TODO: Implement proper relative path resolution
-        # This would require knowing the source file's directory
-        pass
-    
-    return None
@@ -1,7 +1,17 @@
 """
 Heuristic rules for detecting common patterns.
 """
+import mmap
+import os
+import re
+from functools import lru_cache
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+from ..models.repo import PatternMatch
+
+if TYPE_CHECKING:
+    from .git_objects import GitTree
 
 
 # Common patterns to look for
@@ -14,25 +24,241 @@ PATTERNS = {
     "ci_cd": ["github/workflows", "gitlab-ci", "jenkins", "circleci"],
 }
 
+# Example files kept per category in the match report
+MAX_EXAMPLE_FILES = 20
+
+# Byte signatures for the opt-in content scan. A category stops being searched
+# as soon as one file matches it.
+CONTENT_SIGNATURES = {
+    "authentication": [
+        b"jwt.decode", b"jwt.encode", b"jsonwebtoken", b"passport.authenticate",
+        b"OAuth2PasswordBearer", b"flask_login", b"next-auth", b"bcrypt",
+    ],
+    "database": [
+        b"mongoose.connect", b"create_engine(", b"from sqlalchemy", b"import psycopg",
+        b"new PrismaClient", b"new Sequelize", b"MongoClient(", b"sqlite3.connect",
+        b"gorm.Open", b"\"database/sql\"",
+    ],
+    "api": [
+        b"APIRouter(", b"@app.get(", b"@app.post(", b"@app.route(", b"express.Router(",
+        b"@RestController", b"http.HandleFunc(", b"@GetMapping",
+    ],
+    "payment": [
+        b"import stripe", b"require('stripe')", b'require("stripe")', b"from 'stripe'",
+        b'from "stripe"', b"paypalrestsdk", b"braintree",
+    ],
+    "docker": [
+        b"FROM python:", b"FROM node:", b"FROM golang:", b"FROM alpine", b"FROM ubuntu",
+        b"import docker",
+    ],
+}
+
+# Non-source files worth a content look when present at the repo root
+CONTENT_EXTRA_FILES = ("Dockerfile", "docker-compose.yml", "docker-compose.yaml", "compose.yaml")
+
+# Read budgets for the content scan
+CONTENT_SCAN_MAX_FILE_BYTES = int(os.getenv("CONTENT_SCAN_MAX_FILE_BYTES", str(1024 * 1024)))
+CONTENT_SCAN_MAX_REPO_BYTES = int(os.getenv("CONTENT_SCAN_MAX_REPO_BYTES", str(64 * 1024 * 1024)))
+
+
+class KeywordMatcher:
+    """
+    All keywords of a pattern table compiled into one scanner.
+
+    The keywords are folded into a single trie-shaped regex wrapped in a
+    lookahead, so one ``finditer`` over a path reports the longest keyword
+    starting at every position, overlapping matches included. Each keyword
+    maps to its own categories plus those of any keyword that is a prefix
+    of it, which makes the result identical to testing every keyword with
+    ``in`` — in one pass instead of files x categories x keywords.
+    """
+
+    def __init__(self, patterns: dict[str, list[str]]):
+        keyword_categories: dict[str, set[str]] = {}
+        for category, keywords in patterns.items():
+            for keyword in keywords:
+                keyword_categories.setdefault(keyword.lower(), set()).add(category)
+
+        self.categories = list(patterns)
+        self._categories = {
+            keyword: frozenset().union(*(
+                cats for other, cats in keyword_categories.items()
+                if keyword.startswith(other)
+            ))
+            for keyword in keyword_categories
+        }
+        # Lowercasing the input is cheaper than re.IGNORECASE on every position
+        self._regex = re.compile(f"(?=({_trie_regex(list(keyword_categories))}))")
+
+    def match(self, text: str) -> set[str]:
+        """Return the categories whose keywords occur in ``text`` (case-insensitive)."""
+        found: set[str] = set()
+        for keyword in self._regex.findall(text.lower()):
+            found |= self._categories[keyword]
+        return found
+
+
+def _trie_regex(keywords: list[str]) -> str:
+    """Build a regex alternation factored by common prefixes (longest first)."""
+    trie: dict = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def render(node: dict) -> str:
+        terminal = '' in node
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        if terminal:
+            # Greedy optional: prefer the longer keyword, fall back to this one
+            return f"(?:{body})?"
+        return body
+
+    return render(trie)
+
+
+_MATCHER = KeywordMatcher(PATTERNS)
+
+
+@lru_cache(maxsize=64)
+def _content_regex(categories: frozenset[str]) -> re.Pattern:
+    """One bytes regex with a named group per still-unmatched category."""
+    groups = [
+        f"(?P<{category}>{b'|'.join(re.escape(sig) for sig in CONTENT_SIGNATURES[category]).decode()})"
+        for category in sorted(categories)
+    ]
+    return re.compile("|".join(groups).encode())
+
+
+def _scan_file_content(file_path: Path, regex: re.Pattern, limit: int) -> tuple[set[str], int]:
+    """
+    Search the first ``limit`` bytes of a file through a read-only mmap.
+
+    Returns:
+        Matched categories and the number of bytes covered
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return set(), 0
+            length = min(size, limit)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                wanted = len(regex.groupindex)
+                hits = set()
+                for m in regex.finditer(mm, 0, length):
+                    hits.add(m.lastgroup)
+                    if len(hits) == wanted:
+                        break
+                return hits, length
+    except (OSError, ValueError):
+        return set(), 0
+
+
+def _scan_blob_content(tree: "GitTree", rel_path: Path, regex: re.Pattern, limit: int) -> tuple[set[str], int]:
+    """``_scan_file_content`` for a blob streamed from a ``GitTree``."""
+    try:
+        data = tree.read(rel_path, limit)
+    except OSError:
+        return set(), 0
+    wanted = len(regex.groupindex)
+    hits = set()
+    for m in regex.finditer(data):
+        hits.add(m.lastgroup)
+        if len(hits) == wanted:
+            break
+    return hits, len(data)
+
+
+def detect_content_patterns(
+    repo_path: Path,
+    files: list[Path],
+    max_file_bytes: int = CONTENT_SCAN_MAX_FILE_BYTES,
+    max_repo_bytes: int = CONTENT_SCAN_MAX_REPO_BYTES,
+    tree: "GitTree | None" = None,
+) -> dict[str, str]:
+    """
+    Search file contents for ``CONTENT_SIGNATURES`` within a byte budget.
+
+    Files are memory-mapped rather than read into Python strings. Once a
+    category has matched it is dropped from the search, and the scan ends
+    when every category has matched or ``max_repo_bytes`` is used up. With
+    a ``tree``, blobs are streamed from git objects instead.
+
+    Returns:
+        Category -> relative path of the first file that matched it
+    """
+    remaining = set(CONTENT_SIGNATURES)
+    found: dict[str, str] = {}
+    budget = max_repo_bytes
+
+    if tree is not None:
+        extra = [Path(name) for name in CONTENT_EXTRA_FILES if tree.exists(name)]
+    else:
+        extra = [Path(name) for name in CONTENT_EXTRA_FILES if (repo_path / name).is_file()]
+    candidates = list(files) + extra
+    for rel_path in candidates:
+        if not remaining or budget <= 0:
+            break
+        regex = _content_regex(frozenset(remaining))
+        limit = min(max_file_bytes, budget)
+        if tree is not None:
+            hits, scanned = _scan_blob_content(tree, rel_path, regex, limit)
+        else:
+            hits, scanned = _scan_file_content(repo_path / rel_path, regex, limit)
+        budget -= scanned
+        for category in hits:
+            found[category] = rel_path.as_posix()
+        remaining -= hits
+
+    return found
+
+
+def detect_pattern_matches(
+    repo_path: Path,
+    files: list[Path],
+    content_scan: bool = False,
+    tree: "GitTree | None" = None
+) -> dict[str, PatternMatch]:
+    """
+    Match every file path against all pattern categories in one scan per path.
+
+    Args:
+        repo_path: Path to repository
+        files: Source file paths relative to ``repo_path``
+        content_scan: Also search file contents (see ``detect_content_patterns``)
+        tree: Read contents from this ``GitTree`` instead of disk
+
+    Returns:
+        Category -> number of matching files and up to ``MAX_EXAMPLE_FILES``
+        of their paths
+    """
+    matches = {category: PatternMatch() for category in _MATCHER.categories}
+
+    for f in files:
+        file_str = f.as_posix()
+        for category in _MATCHER.match(file_str):
+            match = matches[category]
+            match.count += 1
+            if len(match.files) < MAX_EXAMPLE_FILES:
+                match.files.append(file_str)
+
+    if content_scan:
+        for category, file_str in detect_content_patterns(repo_path, files, tree=tree).items():
+            matches.setdefault(category, PatternMatch()).content_file = file_str
+
+    return matches
+
+
 def detect_patterns(repo_path: Path, files: list[Path]) -> dict[str, bool]:
     """
     Detect architectural patterns in the repository.
     """
-    detected = {k: False for k in PATTERNS}
-    
-    # Check file names and paths
-    for f in files:
-        parts = f.parts
-        file_str = str(f).lower()
-        
-        for category, keywords in PATTERNS.items():
-            if detected[category]:
-                continue
-            
-            # Check filename/path matches
-            if any(k in file_str for k in keywords):
-                detected[category] = True
-                
-    # Deep check could involve reading content, but file names are a good first pass
-    
-    return detected
+    return {
+        category: match.count > 0 or match.content_file is not None
+        for category, match in detect_pattern_matches(repo_path, files).items()
+    }
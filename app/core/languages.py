@@ -0,0 +1,728 @@
+"""
+Per-language import extractors and resolvers.
+
+Each supported language registers a ``LanguageExtractor`` for its file
+extensions: a single-pass, precompiled scanner that pulls import specifiers
+out of file content, a locality filter, and a resolver that maps a specifier
+to a file in the repository. ``graph_builder`` consults this registry and
+never reads files whose extension has no extractor.
+"""
+import ast
+import posixpath
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Optional
+
+from . import detector
+
+if TYPE_CHECKING:
+    from .git_objects import GitTree
+
+
+@dataclass
+class ResolveContext:
+    """
+    Lookup tables over a repository's file list, built once per graph.
+
+    All keys are POSIX paths relative to ``root`` (or the paths as given when
+    no root is known); values are the original ``Path`` objects.
+    """
+    root: Optional[Path] = None
+    go_module: Optional[str] = None
+    by_path: dict[str, Path] = field(default_factory=dict)
+    by_dir: dict[str, list[Path]] = field(default_factory=dict)
+    # Trailing segments of each directory -> first matching directory
+    dir_suffixes: dict[str, str] = field(default_factory=dict)
+    # Trailing path segments, with and without extension -> first file
+    by_suffix: dict[str, Path] = field(default_factory=dict)
+    # Python-style dotted module paths and bare stems -> file
+    modules: dict[str, Path] = field(default_factory=dict)
+
+    def relative(self, file_path: Path) -> str:
+        if self.root is not None:
+            try:
+                return file_path.relative_to(self.root).as_posix()
+            except ValueError:
+                pass
+        return file_path.as_posix()
+
+
+@dataclass(frozen=True)
+class LanguageExtractor:
+    """How to find and resolve imports for one language."""
+    language: str
+    extensions: tuple[str, ...]
+    extract: Callable[[str], list[str]]
+    resolve: Callable[[str, Path, ResolveContext], Optional[Path]]
+    is_local: Callable[[str, Optional[ResolveContext]], bool] = lambda imp, ctx: True
+    # Bump whenever extract() output changes: it keys the parse cache
+    version: int = 1
+
+    @property
+    def cache_kind(self) -> str:
+        return f"imports:{self.language}:v{self.version}"
+
+
+# File extension -> extractor
+EXTRACTORS: dict[str, LanguageExtractor] = {}
+
+
+def register_extractor(extractor: LanguageExtractor) -> LanguageExtractor:
+    """Register an extractor for each of its extensions (later wins)."""
+    for extension in extractor.extensions:
+        EXTRACTORS[extension] = extractor
+    return extractor
+
+
+def get_extractor(suffix: str) -> Optional[LanguageExtractor]:
+    return EXTRACTORS.get(suffix.lower())
+
+
+def build_resolve_context(
+    files: list[Path],
+    root: Optional[Path] = None,
+    tree: "Optional[GitTree]" = None
+) -> ResolveContext:
+    """Index a file list for import resolution."""
+    context = ResolveContext(root=root)
+    if root is not None:
+        context.go_module = detector.scan_manifests(root, tree).go_module
+
+    for file_path in files:
+        rel = context.relative(file_path)
+        context.by_path[rel] = file_path
+
+        directory, _, name = rel.rpartition('/')
+        if directory not in context.by_dir:
+            context.by_dir[directory] = []
+            dir_parts = directory.split('/')
+            for i in range(len(dir_parts)):
+                context.dir_suffixes.setdefault('/'.join(dir_parts[i:]), directory)
+        context.by_dir[directory].append(file_path)
+
+        stem_path = rel.rsplit('.', 1)[0] if '.' in name else rel
+        parts = stem_path.split('/')
+        ext_parts = rel.split('/')
+        for i in range(len(parts)):
+            context.by_suffix.setdefault('/'.join(parts[i:]), file_path)
+            context.by_suffix.setdefault('/'.join(ext_parts[i:]), file_path)
+
+        stem = parts[-1]
+        context.modules.setdefault(stem, file_path)
+        context.modules['.'.join(parts)] = file_path
+
+    return context
+
+
+def join_path(directory: str, target: str) -> str:
+    """Normalize ``directory/target`` as a POSIX path relative to the root."""
+    joined = posixpath.normpath(posixpath.join(directory, target))
+    return '' if joined == '.' else joined
+
+
+def source_dir(source: Path, context: ResolveContext) -> str:
+    """Directory of ``source``, relative to the root, in POSIX form."""
+    return context.relative(source).rpartition('/')[0]
+
+
+def _first_in_dir(directory_suffix: str, context: ResolveContext) -> Optional[Path]:
+    """First file (by name) of the directory whose path ends with the suffix."""
+    directory = context.dir_suffixes.get(directory_suffix)
+    if directory is None:
+        return None
+    return min(context.by_dir[directory], key=lambda f: f.name)
+
+
+def _resolve_dotted(name: str, context: ResolveContext, separator: str = '.') -> Optional[Path]:
+    """
+    Resolve a qualified name (``com.acme.Foo``) by path suffix, dropping
+    trailing members (static imports, nested types) until a file matches.
+    At least two segments are kept so a bare top-level package name never
+    matches an unrelated file.
+    """
+    parts = [p for p in name.split(separator) if p and p != '*']
+    while len(parts) >= 2:
+        found = context.by_suffix.get('/'.join(parts))
+        if found is not None:
+            return found
+        parts.pop()
+    return None
+
+
+# --- Python ------------------------------------------------------------------
+
+# Python import statements at the start of a (possibly indented) line:
+#   group 1: "from <module> import ..."   group 2: "import a, b.c as d"
+# The leading newline (rather than ^ with re.MULTILINE) gives the regex engine
+# a literal first character to scan for, which is several times faster.
+PYTHON_IMPORT_RE = re.compile(
+    r'\n[ \t]*(?:from[ \t]+([\w.]+)[ \t]+import\b|import[ \t]+([\w.]+(?:[ \t]+as[ \t]+\w+)?'
+    r'(?:[ \t]*,[ \t]*[\w.]+(?:[ \t]+as[ \t]+\w+)?)*))'
+)
+
+
+def _extract_python_imports(content: str) -> list[str]:
+    """
+    Extract Python import statements from file content.
+
+    A single precompiled regex finds candidate statements anywhere in the
+    buffer (indented imports inside try/def included). Candidates inside
+    triple-quoted strings are discarded. Files the regex cannot read reliably
+    (unterminated triple quotes, backslash-continued imports) take the slower
+    ``ast`` path instead.
+    """
+    if 'import' not in content:
+        return []
+
+    buffer = '\n' + content
+    string_spans = _triple_quoted_spans(buffer)
+    if string_spans and string_spans[-1][1] < 0:
+        ast_imports = _extract_python_imports_ast(content)
+        if ast_imports is not None:
+            return ast_imports
+        # Not valid Python either: fall through, the open string is ignored
+
+    imports = []
+    span_index = 0
+    for match in PYTHON_IMPORT_RE.finditer(buffer):
+        start = match.start()
+        # Both sequences are ordered, so skip through the spans once
+        while span_index < len(string_spans) and string_spans[span_index][1] <= start:
+            span_index += 1
+        if span_index < len(string_spans) and string_spans[span_index][0] <= start:
+            continue
+
+        if match.group(1):
+            imports.append(match.group(1))
+            continue
+
+        line_end = buffer.find('\n', match.end())
+        if buffer[match.end():line_end].rstrip().endswith('\\'):
+            # "import a, \" continues on the next line
+            ast_imports = _extract_python_imports_ast(content)
+            if ast_imports is not None:
+                return ast_imports
+        for name in match.group(2).split(','):
+            imports.append(name.split()[0])
+
+    return imports
+
+
+def _triple_quoted_spans(content: str) -> list[tuple[int, int]]:
+    """
+    Locate triple-quoted strings using str.find rather than a lazy regex.
+
+    An unterminated string is reported with an end of -1.
+    """
+    spans = []
+    # Next occurrence of each delimiter; only re-searched once passed, so a
+    # delimiter kind that never occurs isn't rescanned for every string
+    next_double = content.find('"""')
+    next_single = content.find("'''")
+    while next_double >= 0 or next_single >= 0:
+        if next_single < 0 or (0 <= next_double < next_single):
+            start, quote = next_double, '"""'
+        else:
+            start, quote = next_single, "'''"
+        end = content.find(quote, start + 3)
+        if end < 0:
+            spans.append((start, -1))
+            break
+        spans.append((start, end + 3))
+        pos = end + 3
+        if 0 <= next_double < pos:
+            next_double = content.find('"""', pos)
+        if 0 <= next_single < pos:
+            next_single = content.find("'''", pos)
+    return spans
+
+
+_AST_BODY_FIELDS = ('body', 'orelse', 'finalbody', 'handlers', 'cases')
+
+
+def _extract_python_imports_ast(content: str) -> list[str] | None:
+    """Extract imports with the ``ast`` module; None if the file doesn't parse."""
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return None
+
+    # Imports are statements, so only statement bodies are walked, not the
+    # (much larger) expression trees that ast.walk would visit
+    imports = []
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ast.Import):
+            imports.extend((node.lineno, alias.name) for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            imports.append((node.lineno, '.' * node.level + (node.module or '')))
+        else:
+            for field in _AST_BODY_FIELDS:
+                children = getattr(node, field, None)
+                if children:
+                    stack.extend(children)
+    imports.sort(key=lambda item: item[0])
+    return [name for _, name in imports]
+
+
+def _is_local_import(import_path: str, file_suffix: str) -> bool:
+    """
+    Heuristically determine if an import is local/relative.
+    
+    Args:
+        import_path: The imported module/file path
+        file_suffix: The suffix of the source file (.py, .js, etc.)
+        
+    Returns:
+        True if the import appears to be local/relative
+    """
+    # Python: relative imports start with '.'
+    if file_suffix == '.py':
+        if import_path.startswith('.'):
+            return True
+        # Filter out common stdlib and third-party packages
+        # This is a simple heuristic - may need refinement
+        external_prefixes = [
+            'os', 'sys', 'json', 're', 'pathlib', 'typing',
+            'fastapi', 'django', 'flask', 'requests', 'numpy',
+            'pandas', 'pydantic', 'sqlalchemy', 'asyncio'
+        ]
+        if any(import_path.startswith(prefix) for prefix in external_prefixes):
+            return False
+        # If it contains a dot, might be a local module (e.g., app.models)
+        if '.' in import_path:
+            return True
+        # Single-word imports might be local modules
+        return True
+    
+    # JS/TS: relative imports start with './' or '../'
+    if file_suffix in {'.js', '.jsx', '.ts', '.tsx'}:
+        if import_path.startswith('./'):
+            return True
+        if import_path.startswith('../'):
+            return True
+        if import_path.startswith('@/'):
+            return True  # Common alias for src directory
+        # Filter out node_modules packages (don't start with '.')
+        return False
+    
+    return False
+
+
+def _resolve_import(import_path: str, source_file: Path, context: ResolveContext) -> Path | None:
+    """
+    Resolve a Python import path to an actual file path.
+    
+    Args:
+        import_path: The imported module/file path
+        source_file: The file containing the import
+        context: Repository index
+        
+    Returns:
+        Resolved file path, or None if not found
+    """
+    # Relative imports: walk up from the source file's package
+    if import_path.startswith('.'):
+        module = import_path.lstrip('.')
+        level = len(import_path) - len(module)
+        package = source_dir(source_file, context)
+        for _ in range(level - 1):
+            package = package.rpartition('/')[0]
+        target = join_path(package, module.replace('.', '/')) if module else package
+        for candidate in (f"{target}.py", f"{target}/__init__.py"):
+            if candidate in context.by_path:
+                return context.by_path[candidate]
+
+    file_map = context.modules
+
+    # Try direct lookup in file map
+    if import_path in file_map:
+        return file_map[import_path]
+    
+    # Try removing leading dots (for relative Python imports)
+    cleaned = import_path.lstrip('.')
+    if cleaned in file_map:
+        return file_map[cleaned]
+    
+    # Try just the last component
+    last_component = import_path.split('.')[-1]
+    if last_component in file_map:
+        return file_map[last_component]
+    
+    return None
+
+
+# --- JavaScript / TypeScript -------------------------------------------------
+
+# JavaScript/TypeScript scanner. One left-to-right pass: comments, string and
+# template literals are consumed whole so keywords inside them are never seen;
+# only the import/export/require keywords are handed to the statement patterns.
+# An unterminated block comment or template literal runs to the end of the
+# file, as it would for the JS parser, instead of failing and being retried
+# from every later "/*" or backtick. Keywords must stand alone: not preceded
+# by an identifier character or "." (obj.require, _require, lazyimport).
+JS_TOKEN_RE = re.compile(
+    r'//[^\n]*'
+    r'|/\*[\s\S]*?(?:\*/|\Z)'
+    r'|\'(?:[^\'\\\n]|\\.)*\''
+    r'|"(?:[^"\\\n]|\\.)*"'
+    r'|`(?:[^`\\]|\\[\s\S])*(?:`|\\?\Z)'
+    r'|(?<![\w$.])(?P<kw>import|export|require)(?![\w$])'
+)
+_JS_SPEC = r'(?P<q>[\'"])(?P<spec>[^\'"\n]+)(?P=q)'
+# Statement shapes, matched anchored at the keyword. The character classes
+# exclude quotes, so none of these can backtrack across the file.
+JS_STATIC_IMPORT_RE = re.compile(r'import\s*(?:[\w$*{}\s,]*?\s*from\s*)?' + _JS_SPEC)
+JS_DYNAMIC_IMPORT_RE = re.compile(r'import\s*\(\s*' + _JS_SPEC)
+JS_REEXPORT_RE = re.compile(
+    r'export\s+(?:type\s+)?(?:\*(?:\s*as\s+[\w$]+)?|\{[^}\'"]*\})\s*from\s*' + _JS_SPEC
+)
+JS_REQUIRE_RE = re.compile(r'require\s*\(\s*' + _JS_SPEC + r'\s*\)')
+
+# Kinds reported by scan_js_imports()
+JS_STATIC = 'static'
+JS_DYNAMIC = 'dynamic'
+JS_REEXPORT = 're-export'
+JS_REQUIRE = 'require'
+
+# Minified bundle guard: long files with very long average lines
+MINIFIED_MIN_SIZE = 4096
+MINIFIED_AVG_LINE_LENGTH = 300
+
+
+def scan_js_imports(content: str) -> list[tuple[str, str]]:
+    """
+    Extract every module specifier from JavaScript/TypeScript source.
+
+    Covers ``import x from``, side-effect ``import 'x'``, ``import type``,
+    dynamic ``import('x')``, ``export ... from`` and ``require('x')``, while
+    ignoring anything inside comments, strings and template literals. Runs in
+    a single linear pass over the content; an unterminated block comment or
+    template literal hides the rest of the file.
+
+    Returns:
+        (specifier, kind) pairs in source order, where kind is one of
+        ``JS_STATIC``, ``JS_DYNAMIC``, ``JS_REEXPORT`` or ``JS_REQUIRE``
+    """
+    imports = []
+
+    for token in JS_TOKEN_RE.finditer(content):
+        keyword = token.group('kw')
+        if keyword is None:
+            continue
+        start = token.start()
+        if keyword == 'import':
+            match = JS_DYNAMIC_IMPORT_RE.match(content, start)
+            if match:
+                imports.append((match.group('spec'), JS_DYNAMIC))
+                continue
+            match = JS_STATIC_IMPORT_RE.match(content, start)
+            if match:
+                imports.append((match.group('spec'), JS_STATIC))
+        elif keyword == 'export':
+            match = JS_REEXPORT_RE.match(content, start)
+            if match:
+                imports.append((match.group('spec'), JS_REEXPORT))
+        else:
+            match = JS_REQUIRE_RE.match(content, start)
+            if match:
+                imports.append((match.group('spec'), JS_REQUIRE))
+
+    return imports
+
+
+def is_minified_js(content: str) -> bool:
+    """Heuristically detect minified bundles, which hold no useful imports."""
+    if len(content) < MINIFIED_MIN_SIZE:
+        return False
+    return len(content) / (content.count('\n') + 1) > MINIFIED_AVG_LINE_LENGTH
+
+
+def _extract_js_imports(content: str) -> list[str]:
+    """Extract JavaScript/TypeScript import statements from file content."""
+    if is_minified_js(content):
+        return []
+    return [specifier for specifier, _ in scan_js_imports(content)]
+
+
+# Candidate suffixes for extension-less JS/TS specifiers, in Node/bundler order
+JS_RESOLVE_SUFFIXES = (
+    '', '.ts', '.tsx', '.js', '.jsx',
+    '/index.ts', '/index.tsx', '/index.js', '/index.jsx',
+)
+
+
+def _resolve_js_import(import_path: str, source_file: Path, context: ResolveContext) -> Path | None:
+    """Resolve a relative or ``@/`` JS/TS specifier to a file."""
+    if import_path.startswith('@/'):
+        # Common alias for the src directory
+        bases = [join_path('src', import_path[2:]), join_path('', import_path[2:])]
+    elif import_path.startswith('.'):
+        bases = [join_path(source_dir(source_file, context), import_path)]
+    else:
+        return None
+
+    for base in bases:
+        for suffix in JS_RESOLVE_SUFFIXES:
+            found = context.by_path.get(base + suffix)
+            if found is not None:
+                return found
+    return None
+
+
+# --- Go ----------------------------------------------------------------------
+
+GO_IMPORT_RE = re.compile(r'^import\s*(?:\(([^)]*)\)|(?:[\w.]+\s+)?"([^"]+)")', re.MULTILINE)
+GO_BLOCK_SPEC_RE = re.compile(r'"([^"]+)"')
+
+
+def _extract_go(content: str) -> list[str]:
+    imports = []
+    for block, single in GO_IMPORT_RE.findall(content):
+        if single:
+            imports.append(single)
+        else:
+            imports.extend(GO_BLOCK_SPEC_RE.findall(block))
+    return imports
+
+
+def _is_local_go(imp: str, context: Optional[ResolveContext]) -> bool:
+    if context is not None and context.go_module:
+        return imp == context.go_module or imp.startswith(context.go_module + '/')
+    # Without go.mod: standard library paths have no dot in the first element
+    return '.' in imp.split('/', 1)[0]
+
+
+def _resolve_go(imp: str, source: Path, context: ResolveContext) -> Optional[Path]:
+    if not context.go_module or not _is_local_go(imp, context):
+        return None
+    package_dir = imp[len(context.go_module):].lstrip('/')
+    candidates = sorted(
+        (f for f in context.by_dir.get(package_dir, []) if f.suffix == '.go'),
+        key=lambda f: (f.name.endswith('_test.go'), f.name),
+    )
+    return candidates[0] if candidates else None
+
+
+# --- Java / Kotlin -----------------------------------------------------------
+
+JAVA_IMPORT_RE = re.compile(r'^[ \t]*import[ \t]+(?:static[ \t]+)?([\w.]+(?:\.\*)?)[ \t]*;', re.MULTILINE)
+KOTLIN_IMPORT_RE = re.compile(r'^[ \t]*import[ \t]+([\w.]+(?:\.\*)?)', re.MULTILINE)
+JVM_EXTERNAL_PREFIXES = ('java.', 'javax.', 'jakarta.', 'kotlin.', 'kotlinx.', 'android.', 'androidx.', 'sun.')
+
+
+def _is_local_jvm(imp: str, context: Optional[ResolveContext]) -> bool:
+    if imp.startswith(JVM_EXTERNAL_PREFIXES):
+        return False
+    if context is not None:
+        return _resolve_jvm(imp, Path(), context) is not None
+    return True
+
+
+def _resolve_jvm(imp: str, source: Path, context: ResolveContext) -> Optional[Path]:
+    if imp.endswith('.*'):
+        # Wildcard: depend on the package directory's first file
+        return _first_in_dir(imp[:-2].replace('.', '/'), context)
+    return _resolve_dotted(imp, context)
+
+
+# --- Rust --------------------------------------------------------------------
+
+RUST_IMPORT_RE = re.compile(
+    r'^[ \t]*(?:pub(?:\([^)]*\))?[ \t]+)?(?:mod[ \t]+(\w+)[ \t]*;|use[ \t]+((?:crate|super|self)(?:::\w+)+))',
+    re.MULTILINE,
+)
+
+
+def _extract_rust(content: str) -> list[str]:
+    # "mod foo;" is reported as "mod::foo" to tell it apart from "use" paths
+    return [f"mod::{mod}" if mod else use for mod, use in RUST_IMPORT_RE.findall(content)]
+
+
+def _resolve_rust(imp: str, source: Path, context: ResolveContext) -> Optional[Path]:
+    src_dir = source_dir(source, context)
+    source_stem = source.stem
+
+    # Directory holding this file's child modules (2018 edition layout)
+    if source_stem in ('mod', 'lib', 'main'):
+        module_dir = src_dir
+    else:
+        module_dir = join_path(src_dir, source_stem)
+
+    if imp.startswith('mod::'):
+        name = imp[len('mod::'):]
+        for candidate in (f"{name}.rs", f"{name}/mod.rs"):
+            found = context.by_path.get(join_path(module_dir, candidate))
+            if found is not None:
+                return found
+        return None
+
+    segments = imp.split('::')
+    head, rest = segments[0], segments[1:]
+    if head == 'crate':
+        # Crate root: the nearest enclosing "src" directory
+        parts = src_dir.split('/')
+        base = '/'.join(parts[:len(parts) - parts[::-1].index('src')]) if 'src' in parts else src_dir
+    elif head == 'super':
+        base = src_dir if source_stem not in ('mod', 'lib', 'main') else src_dir.rpartition('/')[0]
+    else:
+        base = module_dir
+
+    # Longest module path that exists wins; trailing segments are items
+    while rest:
+        path = join_path(base, '/'.join(rest))
+        for candidate in (f"{path}.rs", f"{path}/mod.rs"):
+            found = context.by_path.get(candidate)
+            if found is not None:
+                return found
+        rest = rest[:-1]
+    return None
+
+
+# --- C / C++ -----------------------------------------------------------------
+
+C_INCLUDE_RE = re.compile(r'^[ \t]*#[ \t]*include[ \t]*"([^"]+)"', re.MULTILINE)
+
+
+def _resolve_c(imp: str, source: Path, context: ResolveContext) -> Optional[Path]:
+    found = context.by_path.get(join_path(source_dir(source, context), imp))
+    if found is not None:
+        return found
+    # Include paths (-I) are unknown; fall back to a path-suffix match
+    return context.by_suffix.get(posixpath.normpath(imp).lstrip('./'))
+
+
+# --- Ruby --------------------------------------------------------------------
+
+RUBY_REQUIRE_RE = re.compile(r'''^[ \t]*(require_relative|require)[ \t(]+['"]([^'"]+)['"]''', re.MULTILINE)
+
+
+def _extract_ruby(content: str) -> list[str]:
+    imports = []
+    for kind, target in RUBY_REQUIRE_RE.findall(content):
+        if kind == 'require_relative' and not target.startswith('.'):
+            target = './' + target
+        imports.append(target)
+    return imports
+
+
+def _is_local_ruby(imp: str, context: Optional[ResolveContext]) -> bool:
+    if imp.startswith('.'):
+        return True
+    if context is not None:
+        return _resolve_ruby(imp, Path(), context) is not None
+    return '/' in imp
+
+
+def _resolve_ruby(imp: str, source: Path, context: ResolveContext) -> Optional[Path]:
+    target = imp if imp.endswith('.rb') else imp + '.rb'
+    if imp.startswith('.'):
+        return context.by_path.get(join_path(source_dir(source, context), target))
+    return context.by_path.get(join_path('lib', target)) or context.by_suffix.get(target)
+
+
+# --- PHP ---------------------------------------------------------------------
+
+PHP_IMPORT_RE = re.compile(
+    r'''^[ \t]*(?:(?:require|include)(?:_once)?[ \t(]*(?:__DIR__[ \t]*\.[ \t]*)?['"]([^'"]+)['"]'''
+    r'''|use[ \t]+([\w\\]+))''',
+    re.MULTILINE,
+)
+
+
+def _extract_php(content: str) -> list[str]:
+    return [path or namespace for path, namespace in PHP_IMPORT_RE.findall(content)]
+
+
+def _is_local_php(imp: str, context: Optional[ResolveContext]) -> bool:
+    if context is not None and '\\' in imp:
+        return _resolve_php(imp, Path(), context) is not None
+    return True
+
+
+def _resolve_php(imp: str, source: Path, context: ResolveContext) -> Optional[Path]:
+    if '\\' in imp or not imp.endswith('.php'):
+        # PSR-4: the namespace mirrors the path, possibly minus a vendor
+        # prefix that maps to a directory such as src/ or app/
+        parts = imp.strip('\\').split('\\')
+        for start in (0, 1):
+            found = context.by_suffix.get('/'.join(parts[start:]) + '.php')
+            if found is not None:
+                return found
+        return None
+    return context.by_path.get(join_path(source_dir(source, context), imp.lstrip('/')))
+
+
+# --- C# ----------------------------------------------------------------------
+
+CSHARP_USING_RE = re.compile(r'^[ \t]*using[ \t]+(?:static[ \t]+)?([\w.]+)[ \t]*;', re.MULTILINE)
+# Root namespaces of the framework and common packages: the namespace itself
+# or anything under it, but not a local "SystemTools" or "XunitHelpers"
+CSHARP_EXTERNAL_NAMESPACES = ('System', 'Microsoft', 'Newtonsoft', 'NUnit', 'Xunit')
+CSHARP_EXTERNAL_PREFIXES = tuple(f'{name}.' for name in CSHARP_EXTERNAL_NAMESPACES)
+
+
+def _is_local_csharp(imp: str, context: Optional[ResolveContext]) -> bool:
+    return imp not in CSHARP_EXTERNAL_NAMESPACES and not imp.startswith(CSHARP_EXTERNAL_PREFIXES)
+
+
+def _resolve_csharp(imp: str, source: Path, context: ResolveContext) -> Optional[Path]:
+    # Namespaces map to folders by convention; link to the folder's first file
+    folder = imp.replace('.', '/')
+    while folder:
+        found = _first_in_dir(folder, context)
+        if found is not None:
+            return found
+        # Root namespaces often aren't folders (e.g. "Company.Product.")
+        folder = folder.partition('/')[2]
+    return None
+
+
+register_extractor(LanguageExtractor(
+    language='python',
+    extensions=('.py',),
+    extract=_extract_python_imports,
+    resolve=_resolve_import,
+    is_local=lambda imp, context: _is_local_import(imp, '.py'),
+))
+register_extractor(LanguageExtractor(
+    language='javascript',
+    extensions=('.js', '.jsx', '.ts', '.tsx'),
+    extract=_extract_js_imports,
+    resolve=_resolve_js_import,
+    is_local=lambda imp, context: _is_local_import(imp, '.js'),
+))
+register_extractor(LanguageExtractor(
+    language='go', extensions=('.go',),
+    extract=_extract_go, resolve=_resolve_go, is_local=_is_local_go,
+))
+register_extractor(LanguageExtractor(
+    language='java', extensions=('.java',),
+    extract=JAVA_IMPORT_RE.findall, resolve=_resolve_jvm, is_local=_is_local_jvm,
+))
+register_extractor(LanguageExtractor(
+    language='kotlin', extensions=('.kt', '.kts'),
+    extract=KOTLIN_IMPORT_RE.findall, resolve=_resolve_jvm, is_local=_is_local_jvm,
+))
+register_extractor(LanguageExtractor(
+    language='rust', extensions=('.rs',),
+    extract=_extract_rust, resolve=_resolve_rust,
+))
+register_extractor(LanguageExtractor(
+    language='c', extensions=('.c', '.h', '.cpp', '.hpp', '.cc', '.cxx', '.hh'),
+    extract=C_INCLUDE_RE.findall, resolve=_resolve_c,
+))
+register_extractor(LanguageExtractor(
+    language='ruby', extensions=('.rb',),
+    extract=_extract_ruby, resolve=_resolve_ruby, is_local=_is_local_ruby,
+))
+register_extractor(LanguageExtractor(
+    language='php', extensions=('.php',),
+    extract=_extract_php, resolve=_resolve_php, is_local=_is_local_php,
+))
+register_extractor(LanguageExtractor(
+    language='csharp', extensions=('.cs',),
+    extract=CSHARP_USING_RE.findall, resolve=_resolve_csharp, is_local=_is_local_csharp,
+))
@@ -0,0 +1,199 @@
+"""
+Event loop lag monitor and blocking-call detector (debug mode).
+
+With ``LOOP_MONITOR_ENABLED=1`` a probe coroutine sleeps for
+``LOOP_PROBE_INTERVAL_SECONDS`` in a loop and records how late it wakes up
+(``event_loop_lag_seconds`` histogram, plus p50/p90/p99/max gauges over the
+last ``LOOP_LAG_WINDOW`` probes). A watchdog thread checks the probe's
+heartbeat; when the loop has not run for ``LOOP_BLOCK_THRESHOLD_SECONDS``
+it logs the loop thread's current stack and the route of the request
+whose task is running, so blocking calls inside ``async def`` handlers
+(``subprocess.run``, file I/O, sync HTTP or SQLite, password hashing) are
+reported at the line that blocks. Once the loop recovers, the total stall
+is logged too.
+"""
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+import weakref
+from collections import deque
+from typing import Optional
+
+from . import metrics
+
+
+LOOP_MONITOR_ENABLED = os.getenv("LOOP_MONITOR_ENABLED", "0") in ("1", "true", "True")
+LOOP_PROBE_INTERVAL_SECONDS = float(os.getenv("LOOP_PROBE_INTERVAL_SECONDS", "0.05"))
+LOOP_BLOCK_THRESHOLD_SECONDS = float(os.getenv("LOOP_BLOCK_THRESHOLD_SECONDS", "0.1"))
+LOOP_LAG_WINDOW = int(os.getenv("LOOP_LAG_WINDOW", "1200"))
+# Innermost frames kept in a report; the outer ones are server plumbing
+LOOP_STACK_DEPTH = int(os.getenv("LOOP_STACK_DEPTH", "20"))
+
+# Finer than the request buckets: lag is normally well under a millisecond
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Refresh the quantile gauges every this many probes
+_QUANTILE_EVERY = 20
+
+logger = logging.getLogger(__name__)
+
+# Running request per task, set by ``LoopMonitorMiddleware``
+_task_routes: "weakref.WeakKeyDictionary[asyncio.Task, str]" = weakref.WeakKeyDictionary()
+
+
+class LoopMonitor:
+    """Probe and watchdog for one event loop; ``start``/``stop`` from that loop."""
+
+    def __init__(
+        self,
+        interval: float = LOOP_PROBE_INTERVAL_SECONDS,
+        threshold: float = LOOP_BLOCK_THRESHOLD_SECONDS,
+        window: int = LOOP_LAG_WINDOW
+    ):
+        self.interval = interval
+        self.threshold = threshold
+        self.lags: deque[float] = deque(maxlen=window)
+        self.blocks: deque[dict] = deque(maxlen=50)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._probe: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._heartbeat = time.monotonic()
+        # Report of the stall in progress, completed by the probe
+        self._stall: Optional[dict] = None
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopping.clear()
+        self._probe = self._loop.create_task(self._run_probe(), name="loop-monitor")
+        self._watchdog = threading.Thread(target=self._run_watchdog, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._probe is not None:
+            self._probe.cancel()
+            try:
+                await self._probe
+            except asyncio.CancelledError:
+                pass
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+
+    async def _run_probe(self) -> None:
+        probes = 0
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+            lag = max(0.0, now - start - self.interval)
+            self.lags.append(lag)
+            metrics.observe("event_loop_lag_seconds", lag, buckets=LAG_BUCKETS)
+
+            stall = self._stall
+            if stall is not None:
+                self._stall = None
+                stall["lag_ms"] = round(lag * 1000, 1)
+                logger.warning(
+                    "Event loop was blocked for %.0f ms in %s", lag * 1000, stall["route"]
+                )
+
+            probes += 1
+            if probes % _QUANTILE_EVERY == 0:
+                self._publish_quantiles()
+
+    def _publish_quantiles(self) -> None:
+        ordered = sorted(self.lags)
+        if not ordered:
+            return
+        last = len(ordered) - 1
+        for q in (0.5, 0.9, 0.99):
+            metrics.set_gauge(
+                "event_loop_lag_quantile_seconds", ordered[min(last, int(q * len(ordered)))], quantile=str(q)
+            )
+        metrics.set_gauge("event_loop_lag_quantile_seconds", ordered[last], quantile="1")
+
+    def _run_watchdog(self) -> None:
+        reported_beat = None
+        while not self._stopping.wait(self.threshold / 2):
+            beat = self._heartbeat
+            blocked_for = time.monotonic() - beat - self.interval
+            if blocked_for < self.threshold or beat == reported_beat:
+                continue
+            # One report per stall: the heartbeat has not moved since
+            reported_beat = beat
+            self._report(blocked_for)
+
+    def _report(self, blocked_for: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread)
+        stack = "".join(traceback.format_stack(frame, LOOP_STACK_DEPTH)) if frame is not None else ""
+        task = asyncio.current_task(self._loop) if self._loop is not None else None
+        route = _task_routes.get(task, "unknown") if task is not None else "no task"
+        report = {
+            "route": route,
+            "task": task.get_name() if task is not None else None,
+            "blocked_ms": round(blocked_for * 1000, 1),
+            "at": time.time(),
+            "stack": stack,
+        }
+        self.blocks.append(report)
+        self._stall = report
+        metrics.inc("event_loop_blocked_total", route=route)
+        logger.warning(
+            "Event loop blocked for more than %.0f ms in %s (task %s):\n%s",
+            blocked_for * 1000, route, report["task"], stack
+        )
+
+
+_monitor: Optional[LoopMonitor] = None
+
+
+def start() -> Optional[LoopMonitor]:
+    """Start the monitor on the running loop if ``LOOP_MONITOR_ENABLED``."""
+    global _monitor
+    if not LOOP_MONITOR_ENABLED or _monitor is not None:
+        return _monitor
+    _monitor = LoopMonitor()
+    _monitor.start()
+    return _monitor
+
+
+async def stop() -> None:
+    global _monitor
+    if _monitor is not None:
+        await _monitor.stop()
+        _monitor = None
+
+
+def recent_blocks() -> list[dict]:
+    """Stalls detected since start, oldest first."""
+    return list(_monitor.blocks) if _monitor is not None else []
+
+
+class LoopMonitorMiddleware:
+    """
+    ASGI middleware that tags the task running each request with its
+    route, so stalls can be attributed. Add it innermost: middlewares
+    built on ``BaseHTTPMiddleware`` run the rest of the app in a new task.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or _monitor is None:
+            await self.app(scope, receive, send)
+            return
+        task = asyncio.current_task()
+        _task_routes[task] = f"{scope['method']} {scope['path']}"
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _task_routes.pop(task, None)
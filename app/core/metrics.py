@@ -0,0 +1,235 @@
+"""
+In-process stage timers, counters and histograms.
+
+``stage(name)`` times a block into the ``codesense_stage_seconds``
+histogram and into the current request's timings, which the HTTP
+middleware reports in a ``Server-Timing`` header, and traces it as a span
+(see ``tracing``); with ``MEM_PROFILER_ENABLED=1`` it also records the
+stage's peak and net allocation (see ``mem_profiler``). ``inc`` bumps counters
+such as files scanned, bytes read or parse cache hits. ``render`` returns
+everything in the Prometheus text exposition format for ``/metrics``.
+
+Nothing is exported anywhere: values live in this process until scraped.
+Set ``METRICS_ENABLED=0`` to turn every call into a no-op (``stage`` still
+opens spans unless tracing is disabled too).
+"""
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from . import mem_profiler, tracing
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") not in ("0", "false", "False")
+METRICS_PREFIX = "codesense_"
+
+# Upper bounds in seconds, from a cached lookup to a large clone
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+# Upper bounds in bytes, 1 MiB to 4 GiB
+BYTES_BUCKETS = tuple(float(2 ** power) for power in range(20, 33, 2))
+
+_HELP = {
+    "stage_seconds": "Time spent in each analysis stage",
+    "http_request_duration_seconds": "HTTP request latency by route",
+    "files_scanned_total": "Files listed by repository scans",
+    "source_bytes_read_total": "Bytes of source read for parsing",
+    "imports_extracted_total": "Import specifiers extracted by parsers",
+    "files_parsed_total": "Files parsed for imports (parse cache misses)",
+    "parse_cache_hits_total": "Parse cache lookups answered from the cache",
+    "parse_cache_misses_total": "Parse cache lookups that had to parse",
+    "event_loop_lag_seconds": "Event loop scheduling lag per probe",
+    "event_loop_lag_quantile_seconds": "Event loop lag quantiles over the recent window",
+    "event_loop_blocked_total": "Times the event loop was blocked past the threshold",
+    "stage_memory_peak_bytes": "Peak Python allocation above the start of each stage",
+    "stage_memory_net_bytes": "Python allocation still held at the end of each stage",
+    "stage_memory_peak_bytes_max": "Largest stage peak allocation seen",
+    "request_memory_peak_bytes": "Peak Python allocation above the start of each request",
+}
+
+_lock = threading.Lock()
+# (name, sorted label items) -> value
+_counters: dict[tuple, float] = {}
+# (name, sorted label items) -> value
+_gauges: dict[tuple, float] = {}
+# (name, sorted label items) -> [bucket counts..., sum, count]
+_histograms: dict[tuple, list] = {}
+_buckets: dict[str, tuple] = {}
+
+# Per-request list of (stage, seconds), set by the HTTP middleware
+_request_timings: ContextVar[Optional[list]] = ContextVar("request_timings", default=None)
+
+
+def _key(name: str, labels: dict) -> tuple:
+    return name, tuple(sorted(labels.items()))
+
+
+def inc(name: str, value: float = 1, **labels: str) -> None:
+    """Add ``value`` to a counter."""
+    if not METRICS_ENABLED or not value:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def set_gauge(name: str, value: float, **labels: str) -> None:
+    """Set a gauge to ``value``."""
+    if not METRICS_ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _gauges[key] = value
+
+
+def observe(name: str, value: float, buckets: tuple = DEFAULT_BUCKETS, **labels: str) -> None:
+    """Record one observation in a histogram."""
+    if not METRICS_ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        bounds = _buckets.setdefault(name, buckets)
+        series = _histograms.get(key)
+        if series is None:
+            series = _histograms[key] = [0] * len(bounds) + [0.0, 0]
+        for i, bound in enumerate(bounds):
+            if value <= bound:
+                series[i] += 1
+                break
+        series[-2] += value
+        series[-1] += 1
+
+
+class _Stage:
+    """Context manager behind ``stage``."""
+    __slots__ = ("name", "start", "scope", "memory")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.scope = tracing.span(self.name)
+        span = self.scope.__enter__()
+        self.memory = mem_profiler.begin(self.name) if mem_profiler.active() else None
+        self.start = time.perf_counter()
+        return span
+
+    def __exit__(self, *exc_info) -> None:
+        elapsed = time.perf_counter() - self.start
+        if self.memory is not None:
+            observe_memory(mem_profiler.end(self.memory))
+        self.scope.__exit__(*exc_info)
+        if not METRICS_ENABLED:
+            return
+        observe("stage_seconds", elapsed, stage=self.name)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((self.name, elapsed))
+
+
+def observe_memory(result: dict) -> None:
+    """Record a ``mem_profiler`` stage result."""
+    if not METRICS_ENABLED:
+        return
+    name = result["stage"]
+    observe("stage_memory_peak_bytes", result["peak_bytes"], buckets=BYTES_BUCKETS, stage=name)
+    observe("stage_memory_net_bytes", result["net_bytes"], buckets=BYTES_BUCKETS, stage=name)
+    key = _key("stage_memory_peak_bytes_max", {"stage": name})
+    with _lock:
+        if result["peak_bytes"] > _gauges.get(key, 0):
+            _gauges[key] = result["peak_bytes"]
+
+
+def stage(name: str):
+    """
+    Time (and trace) a block as analysis stage ``name``.
+
+    Yields:
+        The stage's span, for attributes
+
+    Worker threads started with ``asyncio.to_thread`` inherit the request's
+    timings; a run shared through ``workspace.single_flight`` reports its
+    stages to the request that started it.
+    """
+    if not METRICS_ENABLED and not tracing.TRACING_ENABLED and not mem_profiler.active():
+        return tracing.NO_SPAN
+    return _Stage(name)
+
+
+def start_request_timing() -> list:
+    """Start collecting stage timings for the current context and return them."""
+    timings: list = []
+    _request_timings.set(timings)
+    return timings
+
+
+def server_timing(timings: list) -> str:
+    """``Server-Timing`` header value; repeated stages are summed."""
+    totals: dict[str, float] = {}
+    for name, seconds in timings:
+        totals[name] = totals.get(name, 0.0) + seconds
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in totals.items())
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _format_labels(labels: tuple, extra: tuple = ()) -> str:
+    items = labels + extra
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    with _lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        histograms = {key: list(series) for key, series in _histograms.items()}
+        buckets = dict(_buckets)
+
+    lines: list[str] = []
+    seen: set[str] = set()
+
+    def header(name: str, kind: str) -> None:
+        if name not in seen:
+            seen.add(name)
+            if name in _HELP:
+                lines.append(f"# HELP {METRICS_PREFIX}{name} {_HELP[name]}")
+            lines.append(f"# TYPE {METRICS_PREFIX}{name} {kind}")
+
+    for (name, labels), value in sorted(counters.items()):
+        header(name, "counter")
+        lines.append(f"{METRICS_PREFIX}{name}{_format_labels(labels)} {_number(value)}")
+
+    for (name, labels), value in sorted(gauges.items()):
+        header(name, "gauge")
+        lines.append(f"{METRICS_PREFIX}{name}{_format_labels(labels)} {_number(value)}")
+
+    for (name, labels), series in sorted(histograms.items()):
+        header(name, "histogram")
+        cumulative = 0
+        for bound, count in zip(buckets[name], series):
+            cumulative += count
+            le = _format_labels(labels, (('le', repr(float(bound))),))
+            lines.append(f"{METRICS_PREFIX}{name}_bucket{le} {cumulative}")
+        lines.append(f"{METRICS_PREFIX}{name}_bucket{_format_labels(labels, (('le', '+Inf'),))} {series[-1]}")
+        lines.append(f"{METRICS_PREFIX}{name}_sum{_format_labels(labels)} {_number(series[-2])}")
+        lines.append(f"{METRICS_PREFIX}{name}_count{_format_labels(labels)} {series[-1]}")
+
+    return "\n".join(lines) + "\n"
+
+
+def reset() -> None:
+    """Forget every recorded value."""
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _histograms.clear()
+        _buckets.clear()
@@ -0,0 +1,250 @@
+"""
+Shared local mirror store for repeated and concurrent clones.
+
+Each remote repository gets one long-lived bare mirror under ``MIRROR_ROOT``:
+a shallow, blobless clone whose default branch is refreshed with
+``git fetch`` at most every ``MIRROR_REFRESH_SECONDS``. Requests lease a
+mirror at a pinned commit and either read it directly (``GitTree``) or add
+a ``git worktree`` from it, so a repeat repository costs a fetch delta and
+workspaces need no network round trip for objects already fetched. Blobs
+fetched for one request stay in the mirror for the next.
+
+Concurrency: cloning and refreshing a mirror happen under an exclusive
+per-repository lock; leases hold a shared lock that eviction must be able
+to take exclusively, so a mirror in use is never deleted. Both are
+``flock`` file locks and therefore also hold across worker processes
+(where ``fcntl`` is unavailable they only hold within the process).
+Mirrors are evicted least recently used first once the store exceeds
+``MIRROR_QUOTA_BYTES``. Each mirror's size is cached in a sidecar file,
+re-measured only when a lease on it ends, so checking the quota does not
+walk the whole store. A mirror that checkout workspaces still have
+worktrees of is pinned: evicting it would leave their ``.git`` links
+dangling.
+"""
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from . import tracing
+from .fsutil import disk_usage, file_lock
+from .repo_loader import clone_bare, sparse_patterns
+
+
+# Set MIRRORS_ENABLED=0 to clone every request from the remote instead
+MIRRORS_ENABLED = os.getenv("MIRRORS_ENABLED", "1") not in ("0", "false", "False")
+MIRROR_ROOT = Path(os.getenv("MIRROR_ROOT", str(Path(tempfile.gettempdir()) / "codesense_mirrors")))
+MIRROR_QUOTA_BYTES = int(os.getenv("MIRROR_QUOTA_BYTES", str(10 * 1024 ** 3)))
+MIRROR_REFRESH_SECONDS = int(os.getenv("MIRROR_REFRESH_SECONDS", "60"))
+
+# Marker files inside each mirror
+_FETCHED_MARKER = 'codesense-fetched'
+_USED_MARKER = 'codesense-used'
+
+def mirror_key(repo_url: str) -> str:
+    """Stable directory name for a remote: readable repo name plus URL hash."""
+    normalized = repo_url.strip().rstrip('/').removesuffix('.git')
+    name = re.sub(r'[^A-Za-z0-9._-]', '_', normalized.rsplit('/', 1)[-1])[:40]
+    digest = hashlib.sha1(normalized.lower().encode()).hexdigest()[:16]
+    return f"{name}-{digest}"
+
+
+def mirror_path(repo_url: str) -> Path:
+    return MIRROR_ROOT / f"{mirror_key(repo_url)}.git"
+
+
+def _git(git_dir: Path, *args: str) -> str:
+    result = subprocess.run(
+        ['git', '--git-dir', str(git_dir), *args],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return result.stdout
+
+
+def head_commit(mirror: Path) -> str:
+    """Commit the mirror's default branch points at."""
+    return _git(mirror, 'rev-parse', 'HEAD').strip()
+
+
+def _touch(path: Path) -> None:
+    path.touch()
+    os.utime(path)
+
+
+def _age(path: Path) -> float:
+    try:
+        return time.time() - path.stat().st_mtime
+    except OSError:
+        return float('inf')
+
+
+def ensure_mirror(repo_url: str) -> Path:
+    """
+    Create the mirror for ``repo_url`` or refresh it if it is stale.
+
+    Raises:
+        subprocess.CalledProcessError: If the clone fails
+    """
+    mirror = mirror_path(repo_url)
+    with file_lock(mirror.with_suffix('.lock')):
+        if not (mirror / 'HEAD').exists():
+            shutil.rmtree(mirror, ignore_errors=True)
+            try:
+                clone_bare(repo_url, mirror)
+            except Exception:
+                shutil.rmtree(mirror, ignore_errors=True)
+                raise
+            _touch(mirror / _FETCHED_MARKER)
+            _record_size(mirror)
+        elif _age(mirror / _FETCHED_MARKER) > MIRROR_REFRESH_SECONDS:
+            branch = _git(mirror, 'symbolic-ref', 'HEAD').strip()
+            with tracing.span("git.fetch", mirror=mirror.name) as span:
+                try:
+                    _git(
+                        mirror, 'fetch', '--depth=1', '--no-tags', '--filter=blob:none',
+                        'origin', f'+HEAD:{branch}'
+                    )
+                    # Forget worktrees whose directories were removed without git
+                    _git(mirror, 'worktree', 'prune')
+                    _touch(mirror / _FETCHED_MARKER)
+                except subprocess.CalledProcessError:
+                    # Serve the last fetched commit if the remote is unreachable
+                    span.set("git.stale", True)
+    return mirror
+
+
+@contextmanager
+def lease_mirror(repo_url: str) -> Iterator[tuple[Path, str]]:
+    """
+    Ensure a fresh mirror and pin its current commit for the block.
+
+    The mirror cannot be evicted while leased.
+
+    Yields:
+        (mirror directory, commit SHA)
+    """
+    mirror = ensure_mirror(repo_url)
+    with file_lock(mirror.with_suffix('.lease'), exclusive=False):
+        if not (mirror / 'HEAD').exists():
+            # Evicted between the refresh and the lease: clone it again
+            mirror = ensure_mirror(repo_url)
+        commit = head_commit(mirror)
+        _touch(mirror / _USED_MARKER)
+        try:
+            yield mirror, commit
+        finally:
+            # Reads may have fetched blobs into it
+            _record_size(mirror)
+            evict_mirrors(keep={mirror})
+
+
+def add_worktree(mirror: Path, commit: str, dest: Path, sparse: bool = True) -> None:
+    """
+    Check ``commit`` out of a mirror into ``dest`` without copying objects.
+
+    Args:
+        mirror: Leased mirror directory
+        commit: Commit to check out (detached)
+        dest: Missing or empty directory for the working tree
+        sparse: Check out only source files and manifests
+            (``repo_loader.sparse_patterns``)
+    """
+    # A worktree deleted without git would block re-adding the same path
+    _git(mirror, 'worktree', 'prune')
+    _git(mirror, 'worktree', 'add', '--detach', '--no-checkout', str(dest), commit)
+    if sparse:
+        subprocess.run(
+            ['git', '-C', str(dest), 'sparse-checkout', 'set', '--no-cone', '--stdin'],
+            input='\n'.join(sparse_patterns()) + '\n',
+            capture_output=True,
+            text=True,
+            check=True
+        )
+    subprocess.run(['git', '-C', str(dest), 'checkout'], capture_output=True, text=True, check=True)
+
+
+def remove_worktree(mirror: Path, dest: Path) -> None:
+    """Delete a worktree and its metadata in the mirror."""
+    try:
+        _git(mirror, 'worktree', 'remove', '--force', str(dest))
+    except subprocess.CalledProcessError:
+        shutil.rmtree(dest, ignore_errors=True)
+        try:
+            _git(mirror, 'worktree', 'prune')
+        except subprocess.CalledProcessError:
+            pass
+
+
+def _record_size(mirror: Path) -> int:
+    size = disk_usage(mirror)
+    try:
+        mirror.with_suffix('.size').write_text(str(size))
+    except OSError:
+        pass
+    return size
+
+
+def _cached_size(mirror: Path) -> int:
+    try:
+        return int(mirror.with_suffix('.size').read_text())
+    except (OSError, ValueError):
+        return _record_size(mirror)
+
+
+def _has_worktrees(mirror: Path) -> bool:
+    """Whether worktrees of ``mirror`` still exist; call under its lock."""
+    try:
+        # Forget worktrees whose directories were garbage collected
+        _git(mirror, 'worktree', 'prune')
+    except subprocess.CalledProcessError:
+        pass
+    worktrees = mirror / 'worktrees'
+    return worktrees.is_dir() and any(worktrees.iterdir())
+
+
+def evict_mirrors(quota: int | None = None, keep: set[Path] | None = None) -> list[Path]:
+    """
+    Delete least recently used mirrors until the store fits ``quota``.
+
+    Mirrors that are leased, being refreshed, listed in ``keep``, or that
+    workspaces still have worktrees of are skipped. Uses the cached sizes,
+    so it is cheap while the store is under quota.
+
+    Returns:
+        The evicted mirror directories
+    """
+    quota = MIRROR_QUOTA_BYTES if quota is None else quota
+    if not MIRROR_ROOT.is_dir():
+        return []
+
+    mirrors = [path for path in MIRROR_ROOT.glob('*.git') if path.is_dir()]
+    usage = {mirror: _cached_size(mirror) for mirror in mirrors}
+    total = sum(usage.values())
+    if total <= quota:
+        return []
+
+    evicted = []
+    for mirror in sorted(mirrors, key=lambda m: _age(m / _USED_MARKER), reverse=True):
+        if total <= quota:
+            break
+        if keep and mirror in keep:
+            continue
+        with file_lock(mirror.with_suffix('.lock'), blocking=False) as locked:
+            if not locked:
+                continue
+            with file_lock(mirror.with_suffix('.lease'), blocking=False) as unused:
+                if not unused or _has_worktrees(mirror):
+                    continue
+                shutil.rmtree(mirror, ignore_errors=True)
+                mirror.with_suffix('.size').unlink(missing_ok=True)
+        total -= usage[mirror]
+        evicted.append(mirror)
+    return evicted
@@ -0,0 +1,171 @@
+"""
+Content-addressed cache of per-file parse results.
+
+Results are keyed by the git blob SHA of the file content plus a ``kind``
+that names the parser and its version (e.g. ``imports:python:v1``), so the
+same blob is parsed once no matter which repository, fork or commit it
+appears in. Bumping a parser's version simply stops its old entries from
+matching; they age out through LRU eviction.
+
+The store is a single SQLite file (WAL, shared by worker processes) with one
+compact text value per entry. Lookups and writes are batched per analysis.
+The cache is only an optimization: SQLite errors (a locked, unwritable or
+corrupt file) are logged and turn lookups into misses and writes into no-ops.
+"""
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from . import metrics
+
+
+PARSE_CACHE_ENABLED = os.getenv("PARSE_CACHE_ENABLED", "1") not in ("0", "false", "False")
+PARSE_CACHE_PATH = Path(os.getenv(
+    "PARSE_CACHE_PATH", str(Path(tempfile.gettempdir()) / "codesense_parse_cache.sqlite3")
+))
+PARSE_CACHE_MAX_ENTRIES = int(os.getenv("PARSE_CACHE_MAX_ENTRIES", "500000"))
+
+# Entries touched less recently than this are not re-stamped on every hit
+_TOUCH_GRANULARITY_SECONDS = 3600
+# Keep batched statements under SQLite's host-parameter limit
+_BATCH = 500
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+_writes_since_evict = 0
+_writes_lock = threading.Lock()
+
+
+def _connection() -> sqlite3.Connection:
+    """Per-thread connection (analyses run in worker threads)."""
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        PARSE_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(PARSE_CACHE_PATH, timeout=5.0, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS parse_cache ("
+                " sha TEXT NOT NULL, kind TEXT NOT NULL, value TEXT NOT NULL,"
+                " last_used INTEGER NOT NULL, PRIMARY KEY (sha, kind)"
+                ") WITHOUT ROWID"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS parse_cache_lru ON parse_cache (last_used)")
+        except sqlite3.Error:
+            # Not cached: the next call tries again
+            conn.close()
+            raise
+        _local.conn = conn
+    return conn
+
+
+def get_many(kind: str, shas: list[str]) -> dict[str, str]:
+    """
+    Look up cached values for ``shas``.
+
+    Returns:
+        SHA -> value for the hits only
+    """
+    if not PARSE_CACHE_ENABLED or not shas:
+        return {}
+    now = int(time.time())
+    found: dict[str, str] = {}
+    stale: list[str] = []
+    unique = list(dict.fromkeys(shas))
+    try:
+        conn = _connection()
+        for i in range(0, len(unique), _BATCH):
+            chunk = unique[i:i + _BATCH]
+            rows = conn.execute(
+                f"SELECT sha, value, last_used FROM parse_cache WHERE kind = ? AND sha IN ({','.join('?' * len(chunk))})",
+                [kind, *chunk]
+            )
+            for sha, value, last_used in rows:
+                found[sha] = value
+                if now - last_used > _TOUCH_GRANULARITY_SECONDS:
+                    stale.append(sha)
+        if stale:
+            conn.executemany(
+                "UPDATE parse_cache SET last_used = ? WHERE sha = ? AND kind = ?",
+                [(now, sha, kind) for sha in stale]
+            )
+    except (sqlite3.Error, OSError) as e:
+        # Hits already read are still good; everything else is a miss
+        logger.warning("Parse cache lookup failed (%s): %s", kind, e)
+    family = kind.split(':', 1)[0]
+    metrics.inc("parse_cache_hits_total", len(found), kind=family)
+    metrics.inc("parse_cache_misses_total", len(unique) - len(found), kind=family)
+    return found
+
+
+def put_many(kind: str, values: dict[str, str]) -> None:
+    """Store parse results (SHA -> value) and evict if over capacity."""
+    global _writes_since_evict
+    if not PARSE_CACHE_ENABLED or not values:
+        return
+    now = int(time.time())
+    conn = None
+    try:
+        conn = _connection()
+        conn.execute("BEGIN")
+        conn.executemany(
+            "INSERT OR REPLACE INTO parse_cache (sha, kind, value, last_used) VALUES (?, ?, ?, ?)",
+            [(sha, kind, value, now) for sha, value in values.items()]
+        )
+        conn.execute("COMMIT")
+    except (sqlite3.Error, OSError) as e:
+        logger.warning("Parse cache write skipped (%s): %s", kind, e)
+        _rollback(conn)
+        return
+
+    with _writes_lock:
+        _writes_since_evict += len(values)
+        due = _writes_since_evict >= max(PARSE_CACHE_MAX_ENTRIES // 10, 1)
+        if due:
+            _writes_since_evict = 0
+    if due:
+        try:
+            evict()
+        except sqlite3.Error as e:
+            logger.warning("Parse cache eviction failed: %s", e)
+
+
+def _rollback(conn: sqlite3.Connection | None) -> None:
+    """End a failed write's transaction so the connection stays usable."""
+    if conn is not None and conn.in_transaction:
+        try:
+            conn.execute("ROLLBACK")
+        except sqlite3.Error:
+            pass
+
+
+def evict(max_entries: int | None = None) -> int:
+    """
+    Drop least recently used entries beyond ``max_entries``.
+
+    Returns:
+        Number of entries removed
+    """
+    max_entries = PARSE_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+    conn = _connection()
+    (count,) = conn.execute("SELECT COUNT(*) FROM parse_cache").fetchone()
+    excess = count - max_entries
+    if excess <= 0:
+        return 0
+    conn.execute(
+        "DELETE FROM parse_cache WHERE (sha, kind) IN ("
+        " SELECT sha, kind FROM parse_cache ORDER BY last_used LIMIT ?)",
+        (excess,)
+    )
+    return excess
+
+
+def clear() -> None:
+    """Remove every entry."""
+    _connection().execute("DELETE FROM parse_cache")
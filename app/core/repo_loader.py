@@ -1,8 +1,18 @@
 """
 Repository cloning and file scanning logic.
 """
+import os
+import re
+import shutil
 import subprocess
+from functools import lru_cache
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+from . import parse_cache, tracing
+
+if TYPE_CHECKING:
+    from .git_objects import GitTree
 
 
 # Directories to ignore during file scanning
@@ -43,13 +53,113 @@ SOURCE_EXTENSIONS = {
 }
 
 
-def clone_repo(repo_url: str, dest: Path) -> None:
+# Manifests and config files read by framework/pattern detection
+MANIFEST_FILES = {
+    'package.json',
+    'requirements.txt',
+    'setup.py',
+    'setup.cfg',
+    'pyproject.toml',
+    'Pipfile',
+    'poetry.lock',
+    'go.mod',
+    'Cargo.toml',
+    'pom.xml',
+    'build.gradle',
+    'build.gradle.kts',
+    'Gemfile',
+    'composer.json',
+    'config.ru',
+    'nest-cli.json',
+    'Dockerfile',
+    'docker-compose.yml',
+    'docker-compose.yaml',
+    'compose.yaml',
+    '.gitattributes',
+}
+
+# Clone modes: "full" checks out every file, "partial" fetches only
+# source files and manifests (blobless clone + sparse checkout)
+CLONE_FULL = 'full'
+CLONE_PARTIAL = 'partial'
+CLONE_MODE = os.getenv("CLONE_MODE", CLONE_PARTIAL)
+
+# Analysis modes: "checkout" reads a working tree from disk, "objects"
+# reads blobs from a bare clone without writing any files (see git_objects)
+ANALYSIS_CHECKOUT = 'checkout'
+ANALYSIS_OBJECTS = 'objects'
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", ANALYSIS_OBJECTS)
+
+# Object filter for partial clones; "blob:limit=1m" also keeps files
+# over 1 MB off the wire. They are still listed, as too large: the limit
+# then acts as the size cap for checkouts
+PARTIAL_CLONE_FILTER = os.getenv("PARTIAL_CLONE_FILTER", "blob:none")
+
+# Written into a blob:limit partial clone's .git directory: wanted paths
+# whose blobs were left on the server, NUL separated
+OMITTED_LIST = 'codesense-omitted'
+
+# Files larger than this are listed but never read
+MAX_FILE_SIZE_BYTES = int(os.getenv("MAX_FILE_SIZE_BYTES", str(1024 * 1024)))
+
+# How much of each file is sniffed for binary content and generated markers
+SNIFF_BYTES = 8192
+
+# Directories holding third-party code checked into the repository
+VENDOR_DIRS = {
+    'vendor',
+    'third_party',
+    'third-party',
+    'bower_components',
+    'Pods',
+}
+
+# Filename endings of generated or bundled output
+GENERATED_SUFFIXES = (
+    '.min.js',
+    '.bundle.js',
+    '.pb.go',
+    '.pb.cc',
+    '.pb.h',
+    '_pb2.py',
+    '_pb2_grpc.py',
+    '.g.dart',
+    '.designer.cs',
+    '.generated.ts',
+    '.generated.cs',
+)
+
+# Markers that code generators put in the comment header of their output
+# (e.g. Go's "// Code generated ... DO NOT EDIT."); only the comment lines
+# before the first line of code are searched
+GENERATED_MARKERS = (
+    b'@generated',
+    b'Code generated by',
+    b'DO NOT EDIT',
+    b'<auto-generated',
+)
+
+# Reasons reported for files that are listed but not analyzed
+SKIP_TOO_LARGE = 'too_large'
+SKIP_BINARY = 'binary'
+SKIP_GENERATED = 'generated'
+SKIP_VENDORED = 'vendored'
+SKIP_MINIFIED = 'minified'
+
+# Parse cache kind for sniff results; bump when the sniff rules change
+SNIFF_CACHE_KIND = 'sniff:v2'
+
+
+def clone_repo(repo_url: str, dest: Path, mode: str | None = None, commit: str | None = None) -> None:
     """
     Clone a GitHub repository to the specified destination.
     
     Args:
         repo_url: GitHub repository URL (https or git format)
         dest: Destination path for cloning
+        mode: ``CLONE_FULL`` or ``CLONE_PARTIAL``; defaults to ``CLONE_MODE``
+        commit: Check out this commit rather than whatever the default
+            branch points at when the clone runs
         
     Raises:
         subprocess.CalledProcessError: If git clone fails
@@ -69,24 +179,218 @@ def clone_repo(repo_url: str, dest: Path) -> None:
         # If empty, proceed to clone
     
     dest.parent.mkdir(parents=True, exist_ok=True)
-    
-    # Use git CLI for cloning
-    # --depth=1 for shallow clone to save bandwidth
-    # --single-branch to clone only the default branch
+
+    mode = mode or CLONE_MODE
+    with tracing.span("git.clone", mode=mode) as span:
+        if mode == CLONE_PARTIAL:
+            try:
+                _clone_partial(repo_url, dest, commit)
+                return
+            except subprocess.CalledProcessError:
+                # Old git or a remote that rejects the filter: fall back to a full clone
+                _reset_dest(dest)
+                span.set("git.fallback", True)
+
+        # Use git CLI for cloning
+        # --depth=1 for shallow clone to save bandwidth
+        # --single-branch to clone only the default branch
+        result = subprocess.run(
+            ['git', 'clone', '--depth=1', '--single-branch', repo_url, str(dest)],
+            capture_output=True,
+            text=True,
+            check=True
+        )
+
+        if result.returncode != 0:
+            raise subprocess.CalledProcessError(
+                result.returncode,
+                result.args,
+                result.stdout,
+                result.stderr
+            )
+        if commit is not None:
+            _pin_commit(dest, commit, checkout=True)
+
+
+def _git(repo_path: Path, *args: str, stdin: str | None = None) -> str:
+    """Run a git command inside ``repo_path`` and return its stdout."""
     result = subprocess.run(
-        ['git', 'clone', '--depth=1', '--single-branch', repo_url, str(dest)],
+        ['git', '-C', str(repo_path), *args],
+        input=stdin,
         capture_output=True,
         text=True,
         check=True
     )
-    
-    if result.returncode != 0:
-        raise subprocess.CalledProcessError(
-            result.returncode,
-            result.args,
-            result.stdout,
-            result.stderr
-        )
+    return result.stdout
+
+
+def _pin_commit(repo_path: Path, commit: str, checkout: bool = False) -> None:
+    """
+    Move a fresh clone to ``commit`` if the default branch moved on between
+    resolving the commit and cloning.
+
+    The commit is fetched shallowly (a partial clone reuses its filter).
+    ``checkout`` also updates the working tree; otherwise only ``HEAD`` is
+    detached at the commit, for bare clones and clones not checked out yet.
+    """
+    if _git(repo_path, 'rev-parse', 'HEAD').strip() == commit:
+        return
+    _git(repo_path, 'fetch', '--depth=1', '--no-tags', 'origin', commit)
+    if checkout:
+        _git(repo_path, 'checkout', '--detach', commit)
+    else:
+        _git(repo_path, 'update-ref', '--no-deref', 'HEAD', commit)
+
+
+def _reset_dest(dest: Path) -> None:
+    """Empty a destination directory after a failed clone attempt."""
+    if not dest.exists():
+        return
+    for item in dest.iterdir():
+        if item.is_dir() and not item.is_symlink():
+            shutil.rmtree(item, ignore_errors=True)
+        else:
+            item.unlink(missing_ok=True)
+
+
+def _escape_pattern(rel_posix: str) -> str:
+    """Escape a literal path for use as an anchored sparse-checkout pattern."""
+    escaped = ''.join('\\' + c if c in '\\*?[]!# ' else c for c in rel_posix)
+    return '/' + escaped
+
+
+def sparse_patterns(omit: list[str] | None = None) -> list[str]:
+    """
+    Build non-cone sparse-checkout patterns for a partial clone.
+
+    Includes every ``SOURCE_EXTENSIONS`` file and every ``MANIFEST_FILES``
+    name at any depth, then excludes ``IGNORE_DIRS`` and the given paths.
+
+    Args:
+        omit: Repository-relative POSIX paths to leave out of the checkout
+
+    Returns:
+        Patterns in gitignore syntax, includes before excludes
+    """
+    patterns = [f'*{ext}' for ext in sorted(SOURCE_EXTENSIONS)]
+    patterns += sorted(MANIFEST_FILES)
+    patterns += [f'!**/{name}/**' for name in sorted(IGNORE_DIRS)]
+    patterns += ['!' + _escape_pattern(path) for path in omit or ()]
+    return patterns
+
+
+def _wanted_path(rel_posix: str) -> bool:
+    """Check whether a tree path would be matched by the sparse includes."""
+    name = rel_posix.rsplit('/', 1)[-1]
+    return name in MANIFEST_FILES or os.path.splitext(name)[1] in SOURCE_EXTENSIONS
+
+
+def _missing_blob_paths(repo_path: Path) -> list[str]:
+    """
+    List wanted paths whose blobs the filter left on the server.
+
+    Neither command fetches anything: ``ls-tree`` without ``-l`` only reads
+    trees, and ``rev-list --missing=print`` reports absent objects.
+    """
+    missing = {
+        line[1:] for line in _git(
+            repo_path, 'rev-list', '--objects', '--missing=print', 'HEAD'
+        ).splitlines()
+        if line.startswith('?')
+    }
+    if not missing:
+        return []
+
+    paths = []
+    for entry in _git(repo_path, 'ls-tree', '-r', '-z', 'HEAD').split('\0'):
+        if not entry:
+            continue
+        meta, path = entry.split('\t', 1)
+        if meta.split()[2] in missing and _wanted_path(path):
+            paths.append(path)
+    return paths
+
+
+def _clone_partial(repo_url: str, dest: Path, commit: str | None = None) -> None:
+    """
+    Clone only the blobs analysis reads.
+
+    A blobless (``--filter=blob:none``) shallow clone downloads commits and
+    trees; the sparse checkout then fetches source files and manifests in a
+    single batch. With a ``blob:limit=<size>`` filter, blobs over the limit
+    are never downloaded: they are left out of the sparse patterns so the
+    checkout does not fetch them lazily, and recorded (``omitted_paths``) so
+    scans still list them as too large.
+    """
+    subprocess.run(
+        [
+            'git', 'clone', '--depth=1', '--single-branch', '--no-checkout',
+            f'--filter={PARTIAL_CLONE_FILTER}', repo_url, str(dest),
+        ],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    if commit is not None:
+        # Before the checkout, so only the pinned commit's blobs are fetched
+        _pin_commit(dest, commit)
+
+    omit = _missing_blob_paths(dest) if PARTIAL_CLONE_FILTER.startswith('blob:limit') else []
+    if omit:
+        (dest / '.git' / OMITTED_LIST).write_text('\0'.join(omit), encoding='utf-8')
+    _git(dest, 'sparse-checkout', 'set', '--no-cone', '--stdin', stdin='\n'.join(sparse_patterns(omit)) + '\n')
+    _git(dest, 'checkout')
+
+
+def omitted_paths(repo_path: Path) -> list[str]:
+    """Paths a ``blob:limit`` partial clone of ``repo_path`` did not check out."""
+    try:
+        content = (repo_path / '.git' / OMITTED_LIST).read_text(encoding='utf-8')
+    except OSError:
+        return []
+    return [path for path in content.split('\0') if path]
+
+
+def clone_bare(repo_url: str, dest: Path, commit: str | None = None) -> None:
+    """
+    Clone a repository without a working tree, for checkout-free analysis.
+
+    The clone is shallow and blobless: only commits and trees are
+    downloaded, and ``git_objects.GitTree`` fetches the blobs it reads.
+
+    Args:
+        repo_url: GitHub repository URL (https or git format)
+        dest: Destination path for the bare repository
+        commit: Point ``HEAD`` at this commit rather than whatever the
+            default branch points at when the clone runs
+
+    Raises:
+        subprocess.CalledProcessError: If git clone fails
+        FileExistsError: If destination exists and is not a git repository
+    """
+    if dest.exists():
+        if (dest / "HEAD").exists() and (dest / "objects").is_dir():
+            return
+        if any(dest.iterdir()):
+            raise FileExistsError(f"Destination {dest} exists and is not a git repository")
+
+    dest.parent.mkdir(parents=True, exist_ok=True)
+
+    with tracing.span("git.clone", mode="bare") as span:
+        args = ['git', 'clone', '--bare', '--depth=1', '--single-branch']
+        try:
+            subprocess.run(
+                [*args, '--filter=blob:none', repo_url, str(dest)],
+                capture_output=True,
+                text=True,
+                check=True
+            )
+        except subprocess.CalledProcessError:
+            _reset_dest(dest)
+            span.set("git.fallback", True)
+            subprocess.run([*args, repo_url, str(dest)], capture_output=True, text=True, check=True)
+        if commit is not None:
+            _pin_commit(dest, commit)
 
 
 def scan_files(repo_path: Path) -> list[Path]:
@@ -128,5 +432,290 @@ def scan_files(repo_path: Path) -> list[Path]:
         if item.is_file() and is_source_file(item):
             # Store relative path from repo root
             source_files.append(item.relative_to(repo_path))
+
+    # Left on the server by a blob:limit clone; classified as too large
+    for path in map(Path, omitted_paths(repo_path)):
+        if is_source_file(path) and not any(part in IGNORE_DIRS for part in path.parts[:-1]):
+            source_files.append(path)
     
     return source_files
+
+
+def blob_shas(repo_path: Path) -> dict[str, str]:
+    """
+    Git blob SHA of every tracked file in a checkout, from ``git ls-files -s``.
+
+    Returns:
+        Relative POSIX path -> SHA; empty if ``repo_path`` is not a git checkout
+    """
+    try:
+        result = subprocess.run(
+            ['git', '-C', str(repo_path), 'ls-files', '-s', '-z'],
+            capture_output=True,
+            check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return {}
+
+    shas = {}
+    for entry in result.stdout.decode('utf-8', errors='surrogateescape').split('\0'):
+        if not entry:
+            continue
+        meta, path = entry.split('\t', 1)
+        mode, sha, _ = meta.split()
+        # Skip submodules and symlinks
+        if mode not in ('160000', '120000'):
+            shas[path] = sha
+    return shas
+
+
+def load_gitattributes(repo_path: Path, tree: "GitTree | None" = None) -> list[tuple[str, str, bool]]:
+    """
+    Read linguist-generated / linguist-vendored rules from .gitattributes.
+
+    Returns:
+        (pattern, kind, value) tuples in file order, where kind is
+        ``SKIP_GENERATED`` or ``SKIP_VENDORED``
+    """
+    rules = []
+    try:
+        if tree is not None:
+            lines = tree.read_text('.gitattributes').splitlines()
+        else:
+            with open(repo_path / '.gitattributes', 'r', encoding='utf-8', errors='ignore') as f:
+                lines = f.read().splitlines()
+    except OSError:
+        return rules
+
+    for line in lines:
+        fields = line.split('#', 1)[0].split()
+        if len(fields) < 2:
+            continue
+        pattern = fields[0]
+        for attribute in fields[1:]:
+            value = not attribute.startswith(('-', '!')) and not attribute.endswith('=false')
+            name = attribute.lstrip('-!').split('=', 1)[0]
+            if name == 'linguist-generated':
+                rules.append((pattern, SKIP_GENERATED, value))
+            elif name == 'linguist-vendored':
+                rules.append((pattern, SKIP_VENDORED, value))
+    return rules
+
+
+@lru_cache(maxsize=256)
+def _gitignore_regex(pattern: str) -> "re.Pattern[str]":
+    """
+    Compile a gitignore-style pattern: ``*`` and ``?`` do not cross ``/``,
+    ``**`` spans directories, a pattern with a slash (other than a trailing
+    one) is anchored to the root and one without matches at any depth, and
+    matching a directory matches everything under it.
+    """
+    anchored = '/' in pattern.rstrip('/')
+    directory_only = pattern.endswith('/')
+    pattern = pattern.strip('/')
+    out = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith('**/', i):
+            out.append('(?:.*/)?')
+            i += 3
+            continue
+        if pattern.startswith('**', i):
+            out.append('.*')
+            i += 2
+            continue
+        if char == '*':
+            out.append('[^/]*')
+        elif char == '?':
+            out.append('[^/]')
+        elif char == '[' and pattern.find(']', i + 2) > 0:
+            end = pattern.find(']', i + 2)
+            body = pattern[i + 1:end]
+            if body.startswith('!'):
+                body = '^' + body[1:]
+            out.append('[' + body.replace('\\', '\\\\') + ']')
+            i = end
+        else:
+            out.append(re.escape(char))
+        i += 1
+    prefix = '' if anchored else '(?:.*/)?'
+    suffix = '/.*' if directory_only else '(?:/.*)?'
+    return re.compile(prefix + ''.join(out) + suffix)
+
+
+def _gitattributes_reason(rel_posix: str, rules: list[tuple[str, str, bool]]) -> str | None:
+    """Apply gitattributes rules; later lines override earlier ones."""
+    state: dict[str, bool] = {}
+    for pattern, kind, value in rules:
+        if _gitignore_regex(pattern).fullmatch(rel_posix):
+            state[kind] = value
+    for kind in (SKIP_VENDORED, SKIP_GENERATED):
+        if state.get(kind):
+            return kind
+    return None
+
+
+def classify_file(
+    repo_path: Path,
+    rel_path: Path,
+    gitattributes: list[tuple[str, str, bool]] | None = None,
+    tree: "GitTree | None" = None
+) -> str | None:
+    """
+    Decide whether a source file should be skipped by analysis.
+
+    Checks, cheapest first: vendored directories, generated filename
+    patterns, .gitattributes linguist rules, the size cap, and finally the
+    first ``SNIFF_BYTES`` for NUL bytes, generator markers in the leading
+    comment header and single-line (minified) content. With a ``tree``, size and content come from git
+    objects instead of the filesystem.
+
+    Returns:
+        A ``SKIP_*`` reason, or None if the file should be analyzed
+    """
+    reason = _path_reason(rel_path, gitattributes)
+    if reason is not None:
+        return reason
+    reason, _ = _content_reason(repo_path, rel_path, tree)
+    return reason
+
+
+def _path_reason(rel_path: Path, gitattributes: list[tuple[str, str, bool]] | None) -> str | None:
+    """Skip reasons decided by the path alone."""
+    if any(part in VENDOR_DIRS for part in rel_path.parts[:-1]):
+        return SKIP_VENDORED
+    if rel_path.name.lower().endswith(GENERATED_SUFFIXES):
+        return SKIP_MINIFIED if '.min.' in rel_path.name.lower() else SKIP_GENERATED
+    if gitattributes:
+        return _gitattributes_reason(rel_path.as_posix(), gitattributes)
+    return None
+
+
+def _content_reason(
+    repo_path: Path,
+    rel_path: Path,
+    tree: "GitTree | None",
+    sniffed: dict[str, str] | None = None,
+    blob_sha: str | None = None
+) -> tuple[str | None, str | None]:
+    """
+    Skip reasons decided by size and content.
+
+    ``sniffed`` holds cached sniff results (blob SHA -> reason, '' for
+    none); a hit for ``blob_sha`` avoids reading the file.
+
+    Returns:
+        (reason, fresh sniff result to cache or None if nothing was sniffed)
+    """
+    if tree is not None:
+        size = tree.size(rel_path)
+    else:
+        try:
+            size = os.stat(repo_path / rel_path).st_size
+        except OSError:
+            if rel_path.as_posix() in omitted_paths(repo_path):
+                return SKIP_TOO_LARGE, None
+            return None, None
+    if size > MAX_FILE_SIZE_BYTES:
+        return SKIP_TOO_LARGE, None
+
+    if sniffed is not None and blob_sha in sniffed:
+        return sniffed[blob_sha] or None, None
+
+    try:
+        if tree is not None:
+            head = tree.read(rel_path, SNIFF_BYTES)
+        else:
+            with open(repo_path / rel_path, 'rb') as f:
+                head = f.read(SNIFF_BYTES)
+    except OSError:
+        return None, None
+    reason = _sniff_reason(head)
+    return reason, reason or ''
+
+
+_LINE_COMMENTS = (b'//', b'#', b'--', b';', b'%')
+_BLOCK_COMMENTS = ((b'/*', b'*/'), (b'<!--', b'-->'), (b'{-', b'-}'))
+
+
+def _comment_header(head: bytes) -> list[bytes]:
+    """Comment lines before the first line of code, blank lines skipped."""
+    header = []
+    block_end = None
+    for line in head.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if block_end is not None:
+            header.append(line)
+            if block_end in line:
+                block_end = None
+            continue
+        if line.startswith(_LINE_COMMENTS):
+            header.append(line)
+            continue
+        for start, end in _BLOCK_COMMENTS:
+            if line.startswith(start):
+                header.append(line)
+                if end not in line[len(start):]:
+                    block_end = end
+                break
+        else:
+            break
+    return header
+
+
+def _sniff_reason(head: bytes) -> str | None:
+    """Classify a file from its first ``SNIFF_BYTES``."""
+    if b'\0' in head:
+        return SKIP_BINARY
+    if any(marker in line for line in _comment_header(head) for marker in GENERATED_MARKERS):
+        return SKIP_GENERATED
+    if len(head) == SNIFF_BYTES and b'\n' not in head:
+        return SKIP_MINIFIED
+    return None
+
+
+def partition_files(
+    repo_path: Path,
+    files: list[Path],
+    tree: "GitTree | None" = None,
+    blob_shas: dict[str, str] | None = None
+) -> tuple[list[Path], dict[Path, str]]:
+    """
+    Split scanned files into those to analyze and those to skip.
+
+    Args:
+        repo_path: Path to cloned repository
+        files: Relative source paths from ``scan_files``
+        tree: Read sizes and content from this ``GitTree`` instead of disk
+        blob_shas: Relative POSIX path -> git blob SHA; sniff results for
+            known blobs come from the parse cache instead of a read
+
+    Returns:
+        (files to analyze, {skipped file: reason})
+    """
+    gitattributes = load_gitattributes(repo_path, tree)
+    shas = blob_shas or {}
+    sniffed = parse_cache.get_many(SNIFF_CACHE_KIND, [
+        shas[rel_path.as_posix()] for rel_path in files if rel_path.as_posix() in shas
+    ])
+    fresh = {}
+
+    analyzable = []
+    skipped = {}
+    for rel_path in files:
+        reason = _path_reason(rel_path, gitattributes)
+        if reason is None:
+            sha = shas.get(rel_path.as_posix())
+            reason, result = _content_reason(repo_path, rel_path, tree, sniffed, sha)
+            if sha and result is not None:
+                fresh[sha] = result
+        if reason is None:
+            analyzable.append(rel_path)
+        else:
+            skipped[rel_path] = reason
+
+    parse_cache.put_many(SNIFF_CACHE_KIND, fresh)
+    return analyzable, skipped
@@ -1,13 +1,19 @@
+import asyncio
+import os
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Annotated, Optional
+from typing import Annotated, Any, Dict, Optional, Tuple
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.database import get_session
+from app.core.database import get_async_session
 from app.models.user import User, UserRole
 
 # Change this to a secure secret in production
@@ -15,19 +21,126 @@ SECRET_KEY = "supersecretkey"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+# Argon2 cost parameters. Defaults match passlib's, so existing hashes stay valid.
+# Changing any of these makes verify_and_update_password() rehash on next login.
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "3"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "65536"))
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "4"))
+
+# Size of the dedicated thread pool used for hashing and verification
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# passlib (with the argon2 backend) and jose are imported on first use, so
+# workers that never authenticate do not pay for them; warm() loads them early
+_pwd_context = None
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/token")
 
+_hash_executor: Optional[ThreadPoolExecutor] = None
+
+# Token -> user cache so authenticated requests skip the JWT decode and the
+# user lookup. Entries expire with the token (capped by TOKEN_CACHE_TTL_SECONDS
+# so out-of-band DB changes are picked up) and are dropped by invalidate_user(),
+# which every code path that changes a user calls.
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "1024"))
+TOKEN_CACHE_TTL_SECONDS = int(os.getenv("TOKEN_CACHE_TTL_SECONDS", "300"))
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """
+    Immutable snapshot of the authenticated user.
+
+    Cached entries are shared by concurrent requests, so they hold this
+    rather than an ORM ``User`` bound to (or detached from) some session.
+    """
+    id: int
+    username: str
+    email: Optional[str]
+    role: UserRole
+
+    @classmethod
+    def from_user(cls, user: User) -> "CurrentUser":
+        return cls(id=user.id, username=user.username, email=user.email, role=UserRole(user.role))
+
+
+_token_cache: "OrderedDict[str, Tuple[float, CurrentUser]]" = OrderedDict()
+
+
+def password_context():
+    """The passlib ``CryptContext`` for password hashes, created on first use."""
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+
+        _pwd_context = CryptContext(
+            schemes=["argon2"],
+            deprecated="auto",
+            argon2__time_cost=ARGON2_TIME_COST,
+            argon2__memory_cost=ARGON2_MEMORY_COST,
+            argon2__parallelism=ARGON2_PARALLELISM,
+        )
+    return _pwd_context
+
+
+def warm() -> None:
+    """Import the hashing and JWT libraries and load the argon2 backend now."""
+    password_context().handler("argon2").get_backend()
+    import jose.jwt  # noqa: F401
+
+
+def loaded() -> bool:
+    return _pwd_context is not None and "jose.jwt" in sys.modules
+
+
+def _get_hash_executor() -> ThreadPoolExecutor:
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=PASSWORD_HASH_WORKERS,
+            thread_name_prefix="password-hash",
+        )
+    return _hash_executor
+
+
+def shutdown_hash_executor() -> None:
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False)
+        _hash_executor = None
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return password_context().hash(password)
+
+
+async def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password on the hashing pool without blocking the event loop.
+
+    Returns ``(valid, new_hash)``; ``new_hash`` is set when the stored hash
+    was made with outdated Argon2 parameters and should be replaced.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_hash_executor(), password_context().verify_and_update, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the hashing pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_hash_executor(), password_context().hash, password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
+    from jose import jwt
+
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.now(timezone.utc) + expires_delta
@@ -38,12 +151,56 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
-async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], session: Session = Depends(get_session)):
+def _cached_user(token: str) -> Optional[CurrentUser]:
+    entry = _token_cache.get(token)
+    if entry is None:
+        return None
+    expires_at, user = entry
+    if expires_at <= time.time():
+        del _token_cache[token]
+        return None
+    _token_cache.move_to_end(token)
+    return user
+
+
+def _cache_user(token: str, user: CurrentUser, payload: Dict[str, Any]) -> None:
+    expires_at = time.time() + TOKEN_CACHE_TTL_SECONDS
+    exp = payload.get("exp")
+    if exp is not None:
+        expires_at = min(expires_at, float(exp))
+    _token_cache[token] = (expires_at, user)
+    _token_cache.move_to_end(token)
+    while len(_token_cache) > TOKEN_CACHE_SIZE:
+        _token_cache.popitem(last=False)
+
+
+def invalidate_user(username: str) -> None:
+    """Drop every cached token for a user; call it whenever a user is changed."""
+    stale = [token for token, (_, user) in _token_cache.items() if user.username == username]
+    for token in stale:
+        del _token_cache[token]
+
+
+def clear_token_cache() -> None:
+    _token_cache.clear()
+
+
+async def get_current_user(
+    token: Annotated[str, Depends(oauth2_scheme)], session: AsyncSession = Depends(get_async_session)
+) -> CurrentUser:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+    # Hot path: token already validated and resolved, no decode or DB round-trip
+    user = _cached_user(token)
+    if user is not None:
+        return user
+
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
@@ -53,18 +210,27 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], sessio
         raise credentials_exception
     
     statement = select(User).where(User.username == username)
-    user = session.exec(statement).first()
+    db_user = (await session.exec(statement)).first()
     
-    if user is None:
+    if db_user is None:
         raise credentials_exception
+    user = CurrentUser.from_user(db_user)
+
+    # The role claim is signed into the token; a token minted for a role the
+    # user no longer has is rejected rather than silently upgraded/downgraded.
+    role = payload.get("role")
+    if role is not None and role != user.role:
+        raise credentials_exception
+
+    _cache_user(token, user, payload)
     return user
 
 
-async def get_current_active_user(current_user: Annotated[User, Depends(get_current_user)]):
+async def get_current_active_user(current_user: Annotated[CurrentUser, Depends(get_current_user)]):
     return current_user
 
 
-async def get_current_hr_user(current_user: Annotated[User, Depends(get_current_user)]):
+async def get_current_hr_user(current_user: Annotated[CurrentUser, Depends(get_current_user)]):
     if current_user.role != UserRole.HR:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,412 @@
+"""
+Per-request tracing.
+
+``span(name, **attributes)`` opens a span as a child of the current one (or
+as the root of a new trace) for the duration of a block; it works in sync
+code, in coroutines and in ``asyncio.to_thread`` workers, which inherit the
+current span through a context variable. The HTTP middleware opens one
+root span per request, ``metrics.stage`` opens a span per analysis stage,
+and clones, GitHub API requests and Gemini calls open their own.
+
+When a trace's root span ends, the whole trace goes to every configured
+exporter (``TRACE_EXPORTERS``, comma separated):
+
+- ``memory``: ring buffer of the last ``TRACE_BUFFER_SIZE`` traces, behind
+  the ``/debug/traces`` endpoint (slowest first; mounted only with
+  ``DEBUG_ENDPOINTS=1``)
+- ``jsonl``: one JSON object per span appended to ``TRACE_JSONL_PATH``
+- ``otlp``: OTLP/HTTP JSON ``ExportTraceServiceRequest`` bodies, POSTed to
+  ``OTLP_ENDPOINT`` (e.g. ``http://collector:4318/v1/traces``), or appended
+  to ``OTLP_JSONL_PATH`` if no endpoint is set
+
+The file and HTTP exporters write from a background thread, in batches.
+
+Set ``TRACING_ENABLED=0`` to turn spans into no-ops.
+"""
+import json
+import os
+import queue
+import secrets
+import tempfile
+import threading
+import time
+import urllib.request
+from abc import ABC, abstractmethod
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "1") not in ("0", "false", "False")
+TRACE_EXPORTERS = os.getenv("TRACE_EXPORTERS", "memory")
+TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE", "200"))
+TRACE_JSONL_PATH = Path(os.getenv(
+    "TRACE_JSONL_PATH", str(Path(tempfile.gettempdir()) / "codesense_traces.jsonl")
+))
+OTLP_ENDPOINT = os.getenv("OTLP_ENDPOINT", "")
+OTLP_JSONL_PATH = Path(os.getenv(
+    "OTLP_JSONL_PATH", str(Path(tempfile.gettempdir()) / "codesense_traces.otlp.jsonl")
+))
+SERVICE_NAME = os.getenv("SERVICE_NAME", "explain-any-codebase")
+
+# Guards against runaway traces (e.g. a span per file)
+MAX_SPANS_PER_TRACE = 1000
+
+
+@dataclass
+class Span:
+    """One timed operation in a trace."""
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int
+    end_ns: int = 0
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def set(self, key: str, value: Any) -> None:
+        """Set an attribute (str, bool, int or float)."""
+        self.attributes[key] = value
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _Trace:
+    """Spans of one trace collected until its root span ends."""
+    __slots__ = ("spans", "lock", "dropped")
+
+    def __init__(self):
+        self.spans: list[Span] = []
+        self.lock = threading.Lock()
+        self.dropped = 0
+
+
+_current: ContextVar[Optional[tuple[Span, _Trace]]] = ContextVar("current_span", default=None)
+
+
+class _SpanScope:
+    """Context manager behind ``span``; usable with ``with`` in sync and async code."""
+    __slots__ = ("name", "attributes", "span", "trace", "token")
+
+    def __init__(self, name: str, attributes: dict):
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self) -> Span:
+        parent = _current.get()
+        if parent is None:
+            trace_id, parent_id, self.trace = secrets.token_hex(16), None, _Trace()
+        else:
+            trace_id, parent_id, self.trace = parent[0].trace_id, parent[0].span_id, parent[1]
+        self.span = Span(
+            self.name, trace_id, secrets.token_hex(8), parent_id,
+            time.time_ns(), attributes=self.attributes
+        )
+        self.token = _current.set((self.span, self.trace))
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.span.end_ns = time.time_ns()
+        if exc is not None:
+            self.span.error = f"{exc_type.__name__}: {exc}"
+        try:
+            _current.reset(self.token)
+        except ValueError:
+            # Exited in another context than entered (generator finalizers)
+            pass
+        trace = self.trace
+        with trace.lock:
+            if len(trace.spans) < MAX_SPANS_PER_TRACE:
+                trace.spans.append(self.span)
+            else:
+                trace.dropped += 1
+        if self.span.parent_id is None:
+            if trace.dropped:
+                self.span.set("trace.dropped_spans", trace.dropped)
+            _export(trace.spans)
+
+
+class _NoSpan:
+    """Stand-in for ``Span`` when tracing is disabled."""
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoSpan":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+
+# Shared no-op span, for callers that skip tracing
+NO_SPAN = _NoSpan()
+
+
+def span(name: str, **attributes: Any):
+    """
+    Trace a block as span ``name``.
+
+    Yields:
+        The ``Span``; call ``.set(key, value)`` to add attributes
+    """
+    return _SpanScope(name, attributes) if TRACING_ENABLED else NO_SPAN
+
+
+def set_attribute(key: str, value: Any) -> None:
+    """Set an attribute on the current span, if any."""
+    current = _current.get()
+    if current is not None:
+        current[0].set(key, value)
+
+
+def current_trace_id() -> Optional[str]:
+    current = _current.get()
+    return current[0].trace_id if current is not None else None
+
+
+class SpanExporter(ABC):
+    """Receives every finished trace."""
+
+    @abstractmethod
+    def export(self, spans: list[Span]) -> None:
+        """Called when the trace's root span ends, on the request's thread."""
+
+
+class RingBufferExporter(SpanExporter):
+    """Keeps the most recent traces in memory."""
+
+    def __init__(self, capacity: int = TRACE_BUFFER_SIZE):
+        self.traces: deque[list[Span]] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def export(self, spans: list[Span]) -> None:
+        with self._lock:
+            self.traces.append(spans)
+
+    def snapshot(self) -> list[list[Span]]:
+        with self._lock:
+            return list(self.traces)
+
+
+class QueuedExporter(SpanExporter):
+    """
+    Hands traces to a background thread, which passes them to ``write`` in
+    batches; serialization and I/O never run on the event loop. Traces are
+    dropped if the queue backs up.
+    """
+
+    max_batch = 100
+
+    def __init__(self, maxsize: int = 1000):
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def export(self, spans: list[Span]) -> None:
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name=f"{type(self).__name__}-worker", daemon=True
+                )
+                self._worker.start()
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            pass
+
+    def flush(self) -> None:
+        """Block until every queued trace has been written."""
+        self._queue.join()
+
+    @abstractmethod
+    def write(self, batch: list[list[Span]]) -> None:
+        """Write ``batch`` (one span list per trace); runs on the worker thread."""
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.write(batch)
+            except Exception:
+                # A full disk or a down collector must not affect requests
+                pass
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+
+def _append_lines(path: Path, lines: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(lines)
+
+
+class JsonlExporter(QueuedExporter):
+    """Appends one JSON object per span to a file."""
+
+    def __init__(self, path: Path = TRACE_JSONL_PATH):
+        super().__init__()
+        self.path = path
+
+    def write(self, batch: list[list[Span]]) -> None:
+        _append_lines(self.path, "".join(
+            json.dumps(s.to_dict(), default=str) + "\n" for spans in batch for s in spans
+        ))
+
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(spans: list[Span]) -> dict:
+    """OTLP/JSON ``ExportTraceServiceRequest`` for one trace."""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [
+                {"key": "service.name", "value": {"stringValue": SERVICE_NAME}}
+            ]},
+            "scopeSpans": [{
+                "scope": {"name": "codesense"},
+                "spans": [
+                    {
+                        "traceId": s.trace_id,
+                        "spanId": s.span_id,
+                        **({"parentSpanId": s.parent_id} if s.parent_id else {}),
+                        "name": s.name,
+                        # SERVER for request roots, INTERNAL otherwise
+                        "kind": 2 if s.parent_id is None else 1,
+                        "startTimeUnixNano": str(s.start_ns),
+                        "endTimeUnixNano": str(s.end_ns),
+                        "attributes": [
+                            {"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()
+                        ],
+                        "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+                    }
+                    for s in spans
+                ],
+            }],
+        }]
+    }
+
+
+class OtlpExporter(QueuedExporter):
+    """
+    OTLP/HTTP JSON output: each batch is POSTed to ``endpoint`` as one
+    request, or appended to a file (one request per trace per line) when no
+    endpoint is configured.
+    """
+
+    def __init__(self, endpoint: str = OTLP_ENDPOINT, path: Path = OTLP_JSONL_PATH):
+        super().__init__()
+        self.endpoint = endpoint
+        self.path = path
+
+    def write(self, batch: list[list[Span]]) -> None:
+        if not self.endpoint:
+            _append_lines(self.path, "".join(
+                json.dumps(to_otlp(spans), default=str) + "\n" for spans in batch
+            ))
+            return
+        body = json.dumps(to_otlp([s for spans in batch for s in spans]), default=str)
+        request = urllib.request.Request(
+            self.endpoint, data=body.encode("utf-8"),
+            headers={"Content-Type": "application/json"}, method="POST"
+        )
+        urllib.request.urlopen(request, timeout=5).close()
+
+
+_exporters: list[SpanExporter] = []
+_memory: Optional[RingBufferExporter] = None
+
+
+def configure(names: str = TRACE_EXPORTERS) -> None:
+    """(Re)create the exporters named in ``names`` (comma separated)."""
+    global _memory
+    _exporters.clear()
+    _memory = None
+    for name in (n.strip().lower() for n in names.split(",")):
+        if name == "memory":
+            _memory = RingBufferExporter()
+            _exporters.append(_memory)
+        elif name == "jsonl":
+            _exporters.append(JsonlExporter())
+        elif name == "otlp":
+            _exporters.append(OtlpExporter())
+
+
+def add_exporter(exporter: SpanExporter) -> None:
+    _exporters.append(exporter)
+
+
+def _export(spans: list[Span]) -> None:
+    for exporter in _exporters:
+        try:
+            exporter.export(spans)
+        except Exception:
+            # Exporting is best effort
+            pass
+
+
+def slowest_traces(limit: int = 20, name: Optional[str] = None) -> list[dict]:
+    """
+    Recent traces from the ring buffer, slowest root span first.
+
+    Args:
+        limit: Number of traces to return
+        name: Only traces whose root span has this name
+    """
+    if _memory is None:
+        return []
+    summaries = []
+    for spans in _memory.snapshot():
+        root = next((s for s in spans if s.parent_id is None), None)
+        if root is None or (name and root.name != name):
+            continue
+        summaries.append((root.duration_ms, root, spans))
+    summaries.sort(key=lambda item: item[0], reverse=True)
+    return [
+        {
+            "trace_id": root.trace_id,
+            "name": root.name,
+            "duration_ms": round(duration, 3),
+            "start_ns": root.start_ns,
+            "attributes": root.attributes,
+            "error": root.error,
+            "spans": [s.to_dict() for s in sorted(spans, key=lambda s: s.start_ns)],
+        }
+        for duration, root, spans in summaries[:limit]
+    ]
+
+
+configure()
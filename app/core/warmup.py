@@ -0,0 +1,61 @@
+"""
+Deferred heavy dependencies and their warm-up.
+
+``google.generativeai`` (LLM features) and passlib/argon2 with jose (auth)
+are imported on first use rather than at startup, which keeps worker boot
+fast. ``warm`` loads them ahead of traffic: ``GET /ready?warm=true`` does it
+on demand (e.g. from a readiness probe or after a rolling restart), and
+``PRELOAD_DEPENDENCIES`` (``all`` or a comma-separated list of names) does
+it during startup instead.
+"""
+import os
+import time
+from typing import Callable, Optional
+
+from . import security
+from ..llm import backend
+
+PRELOAD_DEPENDENCIES = os.getenv("PRELOAD_DEPENDENCIES", "")
+
+# Name -> (warm-up function, whether it is loaded)
+DEPENDENCIES: dict[str, tuple[Callable[[], None], Callable[[], bool]]] = {
+    "llm": (backend.warm, backend.loaded),
+    "auth": (security.warm, security.loaded),
+}
+
+# Name -> milliseconds its last warm-up took
+_warm_ms: dict[str, float] = {}
+
+
+def _select(names: Optional[str]) -> list[str]:
+    if not names or names.strip().lower() == "all":
+        return list(DEPENDENCIES)
+    return [name.strip() for name in names.split(",") if name.strip() in DEPENDENCIES]
+
+
+def warm(names: Optional[str] = None) -> dict[str, dict]:
+    """
+    Load dependencies now (blocking; run it in a thread from async code).
+
+    Args:
+        names: Comma-separated dependency names; all when empty or ``all``
+
+    Returns:
+        ``status()`` after warming
+    """
+    for name in _select(names):
+        warm_fn, loaded = DEPENDENCIES[name]
+        if loaded():
+            continue
+        start = time.perf_counter()
+        warm_fn()
+        _warm_ms[name] = round((time.perf_counter() - start) * 1000, 1)
+    return status()
+
+
+def status() -> dict[str, dict]:
+    """Name -> ``{"loaded", "warm_ms"}`` (``warm_ms`` is None unless warmed explicitly)."""
+    return {
+        name: {"loaded": loaded(), "warm_ms": _warm_ms.get(name)}
+        for name, (_, loaded) in DEPENDENCIES.items()
+    }
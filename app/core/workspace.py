@@ -0,0 +1,250 @@
+"""
+Workspace manager for repository analyses.
+
+Workspaces live under ``WORKSPACE_ROOT`` in directories named by a hash of
+the normalized owner/repo and the analyzed commit, so same-named
+repositories of different owners never share a directory and a workspace is
+never reused for a different commit. Each key has an exclusive lock for
+populating its directory and a shared lock held while it is in use; a
+``.ready`` marker is written only after population succeeds, so a clone
+interrupted half-way is discarded instead of analyzed. Idle workspaces are
+garbage collected by age and by a disk budget, at most every
+``WORKSPACE_GC_INTERVAL_SECONDS`` per process; a workspace's size is
+measured once, when it is populated, and stored in its marker.
+
+``single_flight`` coalesces concurrent requests for the same key within
+the process into one run whose result every caller receives.
+"""
+import asyncio
+import hashlib
+import os
+import re
+import shutil
+import stat
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from . import mirror_store
+from .fsutil import disk_usage, file_lock
+
+
+WORKSPACE_ROOT = Path(os.getenv("WORKSPACE_ROOT", str(Path(tempfile.gettempdir()) / "explain_codebase")))
+WORKSPACE_MAX_AGE_SECONDS = int(os.getenv("WORKSPACE_MAX_AGE_SECONDS", "3600"))
+WORKSPACE_DISK_BUDGET_BYTES = int(os.getenv("WORKSPACE_DISK_BUDGET_BYTES", str(5 * 1024 ** 3)))
+WORKSPACE_GC_INTERVAL_SECONDS = int(os.getenv("WORKSPACE_GC_INTERVAL_SECONDS", "60"))
+
+_GITHUB_URL = re.compile(
+    r'^(?:https?://|git://|ssh://git@|git@)(?:www\.)?github\.com[/:]([^/\s]+)/([^/\s]+?)(?:\.git)?/?$',
+    re.IGNORECASE
+)
+
+# Key -> running analysis, for single_flight
+_inflight: dict[Any, asyncio.Future] = {}
+
+# time.monotonic() of the last collect_workspaces run in this process
+_last_collect = float('-inf')
+
+
+def normalize_repo(repo_url: str) -> str:
+    """
+    Canonical repository name: ``owner/repo`` for GitHub URLs (any scheme,
+    case-insensitive), otherwise the URL without a trailing slash or ``.git``.
+    """
+    url = repo_url.strip()
+    match = _GITHUB_URL.match(url)
+    if match:
+        return f"{match.group(1)}/{match.group(2)}".lower()
+    return url.rstrip('/').removesuffix('.git')
+
+
+def workspace_key(repo_url: str, commit: str, layout: str = '') -> str:
+    """Directory name for a repository at a commit in a given on-disk layout."""
+    identity = f"{normalize_repo(repo_url)}@{commit}#{layout}"
+    return hashlib.sha256(identity.encode()).hexdigest()[:32]
+
+
+def workspace_path(repo_url: str, commit: str, layout: str = '') -> Path:
+    return WORKSPACE_ROOT / workspace_key(repo_url, commit, layout)
+
+
+def resolve_commit(repo_url: str) -> str:
+    """
+    Commit the remote's default branch points at.
+
+    Uses the (refreshed) mirror when mirrors are enabled, otherwise
+    ``git ls-remote``.
+
+    Raises:
+        subprocess.CalledProcessError: If the remote cannot be read
+    """
+    if mirror_store.MIRRORS_ENABLED:
+        mirror = mirror_store.ensure_mirror(repo_url)
+        return mirror_store.head_commit(mirror)
+
+    result = subprocess.run(
+        ['git', 'ls-remote', repo_url, 'HEAD'],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return result.stdout.split()[0]
+
+
+def _on_rm_error(func, path, exc_info):
+    """``shutil.rmtree`` handler: clear read-only bits (git objects on Windows) and retry."""
+    os.chmod(path, stat.S_IWRITE)
+    try:
+        func(path)
+    except Exception:
+        pass
+
+
+def _remove(path: Path) -> None:
+    if path.exists():
+        shutil.rmtree(path, onerror=_on_rm_error)
+
+
+@contextmanager
+def open_workspace(
+    repo_url: str,
+    commit: str,
+    populate: Callable[[Path], None],
+    layout: str = ''
+) -> Iterator[Path]:
+    """
+    Reuse or create the workspace for ``repo_url`` at ``commit``.
+
+    Args:
+        repo_url: Repository URL
+        commit: Commit the workspace holds
+        populate: Fills a missing or empty directory (clone, worktree, ...);
+            called under the key's exclusive lock
+        layout: Distinguishes incompatible contents for the same commit,
+            e.g. a bare clone and a sparse checkout
+
+    Yields:
+        The workspace directory, protected from garbage collection
+    """
+    key = workspace_key(repo_url, commit, layout)
+    path = WORKSPACE_ROOT / key
+    ready = WORKSPACE_ROOT / f"{key}.ready"
+
+    while True:
+        with file_lock(WORKSPACE_ROOT / f"{key}.lock"):
+            if not ready.exists():
+                # Leftovers of an interrupted population are never trusted
+                _remove(path)
+                try:
+                    populate(path)
+                except Exception:
+                    _remove(path)
+                    raise
+                ready.write_text(str(disk_usage(path)))
+
+        with file_lock(WORKSPACE_ROOT / f"{key}.lease", exclusive=False):
+            if not ready.exists():
+                # Collected between population and lease: populate again
+                continue
+            os.utime(ready)
+            try:
+                yield path
+            finally:
+                _maybe_collect(keep={key})
+            return
+
+
+def _maybe_collect(keep: set[str]) -> None:
+    """Run ``collect_workspaces`` unless it ran in the last interval."""
+    global _last_collect
+    now = time.monotonic()
+    if now - _last_collect < WORKSPACE_GC_INTERVAL_SECONDS:
+        return
+    _last_collect = now
+    collect_workspaces(keep=keep)
+
+
+def _workspace_size(ready: Path) -> int:
+    """Size stored in a ``.ready`` marker; measured if the marker has none."""
+    try:
+        return int(ready.read_text())
+    except (OSError, ValueError):
+        return disk_usage(ready.with_suffix(''))
+
+
+def collect_workspaces(
+    max_age: int | None = None,
+    disk_budget: int | None = None,
+    keep: set[str] | None = None
+) -> list[Path]:
+    """
+    Delete idle workspaces older than ``max_age`` seconds, then least
+    recently used ones until the total fits ``disk_budget``.
+
+    Workspaces in use or being populated, and keys in ``keep``, are skipped.
+
+    Returns:
+        The deleted workspace directories
+    """
+    max_age = WORKSPACE_MAX_AGE_SECONDS if max_age is None else max_age
+    disk_budget = WORKSPACE_DISK_BUDGET_BYTES if disk_budget is None else disk_budget
+    if not WORKSPACE_ROOT.is_dir():
+        return []
+
+    now = time.time()
+    entries = []
+    for ready in WORKSPACE_ROOT.glob('*.ready'):
+        key = ready.stem
+        try:
+            age = now - ready.stat().st_mtime
+        except OSError:
+            continue
+        entries.append((age, key, _workspace_size(ready)))
+
+    deleted = []
+    # Directories without a marker: crashed populations or old layouts
+    known = {key for _, key, _ in entries}
+    for path in WORKSPACE_ROOT.iterdir():
+        if path.is_dir() and path.name not in known and now - path.stat().st_mtime > max_age:
+            with file_lock(WORKSPACE_ROOT / f"{path.name}.lock", blocking=False) as locked:
+                if locked and not (WORKSPACE_ROOT / f"{path.name}.ready").exists():
+                    _remove(path)
+                    deleted.append(path)
+
+    total = sum(size for _, _, size in entries)
+    # Oldest first: expired workspaces go regardless of the budget
+    for age, key, size in sorted(entries, reverse=True):
+        if age <= max_age and total <= disk_budget:
+            break
+        if keep and key in keep:
+            continue
+        with file_lock(WORKSPACE_ROOT / f"{key}.lock", blocking=False) as locked:
+            if not locked:
+                continue
+            with file_lock(WORKSPACE_ROOT / f"{key}.lease", blocking=False) as idle:
+                if not idle:
+                    continue
+                (WORKSPACE_ROOT / f"{key}.ready").unlink(missing_ok=True)
+                _remove(WORKSPACE_ROOT / key)
+        total -= size
+        deleted.append(WORKSPACE_ROOT / key)
+    return deleted
+
+
+async def single_flight(key: Any, fn: Callable[[], Any]) -> Any:
+    """
+    Run blocking ``fn`` in a worker thread, sharing one run per ``key``.
+
+    Callers that arrive while a run for ``key`` is in flight await its
+    result (or exception) instead of starting their own. A caller being
+    cancelled does not cancel the shared run.
+    """
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(asyncio.to_thread(fn))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    return await asyncio.shield(task)
@@ -2,15 +2,12 @@
 LLM integration for answering questions about codebases.
 """
 
-import os
-import google.generativeai as genai
+from . import backend
 
 # Configure API key
 def _configure_genai():
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
+    if not backend.configure():
         raise ValueError("GEMINI_API_KEY environment variable not set")
-    genai.configure(api_key=api_key)
 
 async def answer_question(question: str, context: str) -> str:
     """
@@ -25,12 +22,10 @@ async def answer_question(question: str, context: str) -> str:
     """
     try:
         _configure_genai()
-        model = genai.GenerativeModel('gemini-2.0-flash')
         
         # Combine context and question
         full_prompt = f"{context}\n\nQuestion: {question}"
         
-        response = model.generate_content(full_prompt)
-        return response.text
+        return await backend.generate_content(full_prompt, 'gemini-2.0-flash')
     except Exception as e:
         return f"Error generating answer: {str(e)}"
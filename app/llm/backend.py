@@ -0,0 +1,95 @@
+"""
+Text generation backend shared by the LLM features.
+
+``LLM_BACKEND`` selects it:
+
+- ``gemini`` (default): Google Gemini, keyed by ``GEMINI_API_KEY``
+- ``fake``: canned text after ``FAKE_LLM_LATENCY_SECONDS``, for load tests
+  and offline runs; needs no key and makes no network calls
+
+``google.generativeai`` is imported on first use, in a worker thread so
+the event loop keeps serving: it is most of the app's import time, and
+workers that never serve chat or profiles do not need it.
+"""
+import asyncio
+import hashlib
+import os
+import sys
+
+from ..core import tracing
+
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini").lower()
+FAKE_LLM_LATENCY_SECONDS = float(os.getenv("FAKE_LLM_LATENCY_SECONDS", "0.5"))
+FAKE_LLM_RESPONSE_CHARS = int(os.getenv("FAKE_LLM_RESPONSE_CHARS", "1500"))
+
+_FAKE_SENTENCES = (
+    "The repository is organised around a small core package.",
+    "Request handling is separated from the domain logic.",
+    "Most modules depend on a shared configuration layer.",
+    "Tests and tooling live next to the code they cover.",
+    "The main entry point wires the components together at startup.",
+)
+
+
+def _genai():
+    """``google.generativeai``, imported on first call."""
+    import google.generativeai as genai
+
+    return genai
+
+
+def warm() -> None:
+    """Import the configured backend's client library now."""
+    if LLM_BACKEND != "fake":
+        _genai()
+
+
+def loaded() -> bool:
+    return LLM_BACKEND == "fake" or "google.generativeai" in sys.modules
+
+
+def configure() -> bool:
+    """
+    Check the backend can be used; Gemini's client is configured per call.
+
+    Returns:
+        False if it cannot be used (Gemini without ``GEMINI_API_KEY``)
+    """
+    if LLM_BACKEND == "fake":
+        return True
+    return bool(os.getenv("GEMINI_API_KEY"))
+
+
+async def _fake_generate(prompt: str) -> str:
+    await asyncio.sleep(FAKE_LLM_LATENCY_SECONDS)
+    # Deterministic per prompt, so responses can be compared across runs
+    start = hashlib.sha256(prompt.encode("utf-8")).digest()[0]
+    text = ""
+    i = start
+    while len(text) < FAKE_LLM_RESPONSE_CHARS:
+        text += _FAKE_SENTENCES[i % len(_FAKE_SENTENCES)] + " "
+        i += 1
+    return text[:FAKE_LLM_RESPONSE_CHARS]
+
+
+async def generate_content(prompt: str, model: str) -> str:
+    """
+    Generate text for ``prompt``; call ``configure`` first.
+
+    Traced as a ``<backend>.generate_content`` span.
+
+    Args:
+        prompt: Full prompt
+        model: Gemini model name (ignored by the fake backend)
+    """
+    with tracing.span(f"{LLM_BACKEND}.generate_content", model=model) as span:
+        span.set("llm.prompt_chars", len(prompt))
+        if LLM_BACKEND == "fake":
+            text = await _fake_generate(prompt)
+        else:
+            genai = await asyncio.to_thread(_genai)
+            genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+            response = await genai.GenerativeModel(model).generate_content_async(prompt)
+            text = response.text
+        span.set("llm.response_chars", len(text))
+    return text
@@ -1,13 +1,11 @@
-import os
-import google.generativeai as genai
 from typing import Dict, List, Any
 
+from . import backend
+
 def _configure_genai():
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
+    if not backend.configure():
         print("WARN: GEMINI_API_KEY not set. Skipping summary generation.")
         return False
-    genai.configure(api_key=api_key)
     return True
 
 async def generate_profile_summary(
@@ -25,8 +23,6 @@ async def generate_profile_summary(
         return "Summary generation unavailable (API key missing)."
 
     try:
-        model = genai.GenerativeModel('gemini-2.5-flash')
-
         # Format top repos for context
         repos_context = "\n".join([
             f"- {r.name}: {r.description} ({r.language}, {r.stars} stars)"
@@ -55,8 +51,7 @@ Top Repositories:
 The summary should be engaging and written in markdown. Focus on their technical strengths demonstrated by the repositories.
 """
 
-        response = await model.generate_content_async(prompt)
-        return response.text
+        return await backend.generate_content(prompt, 'gemini-2.5-flash')
     except Exception as e:
         print(f"Error generating profile summary: {e}")
         return "Unable to generate summary at this time."
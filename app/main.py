@@ -1,26 +1,42 @@
 """
 Main FastAPI application entry point.
 """
+import asyncio
+import os
 from pathlib import Path
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse
 
 from dotenv import load_dotenv
 
 
 from contextlib import asynccontextmanager
 from .api import ingest, analyze, chat, profile, auth
-from .core.database import create_db_and_tables
+from .core import instrumentation, loop_monitor, mem_profiler, metrics, tracing, warmup
+from .core.database import create_db_and_tables, dispose_engines
+from .core.security import shutdown_hash_executor
 
 # Load environment variables
 load_dotenv(override=True)
 
+# The /debug routes expose recent requests (repo URLs, spans, allocation
+# sites) and can trigger tracemalloc snapshots: off unless set
+DEBUG_ENDPOINTS = os.getenv("DEBUG_ENDPOINTS", "0") in ("1", "true", "True")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     create_db_and_tables()
+    loop_monitor.start()
+    mem_profiler.start()
+    if warmup.PRELOAD_DEPENDENCIES:
+        await asyncio.to_thread(warmup.warm, warmup.PRELOAD_DEPENDENCIES)
     yield
+    await loop_monitor.stop()
+    mem_profiler.stop()
+    shutdown_hash_executor()
+    await dispose_engines()
 
 app = FastAPI(
     title="Explain Any Codebase",
@@ -29,6 +45,11 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Innermost, so it runs in the task that runs the endpoint
+app.add_middleware(loop_monitor.LoopMonitorMiddleware)
+if mem_profiler.MEM_PROFILER_ENABLED:
+    app.add_middleware(mem_profiler.MemoryProfilerMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -38,6 +59,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost: the root span, query count and latency cover the whole stack
+app.add_middleware(instrumentation.RequestInstrumentationMiddleware)
+
 # Include API routers
 app.include_router(auth.router, prefix="/api", tags=["auth"])
 app.include_router(ingest.router, prefix="/api", tags=["ingest"])
@@ -62,6 +86,36 @@ async def health():
     """Health check endpoint."""
     return {"status": "ok", "service": "explain-any-codebase"}
 
+@app.get("/ready")
+async def ready(warm: bool = False):
+    """
+    Readiness check; ``warm=true`` first loads the lazily imported
+    dependencies (see ``warmup``), so the first real request does not.
+    """
+    dependencies = await asyncio.to_thread(warmup.warm) if warm else warmup.status()
+    return {"status": "ready", "dependencies": dependencies}
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Stage timings, counters and request latency in Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+if DEBUG_ENDPOINTS:
+    @app.get("/debug/traces", include_in_schema=False)
+    async def debug_traces(limit: int = 20, name: str | None = None):
+        """Slowest recent traces (root span name filter optional), with their spans."""
+        return tracing.slowest_traces(limit, name)
+
+    @app.get("/debug/loop", include_in_schema=False)
+    async def debug_loop():
+        """Event loop stalls seen by the monitor (``LOOP_MONITOR_ENABLED=1``)."""
+        return {"enabled": loop_monitor.LOOP_MONITOR_ENABLED, "blocks": loop_monitor.recent_blocks()}
+
+    @app.get("/debug/memory", include_in_schema=False)
+    async def debug_memory(limit: int = 20):
+        """Recent per-request memory profiles, newest first (``MEM_PROFILER_ENABLED=1``)."""
+        return mem_profiler.report(limit)
+
 @app.get("/login")
 async def login_page():
     """Serve the login page."""
@@ -13,6 +13,10 @@ class FileNode(BaseModel):
     imports: list[str] = Field(default_factory=list, description="List of imported modules/files")
     size: int = Field(..., description="File size in bytes")
     file_type: str = Field(default="source", description="Type of file (module, component, config, etc.)")
+    skip_reason: str | None = Field(
+        default=None,
+        description="Why the file was listed but not analyzed (too_large, binary, generated, vendored, minified)"
+    )
     
     class Config:
         """Pydantic config."""
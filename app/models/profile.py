@@ -18,5 +18,6 @@ class ProfileAnalysis(BaseModel):
     followers: int
     following: int
     languages: Dict[str, int]
+    language_breakdown: Optional[Dict[str, float]] = None
     top_repos: List[RepositorySummary]
     summary: Optional[str] = None
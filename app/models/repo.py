@@ -7,12 +7,25 @@ from pydantic import BaseModel, Field
 from .file import FileNode
 
 
+class PatternMatch(BaseModel):
+    """
+    Files matching one architectural pattern category.
+    """
+    count: int = Field(default=0, description="Number of matching files")
+    files: list[str] = Field(default_factory=list, description="Example matching file paths (capped)")
+    content_file: str | None = Field(default=None, description="First file whose content matched, if scanned")
+
+
 class RepoIndex(BaseModel):
     """
     Index of a repository's structure and metadata.
     """
     repo_url: str = Field(..., description="GitHub repository URL")
     framework: str = Field(..., description="Detected framework (nextjs, express, fastapi, django, etc.)")
+    frameworks: dict[str, float] = Field(
+        default_factory=dict,
+        description="Every detected framework mapped to its confidence score (0-1)"
+    )
     files: list[FileNode] = Field(default_factory=list, description="List of source files in the repository")
     dependency_graph: dict[str, list[str]] = Field(
         default_factory=dict,
@@ -20,6 +33,10 @@ class RepoIndex(BaseModel):
     )
     total_files: int = Field(..., description="Total number of source files")
     patterns: dict[str, bool] = Field(default_factory=dict, description="Detected architectural patterns")
+    pattern_matches: dict[str, PatternMatch] = Field(
+        default_factory=dict,
+        description="Matching file counts and example paths per pattern category"
+    )
     indexed_at: datetime = Field(default_factory=datetime.utcnow, description="Timestamp of indexing")
     
     class Config:
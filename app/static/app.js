@@ -133,11 +133,65 @@ async function handleSubmit(e) {
     }
 }
 
+// Columnar RepoIndex (see app/core/columnar.py): smaller to send and parse
+const COLUMNAR_INDEX_TYPE = 'application/vnd.codesense.index.columnar+json';
+
+function decodeColumnarIndex(encoded) {
+    const {
+        dirs, path_dirs, path_names, languages, language, file_types, file_type, skip_reasons, skip_reason,
+        sizes, import_names, import_offsets, import_ids,
+        graph_sources, graph_offsets, graph_targets
+    } = encoded;
+
+    const paths = path_names.map((name, i) => {
+        const dir = dirs[path_dirs[i]];
+        return dir ? `${dir}/${name}` : name;
+    });
+
+    const files = new Array(encoded.file_count);
+    for (let i = 0; i < encoded.file_count; i++) {
+        const imports = [];
+        for (let j = import_offsets[i]; j < import_offsets[i + 1]; j++) {
+            imports.push(import_names[import_ids[j]]);
+        }
+        files[i] = {
+            path: paths[i],
+            language: languages[language[i]],
+            imports,
+            size: sizes[i],
+            file_type: file_types[file_type[i]],
+            skip_reason: skip_reasons[skip_reason[i]]
+        };
+    }
+
+    const dependencyGraph = {};
+    graph_sources.forEach((source, k) => {
+        const deps = [];
+        for (let j = graph_offsets[k]; j < graph_offsets[k + 1]; j++) {
+            deps.push(paths[graph_targets[j]]);
+        }
+        dependencyGraph[paths[source]] = deps;
+    });
+
+    return {
+        repo_url: encoded.repo_url,
+        framework: encoded.framework,
+        frameworks: encoded.frameworks,
+        files,
+        dependency_graph: dependencyGraph,
+        total_files: encoded.total_files,
+        patterns: encoded.patterns,
+        pattern_matches: encoded.pattern_matches,
+        indexed_at: encoded.indexed_at
+    };
+}
+
 async function handleRepoAnalysis(repoUrl) {
     const response = await fetch('/api/ingest', {
         method: 'POST',
         headers: {
             'Content-Type': 'application/json',
+            'Accept': `${COLUMNAR_INDEX_TYPE}, application/json;q=0.9`,
         },
         body: JSON.stringify({ repo_url: repoUrl })
     });
@@ -147,7 +201,9 @@ async function handleRepoAnalysis(repoUrl) {
         throw new Error(errorData.detail || 'Failed to analyze repository');
     }
 
-    const data = await response.json();
+    const contentType = response.headers.get('Content-Type') || '';
+    const body = await response.json();
+    const data = contentType.startsWith(COLUMNAR_INDEX_TYPE) ? decodeColumnarIndex(body) : body;
     currentRepoData = data; // Store data for chat context
     displayResults(data);
 }
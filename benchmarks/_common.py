@@ -0,0 +1,29 @@
+"""
+Helpers shared by the benchmark scripts.
+"""
+import asyncio
+import socket
+
+
+async def measure_lag(samples: list, stop: asyncio.Event, interval: float = 0.005):
+    """Record how late the loop wakes us up compared to the requested interval."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - start - interval))
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def free_port() -> int:
+    """A TCP port on localhost that is free right now."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
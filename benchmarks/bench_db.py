@@ -0,0 +1,124 @@
+"""
+Concurrent signup/login database benchmark.
+
+Runs a mix of signup-style inserts and login-style lookups from many
+concurrent tasks and reports operations per second and event-loop lag for:
+
+  legacy  - default SQLite engine (rollback journal) with sync sessions used
+            directly from coroutines, as the auth routes used to do
+  tuned   - app.core.database engines (WAL, synchronous=NORMAL, busy timeout,
+            sized pool) with aiosqlite async sessions
+
+Usage:
+    python benchmarks/bench_db.py --ops 2000 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks._common import measure_lag, percentile
+
+
+async def _run_ops(ops: int, concurrency: int, signup, login) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    lag_samples: list = []
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_lag(lag_samples, stop))
+
+    async def op(i: int):
+        async with semaphore:
+            # One write for every four reads, roughly a signup/login mix
+            if i % 5 == 0:
+                await signup(f"user{i}")
+            else:
+                await login(f"user{(i // 5) * 5}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(op(i) for i in range(ops)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await lag_task
+    return {
+        "ops_per_s": round(ops / elapsed),
+        "loop_lag_p99_ms": round(percentile(lag_samples, 99) * 1000, 2),
+        "loop_lag_max_ms": round(max(lag_samples, default=0.0) * 1000, 2),
+    }
+
+
+async def bench_legacy(url: str, ops: int, concurrency: int) -> dict:
+    from sqlmodel import Session, SQLModel, create_engine, select
+    from app.models.user import User
+
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+
+    async def signup(username: str):
+        with Session(engine) as session:
+            session.add(User(username=username, hashed_password="x"))
+            session.commit()
+
+    async def login(username: str):
+        with Session(engine) as session:
+            session.exec(select(User).where(User.username == username)).first()
+
+    try:
+        return await _run_ops(ops, concurrency, signup, login)
+    finally:
+        engine.dispose()
+
+
+async def bench_tuned(url: str, ops: int, concurrency: int) -> dict:
+    from sqlmodel import SQLModel, select
+    from sqlmodel.ext.asyncio.session import AsyncSession
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    from app.core.database import make_async_engine, make_engine
+    from app.models.user import User
+
+    engine = make_engine(url)
+    SQLModel.metadata.create_all(engine)
+    async_engine = make_async_engine(url)
+    factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def signup(username: str):
+        async with factory() as session:
+            session.add(User(username=username, hashed_password="x"))
+            await session.commit()
+
+    async def login(username: str):
+        async with factory() as session:
+            (await session.exec(select(User).where(User.username == username))).first()
+
+    try:
+        return await _run_ops(ops, concurrency, signup, login)
+    finally:
+        await async_engine.dispose()
+        engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--mode", choices=["legacy", "tuned", "both"], default="both")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench_db_"))
+    os.chdir(workdir)
+
+    modes = ["legacy", "tuned"] if args.mode == "both" else [args.mode]
+    for mode in modes:
+        url = f"sqlite:///{workdir / (mode + '.db')}"
+        bench = bench_legacy if mode == "legacy" else bench_tuned
+        result = asyncio.run(bench(url, args.ops, args.concurrency))
+        print(f"{mode:>7}: " + ", ".join(f"{k}={v}" for k, v in result.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Login throughput and event-loop lag benchmark.
+
+Fires concurrent POST /api/token requests against the app in-process and
+reports logins per second together with the event-loop lag observed while
+they run. Use --inline to verify passwords on the event loop (the old
+behaviour) for comparison.
+
+Usage:
+    python benchmarks/bench_login.py --logins 200 --concurrency 20 [--inline]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks._common import measure_lag, percentile
+
+
+async def run(logins: int, concurrency: int, users: int, inline: bool) -> dict:
+    import httpx
+    from sqlmodel import Session
+
+    from app.api import auth
+    from app.core import security
+    from app.core.database import create_db_and_tables, engine
+    from app.main import app
+    from app.models.user import User
+
+    if inline:
+        async def _inline_verify(plain_password, hashed_password):
+            return security.password_context().verify_and_update(plain_password, hashed_password)
+        auth.verify_and_update_password = _inline_verify
+
+    create_db_and_tables()
+    with Session(engine) as session:
+        for i in range(users):
+            session.add(User(
+                username=f"bench{i}",
+                email=f"bench{i}@example.com",
+                hashed_password=security.get_password_hash("password"),
+            ))
+        session.commit()
+
+    lag_samples: list = []
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_lag(lag_samples, stop))
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list = []
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def login(i: int):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(
+                    "/api/token",
+                    data={"username": f"bench{i % users}", "password": "password"},
+                )
+                latencies.append(time.perf_counter() - start)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(login(i) for i in range(logins)))
+        elapsed = time.perf_counter() - started
+
+    stop.set()
+    await lag_task
+    security.shutdown_hash_executor()
+
+    return {
+        "mode": "inline" if inline else "thread_pool",
+        "logins": logins,
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "logins_per_s": round(logins / elapsed, 1),
+        "latency_p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "latency_p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "loop_lag_p50_ms": round(percentile(lag_samples, 50) * 1000, 2),
+        "loop_lag_p99_ms": round(percentile(lag_samples, 99) * 1000, 2),
+        "loop_lag_max_ms": round(max(lag_samples, default=0.0) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--inline", action="store_true", help="Verify on the event loop (old behaviour)")
+    args = parser.parse_args()
+
+    # database.py uses a relative SQLite path; keep the benchmark DB out of the repo
+    workdir = tempfile.mkdtemp(prefix="bench_login_")
+    os.chdir(workdir)
+
+    result = asyncio.run(run(args.logins, args.concurrency, args.users, args.inline))
+    for key, value in result.items():
+        print(f"{key:>18}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Analysis pipeline benchmark suite on a synthetic repository.
+
+Generates a repository with ``benchmarks/synthetic_repo.py`` (file count,
+language mix, import fan-out, directory depth, node_modules noise and
+minified bundles are options), then times each analysis step on its
+checkout:
+
+  scan_files, classify_files, extract_imports, build_dependency_graph,
+  detect_framework, detect_patterns
+
+and end-to-end ``POST /api/analyze`` through the app, cloning the repository
+from its ``file://`` URL (the response's Server-Timing stages are recorded
+too). With ``--cache cold`` (the default) the parse cache, manifest cache,
+mirrors and workspaces are emptied before every run; ``--cache warm`` primes
+them with one untimed run instead. Everything runs offline, in a temporary
+directory: the app's caches, mirrors, workspaces and database never touch
+the real ones.
+
+Results are written as JSON (``--output``, default stdout) for regression
+tracking; a summary table goes to stderr.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--files 2000] [--repeat 5] [--output results.json]
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# Before any app import: these are read at import time
+WORK = Path(tempfile.mkdtemp(prefix="codesense_bench_"))
+os.environ["PARSE_CACHE_PATH"] = str(WORK / "parse_cache.sqlite3")
+os.environ["WORKSPACE_ROOT"] = str(WORK / "workspaces")
+os.environ["MIRROR_ROOT"] = str(WORK / "mirrors")
+os.environ["DATABASE_URL"] = f"sqlite:///{WORK / 'bench.db'}"
+
+from benchmarks.synthetic_repo import add_spec_arguments, generate_repo, spec_from_args
+from app.core import detector, mirror_store, parse_cache, workspace
+from app.core.detector import detect_frameworks
+from app.core.graph_builder import build_dependency_graph, extract_imports_many
+from app.core.heuristics import detect_pattern_matches
+from app.core.repo_loader import blob_shas, partition_files, scan_files
+
+STAGES = (
+    "scan_files", "classify_files", "extract_imports",
+    "build_dependency_graph", "detect_framework", "detect_patterns",
+)
+
+
+def clear_caches(run: int) -> None:
+    """Forget everything an earlier run left behind."""
+    parse_cache.clear()
+    detector._MANIFEST_CACHE.clear()
+    # Fresh roots rather than deleting: a finished run may still hold leases
+    mirror_store.MIRROR_ROOT = WORK / f"mirrors{run}"
+    workspace.WORKSPACE_ROOT = WORK / f"workspaces{run}"
+
+
+def run_stages(repo: Path, deep_scan: bool, cold: bool) -> tuple[dict[str, float], dict]:
+    """
+    One pass over the pipeline steps.
+
+    Returns:
+        (ms per stage, repository stats)
+    """
+    timings = {}
+
+    def timed(name, fn, *args, **kwargs):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        timings[name] = (time.perf_counter() - start) * 1000
+        return result
+
+    files = timed("scan_files", scan_files, repo)
+    shas = blob_shas(repo)
+    source_files, skipped = timed("classify_files", partition_files, repo, files, None, shas)
+    full_paths = [repo / f for f in source_files]
+    timed("extract_imports", extract_imports_many, full_paths, repo, None, shas)
+    # The graph parses too: cold, it must not reuse extract_imports' results
+    if cold:
+        parse_cache.clear()
+    graph = timed("build_dependency_graph", build_dependency_graph, full_paths, repo_root=repo, blob_shas=shas)
+    timed("detect_framework", detect_frameworks, repo)
+    timed("detect_patterns", detect_pattern_matches, repo, source_files, content_scan=deep_scan)
+    stats = {
+        "files_scanned": len(files),
+        "source_files": len(source_files),
+        "skipped": len(skipped),
+        "graph_edges": sum(len(deps) for deps in graph.values()),
+        "source_bytes": sum((repo / f).stat().st_size for f in source_files),
+    }
+    return timings, stats
+
+
+def run_analyze(client, url: str, deep_scan: bool) -> tuple[float, dict[str, float]]:
+    """One ``POST /api/analyze``; returns total ms and Server-Timing stages."""
+    start = time.perf_counter()
+    response = client.post("/api/analyze", json={"repo_url": url, "deep_scan": deep_scan})
+    elapsed = (time.perf_counter() - start) * 1000
+    response.raise_for_status()
+    stages = {}
+    for item in filter(None, response.headers.get("server-timing", "").split(",")):
+        name, _, duration = item.strip().partition(";dur=")
+        stages[name] = float(duration)
+    return elapsed, stages
+
+
+def summarize(runs: list[float]) -> dict:
+    return {
+        "runs_ms": [round(ms, 3) for ms in runs],
+        "min_ms": round(min(runs), 3),
+        "median_ms": round(statistics.median(runs), 3),
+        "mean_ms": round(statistics.fmean(runs), 3),
+        "stdev_ms": round(statistics.stdev(runs), 3) if len(runs) > 1 else 0.0,
+    }
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "git_commit": commit,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_spec_arguments(parser)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--cache", choices=["cold", "warm"], default="cold")
+    parser.add_argument("--deep-scan", action="store_true", help="Include content pattern scanning")
+    parser.add_argument("--skip-e2e", action="store_true", help="Only time the pipeline steps")
+    parser.add_argument("--output", type=Path, help="JSON results file (default: stdout)")
+    parser.add_argument("--keep", action="store_true", help="Keep the work directory")
+    args = parser.parse_args()
+    cold = args.cache == "cold"
+
+    spec = spec_from_args(args)
+    try:
+        start = time.perf_counter()
+        repo = generate_repo(WORK / "repo", spec)
+        generate_ms = (time.perf_counter() - start) * 1000
+
+        runs: dict[str, list[float]] = {name: [] for name in STAGES}
+        stats = {}
+        if not cold:
+            run_stages(repo, args.deep_scan, cold)
+        for run in range(args.repeat):
+            if cold:
+                clear_caches(run)
+            timings, stats = run_stages(repo, args.deep_scan, cold)
+            for name, ms in timings.items():
+                runs[name].append(ms)
+
+        server_stages: dict[str, list[float]] = {}
+        if not args.skip_e2e:
+            from fastapi.testclient import TestClient
+            from app.main import app
+
+            runs["analyze_e2e"] = []
+            with TestClient(app) as client:
+                if not cold:
+                    run_analyze(client, repo.as_uri(), args.deep_scan)
+                for run in range(args.repeat):
+                    if cold:
+                        clear_caches(args.repeat + run)
+                    elapsed, stages = run_analyze(client, repo.as_uri(), args.deep_scan)
+                    runs["analyze_e2e"].append(elapsed)
+                    for name, ms in stages.items():
+                        server_stages.setdefault(name, []).append(ms)
+
+        report = {
+            "benchmark": "pipeline",
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "environment": environment(),
+            "spec": spec.to_dict(),
+            "cache": args.cache,
+            "deep_scan": args.deep_scan,
+            "repeat": args.repeat,
+            "generate_ms": round(generate_ms, 3),
+            "repo": stats,
+            "results": {name: summarize(values) for name, values in runs.items() if values},
+            "analyze_server_timing": {name: summarize(values) for name, values in server_stages.items()},
+        }
+    finally:
+        if not args.keep:
+            shutil.rmtree(WORK, ignore_errors=True)
+
+    print(f"{spec.files} files ({stats.get('source_files')} source, {stats.get('graph_edges')} edges), "
+          f"cache={args.cache}, {args.repeat} runs", file=sys.stderr)
+    print(f"{'stage':<24}{'min ms':>10}{'median ms':>11}", file=sys.stderr)
+    for name, result in report["results"].items():
+        print(f"{name:<24}{result['min_ms']:>10.1f}{result['median_ms']:>11.1f}", file=sys.stderr)
+
+    body = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(body + "\n", encoding="utf-8")
+    else:
+        print(body)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Python import extraction microbenchmark.
+
+Compares the current ``_extract_python_imports`` with the previous
+line-by-line implementation on a corpus of Python files (the standard
+library by default). Reports per-file CPU time and accuracy against an
+``ast`` ground truth.
+
+Usage:
+    python benchmarks/bench_python_imports.py [--corpus DIR] [--repeat 3]
+"""
+import argparse
+import ast
+import re
+import sys
+import sysconfig
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.core.languages import _extract_python_imports
+
+LEGACY_PATTERNS = [
+    r'^import\s+([\w\.]+)',
+    r'^from\s+([\w\.]+)\s+import',
+]
+
+
+def legacy_extract_python_imports(content: str) -> list[str]:
+    """The implementation this benchmark measures against."""
+    imports = []
+    for line in content.split('\n'):
+        line = line.strip()
+        if line.startswith('#'):
+            continue
+        for pattern in LEGACY_PATTERNS:
+            match = re.match(pattern, line)
+            if match:
+                imports.append(match.group(1))
+                break
+    return imports
+
+
+def ground_truth(content: str) -> set[str] | None:
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return None
+    modules = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            modules.add('.' * node.level + (node.module or ''))
+    return modules
+
+
+def load_corpus(corpus: Path) -> list[str]:
+    contents = []
+    for path in sorted(corpus.rglob('*.py')):
+        try:
+            contents.append(path.read_text(encoding='utf-8', errors='ignore'))
+        except OSError:
+            continue
+    return contents
+
+
+def time_extractor(extract, contents: list[str], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.process_time()
+        for content in contents:
+            extract(content)
+        best = min(best, time.process_time() - started)
+    return best
+
+
+def accuracy(extract, contents: list[str], truths: list) -> tuple[int, int]:
+    exact = total = 0
+    for content, truth in zip(contents, truths):
+        if truth is None:
+            continue
+        total += 1
+        if set(extract(content)) == truth:
+            exact += 1
+    return exact, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=Path, default=Path(sysconfig.get_paths()["stdlib"]))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    contents = load_corpus(args.corpus)
+    truths = [ground_truth(c) for c in contents]
+    total_mb = sum(len(c) for c in contents) / 1e6
+    print(f"corpus: {args.corpus} ({len(contents)} files, {total_mb:.1f} MB)")
+
+    results = {}
+    for name, extract in (("legacy", legacy_extract_python_imports), ("current", _extract_python_imports)):
+        elapsed = time_extractor(extract, contents, args.repeat)
+        exact, total = accuracy(extract, contents, truths)
+        results[name] = elapsed
+        print(
+            f"{name:>8}: {elapsed:.3f}s CPU, {elapsed / len(contents) * 1e6:.1f} us/file, "
+            f"exact match {exact}/{total} ({exact / max(total, 1):.1%})"
+        )
+
+    print(f" speedup: {results['legacy'] / results['current']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
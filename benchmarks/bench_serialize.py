@@ -0,0 +1,159 @@
+"""
+RepoIndex serialization benchmark.
+
+Builds a synthetic index of ``--files`` FileNodes and compares the legacy
+response path (validated ``FileNode``/``RepoIndex`` models, re-validated
+against ``response_model``, ``jsonable_encoder`` and ``json.dumps``, as
+FastAPI does for a returned model) with ``app.core.responses`` (plain dicts
+encoded by ``responses.dumps``) and with the columnar wire format of
+``app.core.columnar``. Reports build and encode times and body sizes,
+identity and compressed.
+
+Usage:
+    python benchmarks/bench_serialize.py [--files 50000] [--repeat 3]
+"""
+import argparse
+import gzip
+import json
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.core import columnar, responses
+from app.models.file import FileNode
+from app.models.repo import RepoIndex
+
+
+def synthetic_rows(count: int, seed: int = 0) -> list[tuple]:
+    """
+    (path, language, imports, size) tuples shaped like a large monorepo:
+    500 packages whose module names repeat, importing each other and a
+    handful of common modules.
+    """
+    rng = random.Random(seed)
+    per_package = max(count // 500, 1)
+    common = ["os", "sys", "json", "typing", "logging", "re", "pathlib", "datetime"]
+    rows = []
+    for i in range(count):
+        imports = [
+            f"src.pkg{rng.randrange(500)}.mod{rng.randrange(per_package)}"
+            if rng.random() < 0.5 else rng.choice(common)
+            for _ in range(rng.randint(0, 6))
+        ]
+        rows.append((f"src/pkg{i % 500}/mod{i // 500}.py", "python", imports, rng.randint(100, 50_000)))
+    return rows
+
+
+def graph_for(rows: list[tuple]) -> dict[str, list[str]]:
+    files = {path for path, _, _, _ in rows}
+    graph = {}
+    for path, _, imports, _ in rows:
+        targets = [f"{imp.replace('.', '/')}.py" for imp in imports]
+        graph[path] = [target for target in targets if target in files]
+    return graph
+
+
+def build_models(rows: list[tuple], graph: dict) -> RepoIndex:
+    """The previous handler code: one validated FileNode per file."""
+    files = [
+        FileNode(path=path, language=language, imports=imports, size=size, file_type="source")
+        for path, language, imports, size in rows
+    ]
+    return RepoIndex(
+        repo_url="https://github.com/example/monorepo",
+        framework="fastapi",
+        files=files,
+        dependency_graph=graph,
+        total_files=len(files)
+    )
+
+
+def build_dicts(rows: list[tuple], graph: dict) -> dict:
+    """The current handler code: plain dicts in the models' field order."""
+    files = [
+        {"path": path, "language": language, "imports": imports, "size": size,
+         "file_type": "source", "skip_reason": None}
+        for path, language, imports, size in rows
+    ]
+    return {
+        "repo_url": "https://github.com/example/monorepo",
+        "framework": "fastapi",
+        "frameworks": {},
+        "files": files,
+        "dependency_graph": graph,
+        "total_files": len(files),
+        "patterns": {},
+        "pattern_matches": {},
+        "indexed_at": datetime.utcnow()
+    }
+
+
+_adapter = TypeAdapter(RepoIndex)
+
+
+def legacy_encode(index: RepoIndex) -> bytes:
+    """Roughly what FastAPI does with a returned model and a ``response_model``."""
+    validated = _adapter.validate_python(index)
+    return json.dumps(jsonable_encoder(validated)).encode('utf-8')
+
+
+def best_of(repeat: int, fn, *args):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--files', type=int, default=50_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.files)
+    graph = graph_for(rows)
+    encoder = 'orjson' if responses.orjson is not None else 'json'
+    print(f"{args.files} files, encoder={encoder}, best of {args.repeat}")
+
+    legacy_build, models = best_of(args.repeat, build_models, rows, graph)
+    legacy_encode_ms, legacy_body = best_of(args.repeat, legacy_encode, models)
+    fast_build, payload = best_of(args.repeat, build_dicts, rows, graph)
+    fast_encode_ms, body = best_of(args.repeat, responses.dumps, payload)
+    columnar_ms, encoded = best_of(args.repeat, columnar.encode_index, payload)
+    columnar_encode_ms, columnar_body = best_of(args.repeat, responses.dumps, encoded)
+    decode_ms, decoded = best_of(args.repeat, columnar.decode_index, encoded)
+    assert decoded == payload
+
+    print(f"{'path':<10}{'build ms':>10}{'encode ms':>11}{'total ms':>10}{'bytes':>12}")
+    for name, build, encode, size in (
+        ('legacy', legacy_build, legacy_encode_ms, len(legacy_body)),
+        ('fast', fast_build, fast_encode_ms, len(body)),
+        ('columnar', fast_build + columnar_ms, columnar_encode_ms, len(columnar_body)),
+    ):
+        print(f"{name:<10}{build:>10.1f}{encode:>11.1f}{build + encode:>10.1f}{size:>12,}")
+    print(f"columnar decode (Python): {decode_ms:.1f} ms")
+
+    print(f"\n{'coding':<22}{'ms':>8}{'bytes':>12}{'ratio':>8}")
+    codings = [(f"gzip-{level}", lambda b, level=level: gzip.compress(b, compresslevel=level, mtime=0))
+               for level in (1, responses.GZIP_LEVEL, 9)]
+    if responses.brotli is not None:
+        codings.append((f"br-{responses.BROTLI_QUALITY}",
+                        lambda b: responses.brotli.compress(b, quality=responses.BROTLI_QUALITY)))
+    for name, compress in codings:
+        for form, data in (('', body), (' columnar', columnar_body)):
+            ms, compressed = best_of(args.repeat, compress, data)
+            print(f"{name + form:<22}{ms:>8.1f}{len(compressed):>12,}{len(body) / len(compressed):>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""
+Cold-start benchmark: import time report and boot-to-ready time.
+
+Imports ``--module`` (``app.main``) in ``--repeat`` fresh interpreters with
+``python -X importtime`` and parses the report into: wall time per run, the
+module's cumulative import time, the slowest top-level packages (self
+time of all their modules, so nothing is counted twice), and which of the heavy dependencies the app defers to first
+use (``app.core.warmup``) were imported anyway. With ``--serve`` it also
+starts uvicorn and times process start to the first ``/health`` response,
+then ``GET /ready?warm=true`` (loading the deferred dependencies).
+
+Results are written as JSON (``--output``, default stdout); a summary goes
+to stderr.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat 5] [--top 15] [--serve] [--output startup.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks._common import free_port
+
+# Imported on first use by the app; none should show up at startup
+DEFERRED_MODULES = ("google.generativeai", "passlib.context", "argon2", "jose.jwt", "IPython")
+
+
+def parse_importtime(stderr: str) -> list[dict]:
+    """
+    ``-X importtime`` lines as ``{"module", "depth", "self_us", "cumulative_us"}``,
+    in the order Python prints them (children before their parent).
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        indent = len(name) - len(name.lstrip())
+        rows.append({
+            "module": name.strip(),
+            # One leading space, then two per nesting level
+            "depth": (indent - 1) // 2,
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+        })
+    return rows
+
+
+def import_run(module: str) -> tuple[float, list[dict]]:
+    """Import ``module`` in a fresh interpreter; returns (wall ms, import rows)."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return (time.perf_counter() - start) * 1000, parse_importtime(result.stderr)
+
+
+def _get(url: str, timeout: float = 120.0) -> dict:
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def serve_run(work: Path) -> dict:
+    """Start uvicorn; time to the first ``/health`` and the ``/ready?warm=true`` warm-up."""
+    port = free_port()
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{work / 'startup.db'}"}
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with status {process.returncode}")
+            try:
+                _get(f"{base}/health", timeout=1)
+                break
+            except OSError:
+                time.sleep(0.02)
+        ready_ms = (time.perf_counter() - start) * 1000
+        before = _get(f"{base}/ready")["dependencies"]
+        warm_start = time.perf_counter()
+        after = _get(f"{base}/ready?warm=true")["dependencies"]
+        warm_ms = (time.perf_counter() - warm_start) * 1000
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    return {"ready_ms": ready_ms, "warm_ms": warm_ms, "loaded_at_boot": before, "after_warm": after}
+
+
+def _stats(values: list[float]) -> dict:
+    return {
+        "runs_ms": [round(v, 1) for v in values],
+        "min_ms": round(min(values), 1),
+        "median_ms": round(statistics.median(values), 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="Slowest top-level packages to report")
+    parser.add_argument("--serve", action="store_true", help="Also time uvicorn boot to ready")
+    parser.add_argument("--output", type=Path, help="JSON results file (default: stdout)")
+    args = parser.parse_args()
+
+    walls, cumulative, last_rows = [], [], []
+    for _ in range(args.repeat):
+        wall, rows = import_run(args.module)
+        walls.append(wall)
+        target = next((row for row in rows if row["module"] == args.module), None)
+        cumulative.append(target["cumulative_us"] / 1000 if target else 0.0)
+        last_rows = rows
+
+    # Self time per top-level package, from the last run
+    packages: dict[str, int] = {}
+    for row in last_rows:
+        package = row["module"].split(".")[0]
+        packages[package] = packages.get(package, 0) + row["self_us"]
+    slowest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]
+    imported = {row["module"] for row in last_rows}
+
+    report = {
+        "benchmark": "startup",
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "module": args.module,
+        "repeat": args.repeat,
+        "process_wall": _stats(walls),
+        "module_import": _stats(cumulative),
+        "modules_imported": len(imported),
+        "slowest_packages_ms": {name: round(us / 1000, 1) for name, us in slowest},
+        "deferred_imported_at_startup": {name: name in imported for name in DEFERRED_MODULES},
+    }
+
+    if args.serve:
+        runs = []
+        with tempfile.TemporaryDirectory(prefix="codesense_startup_") as work:
+            for _ in range(args.repeat):
+                runs.append(serve_run(Path(work)))
+        report["serve"] = {
+            "boot_to_ready": _stats([run["ready_ms"] for run in runs]),
+            "warm": _stats([run["warm_ms"] for run in runs]),
+            "loaded_at_boot": runs[-1]["loaded_at_boot"],
+            "after_warm": runs[-1]["after_warm"],
+        }
+
+    print(f"{args.module}: import {report['module_import']['median_ms']:.0f} ms median, "
+          f"process {report['process_wall']['median_ms']:.0f} ms, {len(imported)} modules", file=sys.stderr)
+    for name, ms in report["slowest_packages_ms"].items():
+        print(f"  {name:<28}{ms:>8.1f} ms", file=sys.stderr)
+    eager = [name for name, found in report["deferred_imported_at_startup"].items() if found]
+    print(f"deferred dependencies imported at startup: {', '.join(eager) or 'none'}", file=sys.stderr)
+    if args.serve:
+        print(f"boot to ready {report['serve']['boot_to_ready']['median_ms']:.0f} ms, "
+              f"warm-up {report['serve']['warm']['median_ms']:.0f} ms", file=sys.stderr)
+
+    body = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(body + "\n", encoding="utf-8")
+    else:
+        print(body)
+
+
+if __name__ == "__main__":
+    main()
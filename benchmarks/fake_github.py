@@ -0,0 +1,207 @@
+"""
+Local stand-in for the GitHub REST API, for load tests.
+
+Serves the endpoints ``GithubClient`` uses, with deterministic data per
+username:
+
+  GET /users/{login}                   profile (``missing*`` logins are 404)
+  GET /users/{login}/repos             ``--repos`` repositories, paginated
+  GET /repos/{owner}/{repo}/languages  language byte counts
+
+Every response carries GitHub's rate-limit headers (``X-RateLimit-Limit``,
+``-Remaining``, ``-Used``, ``-Reset``, ``-Resource``). Once ``--rate-limit``
+requests have been served in the current ``--rate-window``, requests get
+GitHub's 403 "API rate limit exceeded" answer until the window resets.
+``--latency`` adds a fixed delay per request.
+
+Point the app at it with ``GITHUB_API_URL=http://127.0.0.1:PORT``.
+
+Usage:
+    python benchmarks/fake_github.py [--port 8765] [--latency 0.05] [--rate-limit 5000]
+"""
+import argparse
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+LANGUAGES = ["Python", "TypeScript", "JavaScript", "Go", "Rust", "Java", "C++", "Shell"]
+
+
+def _seed(*parts: str) -> int:
+    return int.from_bytes(hashlib.sha256("/".join(parts).encode("utf-8")).digest()[:8], "big")
+
+
+class FakeGithub:
+    """The fake API server; ``start`` runs it on a background thread."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        rate_limit: int = 5000,
+        rate_window: float = 3600.0,
+        repos_per_user: int = 150
+    ):
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.repos_per_user = repos_per_user
+        self.requests = 0
+        self.rate_limited = 0
+        self._lock = threading.Lock()
+        self._window_start = time.time()
+        self._used = 0
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeGithub":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-github", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _take_quota(self) -> tuple[bool, dict]:
+        """Count a request against the window; returns (allowed, headers)."""
+        with self._lock:
+            now = time.time()
+            if now - self._window_start >= self.rate_window:
+                self._window_start, self._used = now, 0
+            allowed = self._used < self.rate_limit
+            if allowed:
+                self._used += 1
+            else:
+                self.rate_limited += 1
+            self.requests += 1
+            headers = {
+                "X-RateLimit-Limit": str(self.rate_limit),
+                "X-RateLimit-Remaining": str(self.rate_limit - self._used),
+                "X-RateLimit-Used": str(self._used),
+                "X-RateLimit-Reset": str(int(self._window_start + self.rate_window)),
+                "X-RateLimit-Resource": "core",
+            }
+        return allowed, headers
+
+    def user(self, login: str) -> dict | None:
+        if login.lower().startswith("missing"):
+            return None
+        seed = _seed(login)
+        return {
+            "login": login,
+            "name": login.title(),
+            "bio": f"Synthetic user {login}",
+            "avatar_url": f"{self.url}/avatars/{login}.png",
+            "html_url": f"https://github.com/{login}",
+            "public_repos": self.repos_per_user,
+            "followers": seed % 5000,
+            "following": seed % 300,
+        }
+
+    def repos(self, login: str, page: int, per_page: int) -> list[dict]:
+        start = (page - 1) * per_page
+        return [self._repo(login, i) for i in range(start, min(start + per_page, self.repos_per_user))]
+
+    def _repo(self, login: str, i: int) -> dict:
+        seed = _seed(login, str(i))
+        name = f"project-{i}"
+        return {
+            "name": name,
+            "full_name": f"{login}/{name}",
+            "owner": {"login": login},
+            "description": f"Synthetic repository {i} of {login}",
+            "language": LANGUAGES[seed % len(LANGUAGES)],
+            "stargazers_count": seed % 2000,
+            "forks_count": seed % 300,
+            "html_url": f"https://github.com/{login}/{name}",
+            "pushed_at": "2024-01-01T00:00:00Z",
+        }
+
+    def languages(self, owner: str, repo: str) -> dict:
+        seed = _seed(owner, repo)
+        count = 1 + seed % 4
+        return {
+            LANGUAGES[(seed + k) % len(LANGUAGES)]: 1000 + (seed >> (8 * k)) % 500_000
+            for k in range(count)
+        }
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body, headers: dict) -> None:
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if fake.latency:
+                    time.sleep(fake.latency)
+                allowed, headers = fake._take_quota()
+                if not allowed:
+                    self._send(403, {
+                        "message": "API rate limit exceeded for 127.0.0.1.",
+                        "documentation_url": "https://docs.github.com/rest/overview/resources-in-the-rest-api#rate-limiting",
+                    }, headers)
+                    return
+                url = urlparse(self.path)
+                parts = [p for p in url.path.split("/") if p]
+                query = parse_qs(url.query)
+                if len(parts) == 2 and parts[0] == "users":
+                    user = fake.user(parts[1])
+                    if user is None:
+                        self._send(404, {"message": "Not Found"}, headers)
+                    else:
+                        self._send(200, user, headers)
+                elif len(parts) == 3 and parts[0] == "users" and parts[2] == "repos":
+                    page = int(query.get("page", ["1"])[0])
+                    per_page = min(100, int(query.get("per_page", ["30"])[0]))
+                    self._send(200, fake.repos(parts[1], page, per_page), headers)
+                elif len(parts) == 4 and parts[0] == "repos" and parts[3] == "languages":
+                    self._send(200, fake.languages(parts[1], parts[2]), headers)
+                else:
+                    self._send(404, {"message": "Not Found"}, headers)
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--rate-limit", type=int, default=5000, help="Requests per window")
+    parser.add_argument("--rate-window", type=float, default=3600.0, help="Rate limit window in seconds")
+    parser.add_argument("--repos", type=int, default=150, help="Repositories per user")
+    args = parser.parse_args()
+    server = FakeGithub(args.host, args.port, args.latency, args.rate_limit, args.rate_window, args.repos)
+    print(f"Fake GitHub API on {server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""
+Offline load test of the HTTP API.
+
+Starts everything the service talks to locally:
+
+  - local bare git repositories (``benchmarks/synthetic_repo.py``), analyzed
+    and ingested through their ``file://`` URLs
+  - the fake GitHub API (``benchmarks/fake_github.py``), via ``GITHUB_API_URL``
+  - the fake LLM backend (``LLM_BACKEND=fake``, ``app/llm/backend.py``)
+
+then the app itself under uvicorn in a subprocess, with its caches,
+mirrors, workspaces and database in a temporary directory. An asyncio load
+generator sends open-loop traffic (arrivals do not wait for responses, so a
+slow server cannot slow the offered load) to each endpoint at its own rate:
+
+  ingest   POST /api/ingest         random local repository
+  analyze  POST /api/analyze        random local repository
+  chat     POST /api/chat           fake LLM answer
+  profile  GET  /api/profile/{user} fake GitHub + fake LLM, as an HR user
+  token    POST /api/token          password login (Argon2)
+
+and reports throughput, errors and the latency distribution (p50/p90/p99/
+max) per endpoint as a table on stderr and as JSON (``--output``, default
+stdout).
+
+Usage:
+    python benchmarks/load_test.py [--rates ingest=0.2,analyze=0.5,chat=5,profile=1,token=2] [--duration 30]
+"""
+import argparse
+import asyncio
+import dataclasses
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks._common import free_port, percentile
+from benchmarks.fake_github import FakeGithub
+from benchmarks.synthetic_repo import add_spec_arguments, generate_repo, spec_from_args
+
+ENDPOINTS = ("ingest", "analyze", "chat", "profile", "token")
+DEFAULT_RATES = "ingest=0.2,analyze=0.5,chat=5,profile=1,token=2"
+PASSWORD = "load-test-password"
+
+
+def parse_rates(value: str) -> dict[str, float]:
+    """``chat=5,token=2`` -> requests per second by endpoint."""
+    rates = {}
+    for item in filter(None, value.split(",")):
+        name, _, rate = item.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint {name!r}; choose from {', '.join(ENDPOINTS)}")
+        rates[name] = float(rate)
+    return rates
+
+
+def make_repos(work: Path, spec, count: int) -> list[str]:
+    """``count`` bare repositories of ``spec`` (different seeds); returns URLs."""
+    urls = []
+    for i in range(count):
+        source = generate_repo(work / f"source{i}", dataclasses.replace(spec, seed=spec.seed + i))
+        bare = work / f"repo{i}.git"
+        subprocess.run(["git", "clone", "-q", "--bare", str(source), str(bare)], check=True, capture_output=True)
+        shutil.rmtree(source)
+        urls.append(bare.as_uri())
+    return urls
+
+
+def start_app(work: Path, port: int, workers: int, github_url: str, llm_latency: float) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "GITHUB_API_URL": github_url,
+        "LLM_BACKEND": "fake",
+        "FAKE_LLM_LATENCY_SECONDS": str(llm_latency),
+        "DATABASE_URL": f"sqlite:///{work / 'load.db'}",
+        "PARSE_CACHE_PATH": str(work / "parse_cache.sqlite3"),
+        "WORKSPACE_ROOT": str(work / "workspaces"),
+        "MIRROR_ROOT": str(work / "mirrors"),
+    }
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=ROOT, env=env
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"The app exited with status {process.returncode}")
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise TimeoutError("The app did not become ready")
+
+
+async def create_users(client: httpx.AsyncClient) -> tuple[str, str]:
+    """A regular user for logins and an HR user for profiles; returns (username, HR token)."""
+    suffix = f"{os.getpid()}_{int(time.time())}"
+    username, hr_username = f"load_{suffix}", f"loadhr_{suffix}"
+    for name, email in ((username, f"{username}@example.com"), (hr_username, "hr@example.com")):
+        response = await client.post("/api/signup", json={"username": name, "email": email, "password": PASSWORD})
+        response.raise_for_status()
+    response = await client.post("/api/token", data={"username": hr_username, "password": PASSWORD})
+    response.raise_for_status()
+    return username, response.json()["access_token"]
+
+
+class LoadTest:
+    """Open-loop request generator; one arrival loop per endpoint."""
+
+    def __init__(self, client: httpx.AsyncClient, repo_urls: list[str], username: str, hr_token: str, args):
+        self.client = client
+        self.repo_urls = repo_urls
+        self.username = username
+        self.hr_token = hr_token
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.latencies: dict[str, list[float]] = {name: [] for name in ENDPOINTS}
+        self.statuses: dict[str, dict[str, int]] = {name: {} for name in ENDPOINTS}
+        self.dropped: dict[str, int] = {name: 0 for name in ENDPOINTS}
+        self.in_flight = 0
+        self.tasks: set[asyncio.Task] = set()
+
+    def _request(self, endpoint: str):
+        if endpoint in ("ingest", "analyze"):
+            return self.client.post(f"/api/{endpoint}", json={"repo_url": self.rng.choice(self.repo_urls)})
+        if endpoint == "chat":
+            return self.client.post("/api/chat", json={
+                "repo_id": "synthetic",
+                "question": f"How is module {self.rng.randrange(1000)} used?",
+            })
+        if endpoint == "profile":
+            return self.client.get(
+                f"/api/profile/user{self.rng.randrange(self.args.github_users)}",
+                params={"language_breakdown": "true"},
+                headers={"Authorization": f"Bearer {self.hr_token}"}
+            )
+        return self.client.post("/api/token", data={"username": self.username, "password": PASSWORD})
+
+    async def _send(self, endpoint: str) -> None:
+        self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            response = await self._request(endpoint)
+            status = str(response.status_code)
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        finally:
+            self.in_flight -= 1
+        self.latencies[endpoint].append(time.perf_counter() - start)
+        self.statuses[endpoint][status] = self.statuses[endpoint].get(status, 0) + 1
+
+    async def _arrivals(self, endpoint: str, rate: float, duration: float) -> None:
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        next_at = start
+        while True:
+            gap = self.rng.expovariate(rate) if self.args.arrivals == "poisson" else 1.0 / rate
+            next_at += gap
+            if next_at - start >= duration:
+                return
+            await asyncio.sleep(max(0.0, next_at - loop.time()))
+            if self.in_flight >= self.args.max_in_flight:
+                self.dropped[endpoint] += 1
+                continue
+            task = asyncio.create_task(self._send(endpoint))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def run(self, rates: dict[str, float], duration: float) -> float:
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            self._arrivals(endpoint, rate, duration) for endpoint, rate in rates.items() if rate > 0
+        ))
+        if self.tasks:
+            await asyncio.gather(*self.tasks)
+        return time.perf_counter() - start
+
+
+def summarize(latencies: list[float], statuses: dict[str, int], dropped: int, elapsed: float) -> dict:
+    ok = sum(count for status, count in statuses.items() if status.startswith("2"))
+    ms = [latency * 1000 for latency in latencies]
+    return {
+        "requests": len(ms),
+        "ok": ok,
+        "errors": len(ms) - ok,
+        "dropped": dropped,
+        "throughput_rps": round(len(ms) / elapsed, 3) if elapsed else 0.0,
+        "statuses": statuses,
+        "mean_ms": round(statistics.fmean(ms), 3) if ms else 0.0,
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p90_ms": round(percentile(ms, 90), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "max_ms": round(max(ms), 3) if ms else 0.0,
+    }
+
+
+async def run(args, work: Path) -> dict:
+    rates = parse_rates(args.rates)
+    spec = spec_from_args(args)
+    repo_urls = make_repos(work, spec, args.repos) if {"ingest", "analyze"} & set(rates) else []
+
+    github = FakeGithub(
+        latency=args.github_latency, rate_limit=args.github_rate_limit, repos_per_user=args.github_repos
+    ).start()
+    process = None
+    base_url = args.base_url
+    if base_url is None:
+        port = free_port()
+        process = start_app(work, port, args.workers, github.url, args.llm_latency)
+        base_url = f"http://127.0.0.1:{port}"
+    try:
+        limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+        async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+            await wait_ready(client, process)
+            username, hr_token = await create_users(client)
+            load = LoadTest(client, repo_urls, username, hr_token, args)
+            elapsed = await load.run(rates, args.duration)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+        github.stop()
+
+    return {
+        "benchmark": "load",
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "base_url": args.base_url,
+        "workers": args.workers,
+        "duration_s": args.duration,
+        "elapsed_s": round(elapsed, 3),
+        "arrivals": args.arrivals,
+        "rates_rps": rates,
+        "spec": spec.to_dict(),
+        "repos": args.repos,
+        "llm_latency_s": args.llm_latency,
+        "github": {
+            "latency_s": args.github_latency,
+            "requests": github.requests,
+            "rate_limited": github.rate_limited,
+        },
+        "results": {
+            endpoint: summarize(load.latencies[endpoint], load.statuses[endpoint], load.dropped[endpoint], elapsed)
+            for endpoint in rates
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rates", default=DEFAULT_RATES, help="Requests per second by endpoint")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of load")
+    parser.add_argument("--arrivals", choices=["constant", "poisson"], default="poisson")
+    parser.add_argument("--max-in-flight", type=int, default=256, help="Arrivals beyond this are dropped")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--base-url", help="Load an already running app instead of starting one")
+    parser.add_argument("--repos", type=int, default=3, help="Local repositories to ingest/analyze")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Fake LLM response time in seconds")
+    parser.add_argument("--github-latency", type=float, default=0.02, help="Fake GitHub response time in seconds")
+    parser.add_argument("--github-rate-limit", type=int, default=5000, help="Fake GitHub requests per hour")
+    parser.add_argument("--github-repos", type=int, default=150, help="Repositories per fake GitHub user")
+    parser.add_argument("--github-users", type=int, default=50, help="Distinct profiles requested")
+    parser.add_argument("--output", type=Path, help="JSON results file (default: stdout)")
+    add_spec_arguments(parser)
+    parser.set_defaults(files=500)
+    args = parser.parse_args()
+
+    work = Path(tempfile.mkdtemp(prefix="codesense_load_"))
+    try:
+        report = asyncio.run(run(args, work))
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    print(f"{'endpoint':<10}{'reqs':>7}{'rps':>8}{'errors':>8}{'p50 ms':>10}{'p90 ms':>10}"
+          f"{'p99 ms':>10}{'max ms':>10}", file=sys.stderr)
+    for endpoint, result in report["results"].items():
+        print(f"{endpoint:<10}{result['requests']:>7}{result['throughput_rps']:>8.2f}{result['errors']:>8}"
+              f"{result['p50_ms']:>10.1f}{result['p90_ms']:>10.1f}{result['p99_ms']:>10.1f}"
+              f"{result['max_ms']:>10.1f}", file=sys.stderr)
+
+    body = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(body + "\n", encoding="utf-8")
+    else:
+        print(body)
+
+
+if __name__ == "__main__":
+    main()
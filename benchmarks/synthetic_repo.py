@@ -0,0 +1,238 @@
+"""
+Synthetic repository generator for benchmarks.
+
+``generate_repo`` writes a deterministic (per seed) git repository of
+``files`` source files in a language mix, each importing ``fanout`` other
+generated modules on average with the syntax its resolver understands, in
+directories ``depth`` levels deep. Root manifests (``requirements.txt``,
+``package.json``, ``go.mod``) are written for the languages present, so
+framework detection has signals. Optional noise: a ``node_modules`` tree,
+which scans must skip, and minified bundles, which classification must skip.
+
+Usage:
+    python benchmarks/synthetic_repo.py DEST [--files 2000] [--languages python=0.5,typescript=0.3,go=0.2]
+"""
+import argparse
+import json
+import random
+import subprocess
+from dataclasses import dataclass, field
+from pathlib import Path
+
+# Language -> file extension
+EXTENSIONS = {
+    'python': '.py',
+    'javascript': '.js',
+    'typescript': '.ts',
+    'go': '.go',
+}
+DEFAULT_LANGUAGES = 'python=0.5,typescript=0.3,go=0.2'
+
+# Top-level directory names; several are pattern-detection keywords
+TOP_DIRS = ['api', 'models', 'services', 'controllers', 'utils', 'components', 'routes', 'core']
+GO_MODULE = 'example.com/synthetic'
+
+
+@dataclass
+class RepoSpec:
+    """Shape of a generated repository."""
+    files: int = 2000
+    languages: dict[str, float] = field(default_factory=lambda: parse_languages(DEFAULT_LANGUAGES))
+    fanout: float = 4.0
+    depth: int = 3
+    node_modules: int = 0
+    minified: int = 0
+    seed: int = 0
+
+    def to_dict(self) -> dict:
+        return {
+            'files': self.files,
+            'languages': self.languages,
+            'fanout': self.fanout,
+            'depth': self.depth,
+            'node_modules': self.node_modules,
+            'minified': self.minified,
+            'seed': self.seed,
+        }
+
+
+def parse_languages(value: str) -> dict[str, float]:
+    """``python=0.5,go=0.5`` -> normalized weights."""
+    weights = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip().lower()
+        if name not in EXTENSIONS:
+            raise ValueError(f"Unknown language {name!r}; choose from {', '.join(EXTENSIONS)}")
+        weights[name] = float(weight or 1)
+    total = sum(weights.values())
+    return {name: weight / total for name, weight in weights.items()}
+
+
+def _directories(rng: random.Random, depth: int, count: int) -> list[str]:
+    """
+    About one directory per 20 files, ``depth`` levels under ``src``.
+
+    Only ``len(TOP_DIRS) * 8 ** (depth - 1)`` distinct directories exist, so
+    shallow trees get fewer, fuller directories. Indices are sampled without
+    replacement and decoded into path parts, so names are unique by
+    construction.
+    """
+    levels = max(1, depth) - 1
+    possible = len(TOP_DIRS) * 8 ** levels
+    dirs = []
+    for index in rng.sample(range(possible), min(possible, max(1, count // 20))):
+        index, top = divmod(index, len(TOP_DIRS))
+        parts = [TOP_DIRS[top]]
+        for _ in range(levels):
+            index, pkg = divmod(index, 8)
+            parts.append(f"pkg{pkg}")
+        dirs.append('src/' + '/'.join(parts))
+    return sorted(dirs)
+
+
+def _import_line(language: str, target: str) -> str:
+    """Import of ``target`` (path without extension) in ``language``."""
+    if language == 'python':
+        return f"import {target.replace('/', '.')}"
+    if language in ('javascript', 'typescript'):
+        name = target.rpartition('/')[2]
+        return f"import {{ {name} }} from '@/{target.removeprefix('src/')}';"
+    # Go imports packages, i.e. directories
+    return f'\t"{GO_MODULE}/{target.rpartition("/")[0]}"'
+
+
+def _source(language: str, name: str, imports: list[str], rng: random.Random) -> str:
+    """A plausible source file of a few hundred bytes to a few KB."""
+    body_lines = rng.randint(10, 120)
+    if language == 'python':
+        header = ['import os', 'import json', 'from typing import Any', *imports, '']
+        body = [f"def {name}_f{i}(value: Any) -> Any:\n    return json.dumps({{'v': value, 'i': {i}}})\n"
+                for i in range(body_lines // 3)]
+    elif language in ('javascript', 'typescript'):
+        header = ["import React from 'react';", *imports, '']
+        body = [f"export function {name}F{i}(value) {{\n  return JSON.stringify({{ v: value, i: {i} }});\n}}\n"
+                for i in range(body_lines // 3)]
+    else:
+        header = [f'package {name}', '', 'import (', '\t"fmt"', *imports, ')', '']
+        body = [f"func F{i}(v int) string {{\n\treturn fmt.Sprint(v + {i})\n}}\n"
+                for i in range(body_lines // 3)]
+    return '\n'.join(header + body) + '\n'
+
+
+def _manifests(languages: set[str]) -> dict[str, str]:
+    manifests = {}
+    if 'python' in languages:
+        manifests['requirements.txt'] = 'fastapi>=0.100\nuvicorn\npydantic>=2\n'
+    if languages & {'javascript', 'typescript'}:
+        manifests['package.json'] = json.dumps({
+            'name': 'synthetic',
+            'dependencies': {'react': '^18.2.0', 'react-dom': '^18.2.0'},
+            'devDependencies': {'typescript': '^5.0.0'} if 'typescript' in languages else {},
+        }, indent=2) + '\n'
+    if 'go' in languages:
+        manifests['go.mod'] = f'module {GO_MODULE}\n\ngo 1.21\n'
+    return manifests
+
+
+def generate_files(spec: RepoSpec) -> dict[str, str]:
+    """Relative POSIX path -> content for every file of the repository."""
+    rng = random.Random(spec.seed)
+    directories = _directories(rng, spec.depth, spec.files)
+    names = list(spec.languages)
+    weights = [spec.languages[name] for name in names]
+
+    # (language, path without extension); Go files in a directory share its package
+    modules = []
+    for i in range(spec.files):
+        language = rng.choices(names, weights)[0]
+        modules.append((language, f"{rng.choice(directories)}/{language[:2]}{i}"))
+
+    by_language: dict[str, list[str]] = {}
+    for language, stem in modules:
+        by_language.setdefault('javascript' if language == 'typescript' else language, []).append(stem)
+
+    files = _manifests(set(names))
+    for language, stem in modules:
+        pool = by_language['javascript' if language == 'typescript' else language]
+        count = min(len(pool), max(0, round(rng.gauss(spec.fanout, spec.fanout / 2))))
+        targets = sorted(set(rng.sample(pool, count)) - {stem})
+        imports = [_import_line(language, target) for target in targets]
+        directory, _, name = stem.rpartition('/')
+        package = directory.rpartition('/')[2] if language == 'go' else name
+        files[stem + EXTENSIONS[language]] = _source(language, package, imports, rng)
+
+    for i in range(spec.node_modules):
+        package = f"node_modules/dep{i % 50}"
+        files[f"{package}/lib/index{i}.js"] = f"module.exports = function dep{i}() {{ return {i}; }};\n"
+        files.setdefault(f"{package}/package.json", json.dumps({'name': f"dep{i % 50}"}) + '\n')
+
+    for i in range(spec.minified):
+        # One long line under a plain name: only content sniffing can tell
+        statements = ''.join(f"function m{i}_{j}(a){{return a*{j}+{i}}};" for j in range(400))
+        files[f"src/static/bundle{i}.js"] = statements + '\n'
+
+    return files
+
+
+def _git(repo: Path, *args: str) -> None:
+    subprocess.run(
+        ['git', '-c', 'user.name=bench', '-c', 'user.email=bench@example.com', *args],
+        cwd=repo, capture_output=True, check=True
+    )
+
+
+def generate_repo(dest: Path, spec: RepoSpec) -> Path:
+    """
+    Write ``spec`` as a git repository with one commit at ``dest``.
+
+    Returns:
+        ``dest``; clone it with ``dest.as_uri()``
+    """
+    dest.mkdir(parents=True, exist_ok=True)
+    for rel, content in generate_files(spec).items():
+        path = dest / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding='utf-8')
+    _git(dest, 'init', '-q', '-b', 'main')
+    # node_modules is committed on purpose: it is the noise scans must skip
+    _git(dest, 'add', '-A', '-f')
+    _git(dest, 'commit', '-q', '-m', 'Synthetic repository')
+    return dest
+
+
+def add_spec_arguments(parser: argparse.ArgumentParser) -> None:
+    """Repository shape options shared by the benchmark scripts."""
+    parser.add_argument('--files', type=int, default=2000)
+    parser.add_argument('--languages', default=DEFAULT_LANGUAGES,
+                        help=f"Weights, e.g. {DEFAULT_LANGUAGES} (from {', '.join(EXTENSIONS)})")
+    parser.add_argument('--fanout', type=float, default=4.0, help='Average local imports per file')
+    parser.add_argument('--depth', type=int, default=3, help='Directory levels under src/')
+    parser.add_argument('--node-modules', type=int, default=0, help='Files of node_modules noise')
+    parser.add_argument('--minified', type=int, default=0, help='Minified bundles under src/static')
+    parser.add_argument('--seed', type=int, default=0)
+
+
+def spec_from_args(args: argparse.Namespace) -> RepoSpec:
+    return RepoSpec(
+        files=args.files,
+        languages=parse_languages(args.languages),
+        fanout=args.fanout,
+        depth=args.depth,
+        node_modules=args.node_modules,
+        minified=args.minified,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('dest', type=Path)
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+    generate_repo(args.dest, spec_from_args(args))
+    print(args.dest.resolve().as_uri())
+
+
+if __name__ == '__main__':
+    main()
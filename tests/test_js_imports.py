@@ -0,0 +1,37 @@
+"""
+Tests for the JavaScript/TypeScript import scanner.
+"""
+import time
+
+from app.core.languages import JS_DYNAMIC, JS_REQUIRE, JS_STATIC, scan_js_imports
+
+
+def test_keywords_must_stand_alone():
+    source = (
+        'const a = _require("fs");\n'
+        'lazyimport("./x");\n'
+        'obj.require("y");\n'
+        '$import("z");\n'
+        'const b = require("path");\n'
+        'await import("./page");\n'
+    )
+    assert scan_js_imports(source) == [('path', JS_REQUIRE), ('./page', JS_DYNAMIC)]
+
+
+def test_unterminated_block_comment_hides_rest_of_file():
+    source = "import a from './a';\n/* never closed\nimport b from './b';\n"
+    assert scan_js_imports(source) == [('./a', JS_STATIC)]
+
+
+def test_unterminated_template_hides_rest_of_file():
+    source = "import a from './a';\nconst s = `open\nimport b from './b';\n"
+    assert scan_js_imports(source) == [('./a', JS_STATIC)]
+
+
+def test_unterminated_tokens_stay_linear():
+    # Each "/*" and backtick used to rescan to the end of the file
+    for opener in ('/* ', 'x` '):
+        source = "import a from './a';\n" + opener * 50_000
+        start = time.perf_counter()
+        assert scan_js_imports(source) == [('./a', JS_STATIC)]
+        assert time.perf_counter() - start < 1.0
@@ -0,0 +1,47 @@
+"""
+Tests for Rust import extraction and resolution.
+"""
+from pathlib import Path
+
+from app.core.languages import build_resolve_context, get_extractor
+
+
+ROOT = Path("/repo")
+FILES = [
+    ROOT / "src/main.rs",
+    ROOT / "src/net.rs",
+    ROOT / "src/net/http.rs",
+    ROOT / "src/net/tls.rs",
+    ROOT / "src/util/mod.rs",
+    ROOT / "src/util/fmt.rs",
+]
+
+
+def _resolve(imp: str, source: str) -> Path | None:
+    context = build_resolve_context(FILES, root=ROOT)
+    return get_extractor(".rs").resolve(imp, ROOT / source, context)
+
+
+def test_extracts_mod_and_use():
+    source = "mod net;\npub mod util;\nuse crate::util::fmt::pad;\nuse super::Thing;\nuse std::io;\n"
+    assert get_extractor(".rs").extract(source) == [
+        "mod::net", "mod::util", "crate::util::fmt::pad", "super::Thing",
+    ]
+
+
+def test_resolves_mod_declarations():
+    assert _resolve("mod::net", "src/main.rs") == ROOT / "src/net.rs"
+    assert _resolve("mod::util", "src/main.rs") == ROOT / "src/util/mod.rs"
+    assert _resolve("mod::http", "src/net.rs") == ROOT / "src/net/http.rs"
+
+
+def test_resolves_crate_paths():
+    assert _resolve("crate::util::fmt::pad", "src/net/http.rs") == ROOT / "src/util/fmt.rs"
+    assert _resolve("crate::net::Client", "src/util/fmt.rs") == ROOT / "src/net.rs"
+
+
+def test_resolves_super_paths():
+    assert _resolve("super::tls::connect", "src/net/http.rs") == ROOT / "src/net/tls.rs"
+    # In a mod.rs, super is the parent of the module's own directory
+    assert _resolve("super::net::Client", "src/util/mod.rs") == ROOT / "src/net.rs"
+    assert _resolve("super::missing::Item", "src/net/http.rs") is None
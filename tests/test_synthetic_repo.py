@@ -0,0 +1,28 @@
+"""
+Tests for the synthetic repository generator used by the benchmarks.
+"""
+from benchmarks.synthetic_repo import RepoSpec, generate_files
+
+
+def _source_dirs(files: dict) -> set:
+    return {path.rpartition('/')[0] for path in files if path.startswith('src/')}
+
+
+def test_large_file_count_at_shallow_depth_terminates():
+    # Depth 1 allows only one directory per top-level name
+    files = generate_files(RepoSpec(files=400, depth=1))
+    dirs = _source_dirs(files)
+    assert len(files) >= 400
+    assert 1 <= len(dirs) <= 8
+    assert all(d.count('/') == 1 for d in dirs)
+
+
+def test_file_count_above_directory_capacity():
+    files = generate_files(RepoSpec(files=20_000, depth=2, languages={'python': 1.0}))
+    assert sum(path.endswith('.py') for path in files) == 20_000
+    assert len(_source_dirs(files)) <= 8 * 8
+
+
+def test_generation_is_deterministic_per_seed():
+    spec = RepoSpec(files=200, seed=7)
+    assert generate_files(spec) == generate_files(spec)